@@ -0,0 +1,269 @@
+"""How the queries scale with the size of the page.
+
+Serves generated pages from a local server to headless Chrome and times every locator type with
+`get_by`, `find_by`, `Within` and multi-element queries. The results are written to a JSON file
+that later runs can be compared against:
+
+    python benchmarks/dom_scaling.py --output baseline.json
+    python benchmarks/dom_scaling.py --baseline baseline.json
+"""
+
+import argparse
+import json
+import platform
+import re
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from selenium import webdriver
+
+from selenium_testing_library import Screen, Within, locators
+
+# Every page has roughly the requested number of elements and a single target of every kind,
+# placed at the end so the queries have to go through the whole page
+TARGET = (
+    '<section id="target-section">'
+    '<button id="target" data-testid="target">Target</button>'
+    "<p>Target text</p>"
+    '<label for="target-field">Target field</label><input id="target-field">'
+    "</section>"
+)
+
+
+def wide(size: int) -> str:
+    items = "".join(
+        f'<li><button data-testid="item-{i}">Item {i}</button></li>'
+        for i in range(size // 2)
+    )
+    return f"<ul>{items}</ul>{TARGET}"
+
+
+def deep(size: int) -> str:
+    # Nested in chunks so the browser doesn't hit its nesting limit
+    depth = 200
+    chunks = []
+    for chunk in range(size // depth):
+        opening = "".join(f'<div class="level-{i}">' for i in range(depth - 1))
+        chunks.append(f"{opening}<span>Item {chunk}</span>{'</div>' * (depth - 1)}")
+    return "".join(chunks) + TARGET
+
+
+def table(size: int) -> str:
+    columns = 5
+    rows = "".join(
+        "<tr>"
+        + "".join(f"<td>Item {row}.{col}</td>" for col in range(columns))
+        + "</tr>"
+        for row in range(size // (columns + 1))
+    )
+    return f"<table><tbody>{rows}</tbody></table>{TARGET}"
+
+
+def form(size: int) -> str:
+    fields = "".join(
+        f'<div><label for="field-{i}">Field {i}</label><input id="field-{i}"></div>'
+        for i in range(size // 3)
+    )
+    return f"<form>{fields}</form>{TARGET}"
+
+
+pages: Dict[str, Callable[[int], str]] = {
+    "wide": wide,
+    "deep": deep,
+    "table": table,
+    "form": form,
+}
+
+single = {
+    "role": locators.Role("button", name="Target"),
+    "role without name": locators.Role("button", hidden=False),
+    "text": locators.Text("Target text"),
+    "label text": locators.LabelText("Target field"),
+    "test id": locators.TestId("target"),
+    "css": locators.Css("#target"),
+}
+
+multiple = {
+    "role": locators.Role("button"),
+    "text": locators.Text(re.compile("^(Item|Field)")),
+    "css": locators.Css("button, td, span, input"),
+}
+
+
+def serve(html: Dict[str, str]) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = html.get(self.path.lstrip("/"))
+            if body is None:
+                self.send_error(404)
+                return
+            data = f"<!DOCTYPE html><html><body>{body}</body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(call: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    call()  # The first call injects the helpers
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    median = statistics.median(times)
+    return {
+        "median_ms": median * 1000,
+        "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))] * 1000,
+        "min_ms": times[0] * 1000,
+        "ops_per_s": 1 / median if median else float("inf"),
+    }
+
+
+def cases(screen: Screen) -> Iterator[Tuple[str, str, Callable[[], Any]]]:
+    for name, locator in single.items():
+        if name == "role without name":
+            continue
+        yield "get_by", name, partial(screen.get_by, locator)
+        yield "find_by", name, partial(screen.find_by, locator)
+    within = Within(screen.get_by(locators.Css("#target-section")))
+    for name, locator in single.items():
+        yield "within", name, partial(within.get_by, locator)
+    for name, locator in multiple.items():
+        yield "get_all_by", name, partial(screen.get_all_by, locator)
+
+
+def run(
+    driver: Any, sizes: List[int], page_names: List[str], repeat: int
+) -> List[Dict[str, Any]]:
+    html = {
+        f"{name}-{size}.html": pages[name](size)
+        for name in page_names
+        for size in sizes
+    }
+    server = serve(html)
+    screen = Screen(driver)
+    results = []
+    try:
+        for path in html:
+            name, size = path[: -len(".html")].rsplit("-", 1)
+            driver.get(f"http://127.0.0.1:{server.server_port}/{path}")
+            nodes = driver.execute_script(
+                "return document.getElementsByTagName('*').length"
+            )
+            for operation, locator, call in cases(screen):
+                stats = measure(call, repeat)
+                results.append(
+                    {
+                        "page": name,
+                        "size": int(size),
+                        "nodes": nodes,
+                        "operation": operation,
+                        "locator": locator,
+                        **stats,
+                    }
+                )
+                print(
+                    f"{name:>6} {size:>7} {operation:>10} {locator:>18} "
+                    f"{stats['median_ms']:10.2f}ms {stats['ops_per_s']:10.1f}/s",
+                    file=sys.stderr,
+                )
+    finally:
+        server.shutdown()
+    return results
+
+
+def _key(result: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (result["page"], result["size"], result["operation"], result["locator"])
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    before = {_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = before.get(_key(result))
+        if old is None:
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        if ratio > tolerance:
+            page, size, operation, locator = _key(result)
+            regressions.append(
+                f"{operation} {locator} on {page}-{size}: "
+                f"{old['median_ms']:.2f}ms -> {result['median_ms']:.2f}ms ({ratio:.1f}x)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--pages", nargs="+", choices=pages, default=list(pages))
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="Timed runs of every query"
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare the results to this JSON file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="Report queries that got slower than the baseline by this factor",
+    )
+    parser.add_argument(
+        "--headed", action="store_true", help="Don't run Chrome headless"
+    )
+    args = parser.parse_args(argv)
+
+    options = webdriver.ChromeOptions()
+    if not args.headed:
+        options.add_argument("headless")
+    driver = webdriver.Chrome(options=options)
+    try:
+        results = run(driver, args.sizes, args.pages, args.repeat)
+        browser = driver.capabilities.get("browserVersion")
+    finally:
+        driver.quit()
+
+    data = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "browser": f"chrome {browser}",
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(data, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Slower: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,11 @@
+from .async_screen import *  # noqa: F403
+from .clock import *  # noqa: F403
+from .expect import *  # noqa: F403
+from .group import *  # noqa: F403
+from .hooks import *  # noqa: F403
+from .replay import *  # noqa: F403
 from .screen import *  # noqa: F403
+from .snapshot import *  # noqa: F403
+from .trace import *  # noqa: F403
 
 __version__ = "2024.3"
@@ -0,0 +1,963 @@
+import asyncio
+import base64
+import functools
+import inspect
+import json
+import ssl
+import time
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+
+from . import locators
+from .hooks import QueryEvent
+from .screen import (
+    Locator,
+    MultipleSuchElementsException,
+    _BaseScreen,
+    _bundle_missing,
+    _count,
+    _is_selenium_query,
+    async_script,
+    script_timeout_margin,
+    testing_library,
+)
+from .trace import TraceWriter
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+# What WebDriver servers use until the script timeout is set
+default_script_timeout = 30
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(
+        self, method: str, path: str, headers: List[str], body: bytes
+    ) -> Tuple[int, bytes, bool]:
+        head = [
+            f"{method} {path} HTTP/1.1",
+            *headers,
+            f"Content-Length: {len(body)}",
+        ]
+        if body:
+            head.append("Content-Type: application/json;charset=UTF-8")
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("The WebDriver server closed the connection")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = response_headers.get("connection", "").lower() != "close"
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            data = await self._read_chunked()
+        elif "content-length" in response_headers:
+            data = await self.reader.readexactly(
+                int(response_headers["content-length"])
+            )
+        else:
+            data = await self.reader.read()
+            keep_alive = False
+        return status, data, keep_alive
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0].strip(), 16)
+            if not size:
+                break
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+        # Skip the trailers
+        while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        return b"".join(chunks)
+
+    def close(self):
+        self.writer.close()
+
+
+def _server_url(command_executor: Any) -> str:
+    url = getattr(command_executor, "_url", None)
+    if url is None:
+        url = command_executor._client_config.remote_server_addr
+    return url
+
+
+class AsyncWebDriver:
+    def __init__(
+        self,
+        url: str,
+        session_id: str,
+        *,
+        max_connections: int = 4,
+        connect_timeout: float = 10,
+        read_timeout: float = 60,
+    ):
+        parts = urlsplit(url)
+        self.session_id = session_id
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port or (443 if parts.scheme == "https" else 80)
+        self._ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self._path = parts.path.rstrip("/")
+        self._headers = [
+            f"Host: {parts.netloc.rpartition('@')[2]}",
+            "Accept: application/json",
+            "Connection: keep-alive",
+        ]
+        if parts.username:
+            credentials = f"{parts.username}:{parts.password or ''}".encode()
+            self._headers.append(
+                f"Authorization: Basic {base64.b64encode(credentials).decode()}"
+            )
+        self._max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        # How long a response may take, scripts that wait in the page get their script timeout on top
+        self.read_timeout = read_timeout
+        self._script_timeout: Optional[float] = None
+        self._idle: List[_Connection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_driver(cls, driver: Any, **kwargs: Any) -> "AsyncWebDriver":
+        return cls(_server_url(driver.command_executor), driver.session_id, **kwargs)
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+    async def __aenter__(self) -> "AsyncWebDriver":
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        await self.close()
+
+    async def _connect(self) -> _Connection:
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self._host, self._port, ssl=self._ssl),
+                self.connect_timeout,
+            )
+        except asyncio.TimeoutError:
+            raise WebDriverException(
+                f"Couldn't connect to the WebDriver server within {self.connect_timeout}s"
+            )
+        return _Connection(reader, writer)
+
+    async def _request(
+        self,
+        connection: _Connection,
+        method: str,
+        path: str,
+        body: bytes,
+        timeout: float,
+    ) -> Tuple[int, bytes, bool]:
+        try:
+            return await asyncio.wait_for(
+                connection.request(method, path, self._headers, body), timeout
+            )
+        except asyncio.TimeoutError:
+            # The response could still arrive, so _exchange() doesn't use the connection again
+            raise WebDriverException(
+                f"The WebDriver server didn't respond within {timeout}s"
+            )
+
+    async def _send(
+        self, method: str, path: str, body: bytes, timeout: float
+    ) -> Tuple[int, bytes]:
+        if self._slots is None:
+            # Created lazily so the semaphore belongs to the running event loop
+            self._slots = asyncio.Semaphore(self._max_connections)
+        async with self._slots:
+            reused = bool(self._idle)
+            connection = self._idle.pop() if reused else await self._connect()
+            try:
+                return await self._exchange(connection, method, path, body, timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not reused:
+                    raise
+                # The server closed an idle connection, try once more on a fresh one
+                connection = await self._connect()
+                return await self._exchange(connection, method, path, body, timeout)
+
+    async def _exchange(
+        self,
+        connection: _Connection,
+        method: str,
+        path: str,
+        body: bytes,
+        timeout: float,
+    ) -> Tuple[int, bytes]:
+        # The connection only goes back to the pool after a complete response, it's closed on every
+        # other way out, cancellation included
+        try:
+            status, data, keep_alive = await self._request(
+                connection, method, path, body, timeout
+            )
+        except BaseException:
+            connection.close()
+            raise
+        if keep_alive:
+            self._idle.append(connection)
+        else:
+            connection.close()
+        return status, data
+
+    async def execute(
+        self,
+        method: str,
+        path: str,
+        params: Any = None,
+        *,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        body = b"" if params is None else json.dumps(_wrap(params)).encode()
+        status, data = await self._send(
+            method,
+            f"{self._path}/session/{self.session_id}{path}",
+            body,
+            self.read_timeout if timeout is None else timeout,
+        )
+        text = data.decode("utf-8")
+        if status >= 400:
+            ErrorHandler().check_response({"status": status, "value": text})
+            raise WebDriverException(text)
+        return _unwrap(self, json.loads(text)["value"] if text else None)
+
+    async def execute_script(self, script: str, *args: Any) -> Any:
+        return await self.execute(
+            "POST", "/execute/sync", {"script": script, "args": list(args)}
+        )
+
+    async def execute_async_script(self, script: str, *args: Any) -> Any:
+        # The response only comes once the script is done or has timed out
+        script_timeout = (
+            default_script_timeout
+            if self._script_timeout is None
+            else self._script_timeout
+        )
+        return await self.execute(
+            "POST",
+            "/execute/async",
+            {"script": script, "args": list(args)},
+            timeout=self.read_timeout + script_timeout,
+        )
+
+    async def get_script_timeout(self) -> float:
+        # Read once, the script timeout is only changed through set_script_timeout() afterwards
+        if self._script_timeout is None:
+            timeouts = await self.execute("GET", "/timeouts")
+            script = timeouts.get("script")
+            self._script_timeout = float("inf") if script is None else script / 1000
+        return self._script_timeout
+
+    async def set_script_timeout(self, timeout: float):
+        await self.execute("POST", "/timeouts", {"script": int(timeout * 1000)})
+        self._script_timeout = timeout
+
+    async def find_elements(
+        self, by: str = locators.By.ID, value: Optional[str] = None
+    ) -> List["AsyncWebElement"]:
+        return await self.execute("POST", "/elements", _w3c_locator(by, value))
+
+
+class AsyncWebElement:
+    def __init__(self, parent: AsyncWebDriver, id_: str):
+        self.parent = parent
+        self.id = id_
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, AsyncWebElement) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} (session={self.parent.session_id!r}, element={self.id!r})>"
+
+    async def _execute(self, method: str, path: str, params: Any = None) -> Any:
+        return await self.parent.execute(method, f"/element/{self.id}{path}", params)
+
+    async def find_elements(
+        self, by: str = locators.By.ID, value: Optional[str] = None
+    ) -> List["AsyncWebElement"]:
+        return await self._execute("POST", "/elements", _w3c_locator(by, value))
+
+    async def get_attribute(self, name: str) -> Optional[str]:
+        return await self.parent.execute_script(
+            "const value = arguments[0][arguments[1]];"
+            "return value === undefined || value === null || typeof value === 'object'"
+            " ? arguments[0].getAttribute(arguments[1]) : String(value)",
+            self,
+            name,
+        )
+
+    async def text(self) -> str:
+        return await self._execute("GET", "/text")
+
+    async def click(self):
+        await self._execute("POST", "/click", {})
+
+    async def clear(self):
+        await self._execute("POST", "/clear", {})
+
+    async def send_keys(self, text: str):
+        await self._execute("POST", "/value", {"text": text})
+
+
+def _w3c_locator(by: str, value: Optional[str]) -> Dict[str, Any]:
+    # WebDriver only knows about css, xpath and link text, the rest are css selectors
+    if by == locators.By.ID:
+        by, value = locators.By.CSS_SELECTOR, f'[id="{value}"]'
+    elif by == locators.By.CLASS_NAME:
+        by, value = locators.By.CSS_SELECTOR, f".{value}"
+    elif by == locators.By.NAME:
+        by, value = locators.By.CSS_SELECTOR, f'[name="{value}"]'
+    return {"using": by, "value": value}
+
+
+def _wrap(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _wrap(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_wrap(item) for item in value]
+    if isinstance(value, AsyncWebElement) or hasattr(value, "_id"):
+        return {ELEMENT_KEY: value.id}
+    return value
+
+
+def _unwrap(driver: AsyncWebDriver, value: Any) -> Any:
+    if isinstance(value, dict):
+        if ELEMENT_KEY in value:
+            return AsyncWebElement(driver, value[ELEMENT_KEY])
+        return {key: _unwrap(driver, item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_unwrap(driver, item) for item in value]
+    return value
+
+
+# The query that is running in the current task. Tasks have their own context, so concurrent queries
+# on the same screen don't get mixed up.
+_current_event: "ContextVar[Optional[QueryEvent]]" = ContextVar(
+    "current_event", default=None
+)
+
+
+def _observed(kind: str, *, wait: bool = False) -> Callable[[F], F]:
+    # The coroutine flavour of screen._observed
+    def decorator(method: F) -> F:
+        @functools.wraps(method)
+        async def wrapper(self: "AsyncScreen", locator: Locator, *args, **kwargs):
+            if self._event is not None or not self._has_hooks():
+                return await method(self, locator, *args, **kwargs)
+            with self._observe(kind, locator) as event:
+                event.wait = wait
+                result = await method(self, locator, *args, **kwargs)
+                event.result_count = _count(result)
+                return result
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+class AsyncScreen(
+    _BaseScreen[
+        Awaitable[AsyncWebElement],
+        Awaitable[Optional[AsyncWebElement]],
+        Awaitable[List[AsyncWebElement]],
+    ]
+):
+    def __init__(
+        self,
+        driver: AsyncWebDriver,
+        *,
+        idle_window: Optional[float] = None,
+        fast_forward: bool = False,
+        query_budget: Optional[float] = None,
+        slow_query_threshold: Optional[float] = None,
+    ):
+        self.driver = driver
+        self._configure(
+            idle_window=idle_window,
+            fast_forward=fast_forward,
+            query_budget=query_budget,
+            slow_query_threshold=slow_query_threshold,
+        )
+
+    @property
+    def _event(self) -> Optional[QueryEvent]:
+        return _current_event.get()
+
+    @_event.setter
+    def _event(self, event: Optional[QueryEvent]):
+        _current_event.set(event)
+
+    def trace(self, path: str, *, buffer_size: int = 100) -> TraceWriter:
+        writer = TraceWriter(path, buffer_size=buffer_size)
+        self.add_hook(writer)
+        return writer
+
+    async def _execute_script(self, script: str, *args) -> Any:
+        script = self._prelude() + script
+        self._round_trip(script)
+        try:
+            return await self.driver.execute_script(script, *args)
+        except WebDriverException as e:
+            if not _bundle_missing(e):
+                raise
+            return await self._inject(self.driver.execute_script, script, *args)
+
+    async def _execute_async_script(self, function: str, *args) -> Any:
+        # The last argument holds the options of the wait, its timeout is in milliseconds
+        options = args[-1] if args and isinstance(args[-1], dict) else {}
+        if options.get("timeout") is not None:
+            await self._ensure_script_timeout(options["timeout"] / 1000)
+        script = self._prelude() + async_script.format(function)
+        self._round_trip(script)
+        try:
+            return await self.driver.execute_async_script(script, *args)
+        except WebDriverException as e:
+            if not _bundle_missing(e):
+                raise
+            return await self._inject(self.driver.execute_async_script, script, *args)
+
+    async def _inject(
+        self, execute: Callable[..., Awaitable[Any]], script: str, *args
+    ) -> Any:
+        with self._observe("inject") as event:
+            event.injected = True
+            script = f"{testing_library};{script}"
+            self._round_trip(script)
+            return await execute(script, *args)
+
+    async def _ensure_script_timeout(self, timeout: float):
+        needed = timeout + script_timeout_margin
+        if await self.driver.get_script_timeout() < needed:
+            self._round_trip()
+            await self.driver.set_script_timeout(needed)
+
+    async def _native_find_elements(self, loc: locators.Locator) -> List[Any]:
+        self._round_trip()
+        return await self.driver.find_elements(*loc)
+
+    async def _find_elements(
+        self, locator: Locator, query_budget: Optional[float] = None
+    ) -> List[AsyncWebElement]:
+        loc = self._ensure_locator(locator)
+        if _is_selenium_query(loc):
+            return await self._native_find_elements(loc)
+        budget = self._budget(query_budget)
+        result = await self._execute_script(
+            "return __stl__.query(arguments[0], arguments[1], arguments[2])",
+            self._container,
+            loc._js_spec(),
+            {"budget": None if budget is None else budget * 1000},
+        )
+        return self._check_query_time(loc, result, budget)
+
+    async def _no_element_message(self, locator: Locator) -> str:
+        return f"No element found with locator {locator}"
+
+    async def _get_no_element_message(self, locator: Locator) -> str:
+        with self._observe("message", locator):
+            return await self._no_element_message(locator)
+
+    async def _get_multiple_elements_message(
+        self, locator: Locator, els: List[AsyncWebElement]
+    ) -> str:
+        with self._observe("message", locator) as event:
+            event.round_trips += 1
+            html = await self.driver.execute_script(
+                "return arguments[0].map(el => el.outerHTML)", els
+            )
+            el_str = ""
+            for i, outer_html in enumerate(html):
+                el_str += f"{i}. {' '.join(outer_html.splitlines())}\n"
+            return f"{len(els)} elements found with locator {locator}:\n{el_str}"
+
+    async def _single(
+        self, locator: Locator, els: List[AsyncWebElement]
+    ) -> AsyncWebElement:
+        if not els:
+            raise NoSuchElementException(await self._get_no_element_message(locator))
+        if len(els) > 1:
+            raise MultipleSuchElementsException(
+                await self._get_multiple_elements_message(locator, els)
+            )
+        return els[0]
+
+    async def _raise_for_result(
+        self, locator: locators.Locator, result: Dict[str, Any]
+    ):
+        # Screen._raise_for_error, with the error messages that need a round trip
+        if result.get("error") == "missing":
+            raise NoSuchElementException(await self._get_no_element_message(locator))
+        if result.get("error") == "multiple":
+            raise MultipleSuchElementsException(
+                await self._get_multiple_elements_message(locator, result["elements"])
+            )
+        self._raise_for_error(locator, result)
+
+    @_observed("get")
+    async def get_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> AsyncWebElement:
+        return await self._single(
+            locator, await self._find_elements(locator, query_budget)
+        )
+
+    @_observed("query")
+    async def query_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> Optional[AsyncWebElement]:
+        els = await self._find_elements(locator, query_budget)
+        return await self._single(locator, els) if els else None
+
+    @_observed("find", wait=True)
+    async def find_by(
+        self,
+        locator: Locator,
+        *,
+        timeout: float = 5,
+        poll_frequency: float = 0.5,
+        scroll_container: Optional[Locator] = None,
+        stable: bool = False,
+        query_budget: Optional[float] = None,
+    ) -> AsyncWebElement:
+        loc = self._ensure_locator(locator)
+        if scroll_container is not None:
+            scroll_loc = self._ensure_locator(scroll_container)
+            result = await self._execute_async_script(
+                "scrollFind",
+                self._container,
+                loc._js_spec(),
+                scroll_loc._js_spec(),
+                {"timeout": timeout * 1000},
+            )
+            await self._raise_for_result(
+                scroll_loc if result.get("container") else loc, result
+            )
+            el = result["element"]
+            return await self.wait_for_stable(el, timeout=timeout) if stable else el
+        if stable:
+            result = await self._execute_async_script(
+                "findStable",
+                self._container,
+                loc._js_spec(),
+                self._wait_options(timeout, query_budget=query_budget),
+            )
+            await self._raise_for_result(loc, result)
+            return result["element"]
+        els = await self.find_all_by(
+            loc,
+            timeout=timeout,
+            poll_frequency=poll_frequency,
+            query_budget=query_budget,
+        )
+        return await self._single(loc, els)
+
+    @_observed("all")
+    async def get_all_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> List[AsyncWebElement]:
+        els = await self._find_elements(locator, query_budget)
+        if not els:
+            raise NoSuchElementException(await self._get_no_element_message(locator))
+        return els
+
+    @_observed("all")
+    async def query_all_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> List[AsyncWebElement]:
+        return await self._find_elements(locator, query_budget)
+
+    @_observed("all", wait=True)
+    async def find_all_by(
+        self,
+        locator: Locator,
+        *,
+        timeout: float = 5,
+        poll_frequency: float = 0.5,
+        min_count: Optional[int] = None,
+        stable_for: Optional[float] = None,
+        query_budget: Optional[float] = None,
+    ) -> List[AsyncWebElement]:
+        loc = self._ensure_locator(locator)
+        if _is_selenium_query(loc) and min_count is None and stable_for is None:
+            try:
+                return await self.wait_for(
+                    lambda _: self._native_find_elements(loc),
+                    timeout=timeout,
+                    poll_frequency=poll_frequency,
+                )
+            except TimeoutException:
+                raise NoSuchElementException(await self._get_no_element_message(loc))
+
+        # Everything else waits inside the page, so there's no polling from the event loop
+        min_count = 1 if min_count is None else min_count
+        result = await self._execute_async_script(
+            "findAll",
+            self._container,
+            loc._js_spec(),
+            self._wait_options(
+                timeout,
+                query_budget=query_budget,
+                minCount=min_count,
+                stableFor=(stable_for or 0) * 1000,
+            ),
+        )
+        await self._raise_for_result(loc, result)
+        els = result["elements"]
+        if not els:
+            raise NoSuchElementException(await self._get_no_element_message(loc))
+        if len(els) < min_count:
+            raise NoSuchElementException(
+                f"Expected at least {min_count} elements with locator {loc}, found {len(els)}"
+            )
+        if not result["done"]:
+            raise NoSuchElementException(
+                f"Elements found with locator {loc} kept changing for {timeout}s"
+            )
+        return els
+
+    async def find_first(
+        self, locator_list: Sequence[Locator], *, timeout: float = 5
+    ) -> Tuple[int, AsyncWebElement]:
+        locs = [self._ensure_locator(locator) for locator in locator_list]
+        results = await self._find_each(locs, timeout=timeout, all=False)
+        for index, (loc, els) in enumerate(zip(locs, results)):
+            if els:
+                return index, await self._single(loc, els)
+        raise NoSuchElementException(
+            f"No element found with any of the locators {locs}"
+        )
+
+    async def find_all_of(
+        self, locator_list: Sequence[Locator], *, timeout: float = 5
+    ) -> List[AsyncWebElement]:
+        locs = [self._ensure_locator(locator) for locator in locator_list]
+        results = await self._find_each(locs, timeout=timeout, all=True)
+        missing = [loc for loc, els in zip(locs, results) if not els]
+        if missing:
+            raise NoSuchElementException(f"No element found with locators {missing}")
+        return [await self._single(loc, els) for loc, els in zip(locs, results)]
+
+    async def _find_each(
+        self, locs: List[locators.Locator], *, timeout: float, all: bool
+    ) -> List[List[AsyncWebElement]]:
+        if not locs:
+            raise ValueError("At least one locator is required")
+        result = await self._execute_async_script(
+            "findEach",
+            self._container,
+            [loc._js_spec() for loc in locs],
+            self._wait_options(timeout, all=all),
+        )
+        await self._raise_for_result(locs[0], result)
+        return result["results"]
+
+    async def map(
+        self,
+        containers: Union[locators.Locator, Sequence[AsyncWebElement]],
+        locator: Locator,
+        *,
+        mode: str = "get",
+    ) -> List[Any]:
+        if mode not in ("get", "query", "all"):
+            raise ValueError(f"mode must be 'get', 'query' or 'all', not {mode!r}")
+        if isinstance(containers, locators.Locator):
+            outer: Any = containers._js_spec()
+        else:
+            outer = list(containers)
+            if not outer:
+                return []
+        loc = self._ensure_locator(locator)
+        slots = await self._execute_script(
+            "return __stl__.map(arguments[0], arguments[1], arguments[2])",
+            self._container,
+            outer,
+            loc._js_spec(),
+        )
+        results: List[Any] = []
+        for slot in slots:
+            els = slot.get("elements", [])
+            if slot.get("error"):
+                results.append(JavascriptException(slot.get("message")))
+            elif mode == "all" or (mode == "query" and not els):
+                results.append(els if mode == "all" else None)
+            else:
+                try:
+                    results.append(await self._single(loc, els))
+                except WebDriverException as e:
+                    results.append(e)
+        return results
+
+    async def query_all_by_texts(
+        self,
+        texts: Iterable[str],
+        *,
+        selector: str = "*",
+        exact: bool = True,
+        ignore: Union[str, bool] = "script, style",
+    ) -> Dict[str, List[AsyncWebElement]]:
+        texts = list(texts)
+        results = await self._execute_script(
+            "return __stl__.queryAllByTexts(arguments[0], arguments[1], arguments[2])",
+            self._container,
+            texts,
+            {"selector": selector, "exact": exact, "ignore": ignore},
+        )
+        return dict(zip(texts, results))
+
+    async def fill(
+        self,
+        values: Dict[str, Any],
+        *,
+        exact: bool = True,
+        send_keys: Union[bool, str, Iterable[str]] = False,
+    ) -> List[AsyncWebElement]:
+        entries = self._fill_entries(values, send_keys)
+        result = await self._execute_script(
+            "return __stl__.fill(arguments[0], arguments[1], arguments[2])",
+            self._container,
+            entries,
+            {"exact": exact},
+        )
+        if result.get("error"):
+            locator = locators.LabelText(entries[result["index"]][0], exact=exact)
+            await self._raise_for_result(locator, result)
+
+        els = result["elements"]
+        for (_, value, use_send_keys), el in zip(entries, els):
+            # Fields that need genuine key events are left untouched in the page
+            if use_send_keys:
+                await el.clear()
+                await el.send_keys(str(value))
+        return els
+
+    async def click_by(
+        self, locator: Locator, *, timeout: float = 5, trusted: bool = False
+    ) -> AsyncWebElement:
+        el = await self._act(locator, "click", None, timeout=timeout, trusted=trusted)
+        if trusted:
+            await el.click()
+        return el
+
+    async def type_by(
+        self,
+        locator: Locator,
+        text: str,
+        *,
+        clear: bool = True,
+        timeout: float = 5,
+        trusted: bool = False,
+    ) -> AsyncWebElement:
+        el = await self._act(
+            locator,
+            "type",
+            {"text": text, "clear": clear},
+            timeout=timeout,
+            trusted=trusted,
+        )
+        if trusted:
+            if clear:
+                await el.clear()
+            await el.send_keys(text)
+        return el
+
+    async def select_by(
+        self, locator: Locator, value: Union[str, List[str]], *, timeout: float = 5
+    ) -> AsyncWebElement:
+        return await self._act(locator, "select", value, timeout=timeout, trusted=False)
+
+    async def _act(
+        self,
+        locator: Locator,
+        action: str,
+        value: Any,
+        *,
+        timeout: float,
+        trusted: bool,
+    ) -> AsyncWebElement:
+        loc = self._ensure_locator(locator)
+        result = await self._execute_async_script(
+            "act",
+            self._container,
+            loc._js_spec(),
+            action,
+            value,
+            self._wait_options(timeout, trusted=trusted),
+        )
+        await self._raise_for_result(loc, result)
+        return result["element"]
+
+    async def wait_for(
+        self,
+        method: Callable[[Any], Any],
+        *,
+        timeout: float = 5,
+        poll_frequency: float = 0.5,
+        ignored_exceptions: Optional[Iterable[Type[BaseException]]] = None,
+    ) -> Any:
+        ignored: Tuple[Type[BaseException], ...] = (
+            NoSuchElementException,
+            *(ignored_exceptions or ()),
+        )
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                value = await self._poll(method)
+                if value:
+                    return value
+            except ignored:
+                pass
+            if time.monotonic() >= deadline:
+                raise TimeoutException()
+            await asyncio.sleep(poll_frequency)
+
+    async def _poll(self, method: Callable[[Any], Any]) -> Any:
+        # Every poll of a wait is reported on its own and counted in the query that waits
+        if not self._has_hooks():
+            return await _maybe_await(method(self.driver))
+        with self._observe("wait") as event:
+            value = await _maybe_await(method(self.driver))
+            event.result_count = _count(value)
+            return value
+
+    async def wait_for_stale(
+        self,
+        element: AsyncWebElement,
+        *,
+        timeout: float = 5,
+        poll_frequency: float = 0.5,
+    ):
+        async def is_stale(_: Any) -> bool:
+            try:
+                self._round_trip()
+                return not await self.driver.execute_script(
+                    "return arguments[0].isConnected", element
+                )
+            except StaleElementReferenceException:
+                return True
+
+        return await self.wait_for(
+            is_stale, timeout=timeout, poll_frequency=poll_frequency
+        )
+
+    async def wait_for_stable(
+        self, element: AsyncWebElement, *, timeout: float = 5
+    ) -> AsyncWebElement:
+        result = await self._execute_async_script(
+            "waitForStable", element, self._wait_options(timeout)
+        )
+        if result.get("error") == "not actionable":
+            raise ElementNotInteractableException(
+                f"Element did not become stable within {timeout}s: {result['reason']}"
+            )
+        if result.get("error"):
+            raise JavascriptException(result.get("message"))
+        return element
+
+    async def wait_for_settled(
+        self, *, timeout: float = 5, idle_window: Optional[float] = None
+    ) -> None:
+        idle = idle_window if idle_window is not None else self.idle_window
+        result = await self._execute_async_script(
+            "settled",
+            {"timeout": timeout * 1000, "idle": (0.5 if idle is None else idle) * 1000},
+        )
+        if result.get("error"):
+            raise JavascriptException(result.get("message"))
+        if not result["done"]:
+            pending = result["pending"]
+            raise TimeoutException(
+                f"Page did not settle within {timeout}s: "
+                f"{pending['requests']} pending requests, {pending['timers']} pending timers"
+            )
+
+    async def log_testing_playground_url(
+        self, element: Optional[AsyncWebElement] = None
+    ) -> Optional[str]:
+        if element:
+            script_to_run = "return __stl__.logTestingPlaygroundURL(arguments[0])"
+        else:
+            script_to_run = "return __stl__.logTestingPlaygroundURL()"
+        url = await self._execute_script(script_to_run, element)
+
+        print(url)
+        return url
+
+
+async def _maybe_await(value: Any) -> Any:
+    return await value if inspect.isawaitable(value) else value
+
+
+class AsyncWithin(AsyncScreen):
+    def __init__(
+        self,
+        element: AsyncWebElement,
+        *,
+        idle_window: Optional[float] = None,
+        fast_forward: bool = False,
+        query_budget: Optional[float] = None,
+        slow_query_threshold: Optional[float] = None,
+    ):
+        super().__init__(
+            element.parent,
+            idle_window=idle_window,
+            fast_forward=fast_forward,
+            query_budget=query_budget,
+            slow_query_threshold=slow_query_threshold,
+        )
+        self.element = element
+        self._container = element
+
+    async def _native_find_elements(self, loc: locators.Locator) -> List[Any]:
+        self._round_trip()
+        return await self.element.find_elements(*loc)
+
+    async def _no_element_message(self, locator: Locator) -> str:
+        self._round_trip()
+        outer_html = await self.element.get_attribute("outerHTML")
+        return f"No element found with locator {locator}:\n{outer_html}"
+
+
+__all__ = ["AsyncScreen", "AsyncWebDriver", "AsyncWebElement", "AsyncWithin"]
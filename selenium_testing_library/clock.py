@@ -0,0 +1,36 @@
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from selenium.common.exceptions import JavascriptException
+
+if TYPE_CHECKING:
+    from .screen import Screen
+
+
+class Clock:
+    def __init__(self, screen: "Screen"):
+        self.screen = screen
+
+    def install(self, *, now: Optional[float] = None) -> None:
+        self.screen._execute_script(
+            "__stl__.clock.install(arguments[0])",
+            {"now": None if now is None else now * 1000},
+        )
+
+    def uninstall(self) -> None:
+        self.screen._execute_script("__stl__.clock.uninstall()")
+
+    def tick(self, seconds: float) -> int:
+        result = self._run("return __stl__.clock.tick(arguments[0])", seconds * 1000)
+        return result["pending"]
+
+    def run_all(self, *, limit: int = 1000) -> None:
+        self._run("return __stl__.clock.runAll(arguments[0])", {"limit": limit})
+
+    def _run(self, script: str, *args: Any) -> Dict[str, Any]:
+        result = self.screen._execute_script(script, *args)
+        if result.get("error"):
+            raise JavascriptException(result.get("message"))
+        return result
+
+
+__all__ = ["Clock"]
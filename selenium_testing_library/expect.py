@@ -0,0 +1,97 @@
+import difflib
+from typing import TYPE_CHECKING, Any, Optional
+
+from . import locators
+
+if TYPE_CHECKING:
+    from .screen import Screen
+
+
+def _diff(expected: Any, received: Any) -> str:
+    if received is None:
+        return f"- {expected!r}\n+ <no element found>"
+    if isinstance(expected, str) and isinstance(received, str):
+        if "\n" in expected or "\n" in received:
+            return "\n".join(
+                difflib.ndiff(expected.splitlines(), received.splitlines())
+            )
+    return f"- {expected!r}\n+ {received!r}"
+
+
+class Expect:
+    def __init__(
+        self,
+        screen: "Screen",
+        locator: locators.Locator,
+        *,
+        timeout: float = 5,
+        negate: bool = False,
+    ):
+        self.screen = screen
+        self.locator = locator
+        self.timeout = timeout
+        self.negate = negate
+
+    @property
+    def not_(self) -> "Expect":
+        return Expect(
+            self.screen, self.locator, timeout=self.timeout, negate=not self.negate
+        )
+
+    def to_have_text(self, text: str, *, exact: bool = True) -> None:
+        self._assert("text", text, "to have text", exact=exact)
+
+    def to_contain_text(self, text: str) -> None:
+        self._assert("text", text, "to contain text", exact=False)
+
+    def to_have_count(self, count: int) -> None:
+        self._assert("count", count, "to have count")
+
+    def to_have_value(self, value: str) -> None:
+        self._assert("value", value, "to have value")
+
+    def to_have_attribute(self, name: str, value: Optional[str] = None) -> None:
+        self._assert("attribute", value, f"to have attribute {name!r}", name=name)
+
+    def to_be_visible(self) -> None:
+        self._assert("visible", "visible", "to be visible")
+
+    def to_be_hidden(self) -> None:
+        self._assert("hidden", "hidden", "to be hidden")
+
+    def to_be_enabled(self) -> None:
+        self._assert("enabled", "enabled", "to be enabled")
+
+    def to_be_disabled(self) -> None:
+        self._assert("disabled", "disabled", "to be disabled")
+
+    def to_be_checked(self) -> None:
+        self._assert("checked", "checked", "to be checked")
+
+    def _assert(
+        self, assertion: str, expected: Any, description: str, **options: Any
+    ) -> None:
+        result = self.screen._execute_async_script(
+            "expect",
+            self.screen._container,
+            self.locator._js_spec(),
+            assertion,
+            expected,
+            self.screen._wait_options(self.timeout, negate=self.negate, **options),
+        )
+        self.screen._raise_for_error(self.locator, result)
+        if result["pass"]:
+            return
+
+        if self.negate:
+            raise AssertionError(
+                f"Expected {self.locator} not {description} (waited {self.timeout}s)\n\n"
+                f"Received: {result['actual']!r}"
+            )
+        raise AssertionError(
+            f"Expected {self.locator} {description} (waited {self.timeout}s)\n\n"
+            f"- Expected\n+ Received\n\n{_diff(expected, result['actual'])}"
+        )
+
+
+__all__ = ["Expect"]
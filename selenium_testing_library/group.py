@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from .screen import Locator, Screen
+
+T = TypeVar("T")
+
+
+# Every driver gets its own screen and is only used by one thread at a time. Results come back in the
+# order of the drivers and the drivers that failed hold the exception instead of a result, like `map()`
+class ScreenGroup:
+    def __init__(
+        self,
+        drivers: Sequence[WebDriver],
+        *,
+        max_workers: Optional[int] = None,
+        **options: Any,
+    ):
+        self.screens: List[Screen[WebDriver]] = [
+            Screen(driver, **options) for driver in drivers
+        ]
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(len(self.screens), 1),
+            thread_name_prefix="ScreenGroup",
+        )
+
+    @property
+    def drivers(self) -> List[WebDriver]:
+        return [screen.driver for screen in self.screens]
+
+    def __enter__(self) -> "ScreenGroup":
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def run(self, method: Callable[[Screen[WebDriver]], T]) -> List[Any]:
+        futures = [self._executor.submit(method, screen) for screen in self.screens]
+        results = []
+        for future in futures:
+            error = future.exception()
+            results.append(future.result() if error is None else error)
+        return results
+
+    def get_by(self, locator: Locator, **kwargs: Any) -> List[Any]:
+        return self.run(lambda screen: screen.get_by(locator, **kwargs))
+
+    def query_by(self, locator: Locator, **kwargs: Any) -> List[Any]:
+        return self.run(lambda screen: screen.query_by(locator, **kwargs))
+
+    def find_by(self, locator: Locator, **kwargs: Any) -> List[Any]:
+        return self.run(lambda screen: screen.find_by(locator, **kwargs))
+
+    def get_all_by(self, locator: Locator, **kwargs: Any) -> List[Any]:
+        return self.run(lambda screen: screen.get_all_by(locator, **kwargs))
+
+    def query_all_by(self, locator: Locator, **kwargs: Any) -> List[Any]:
+        return self.run(lambda screen: screen.query_all_by(locator, **kwargs))
+
+    def find_all_by(self, locator: Locator, **kwargs: Any) -> List[Any]:
+        return self.run(lambda screen: screen.find_all_by(locator, **kwargs))
+
+    def query_all_by_texts(self, texts: Iterable[str], **kwargs: Any) -> List[Any]:
+        texts = list(texts)
+        return self.run(lambda screen: screen.query_all_by_texts(texts, **kwargs))
+
+    def map(self, containers: Any, locator: Locator, **kwargs: Any) -> List[Any]:
+        return self.run(lambda screen: screen.map(containers, locator, **kwargs))
+
+    def errors(self, results: List[Any]) -> Dict[WebDriver, BaseException]:
+        return {
+            screen.driver: result
+            for screen, result in zip(self.screens, results)
+            if isinstance(result, BaseException)
+        }
+
+
+__all__ = ["ScreenGroup"]
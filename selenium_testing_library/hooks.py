@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from . import locators
+
+
+@dataclass
+class QueryEvent:
+    # "get", "query", "find" or "all" for queries, "wait" for every poll of a wait,
+    # "inject" when the helpers are added to the page and "message" when an error message is built
+    kind: str
+    locator: Optional[locators.Locator]
+    # Seconds since the epoch
+    start: float
+    # Everything below is in seconds, bytes or counts
+    duration: float = 0
+    round_trips: int = 0
+    script_bytes: int = 0
+    eval_time: Optional[float] = None
+    result_count: Optional[int] = None
+    polls: int = 0
+    # Set for find_by and find_all_by, which wait for the elements in Python or in the page
+    wait: bool = False
+    injected: bool = False
+    error: Optional[BaseException] = None
+    # Set when the event is also counted in the query it's part of
+    nested: bool = False
+    # "page", "frame", "all frames" or "element <id>" for queries within an element
+    container: Optional[str] = None
+
+    @property
+    def transport_time(self) -> float:
+        # Time that wasn't spent running the query in the page: WebDriver, the network and Python
+        return self.duration - (self.eval_time or 0)
+
+    def _add(self, event: "QueryEvent"):
+        self.round_trips += event.round_trips
+        self.script_bytes += event.script_bytes
+        self.injected = self.injected or event.injected
+        if event.eval_time is not None:
+            self.eval_time = (self.eval_time or 0) + event.eval_time
+        if event.kind == "wait":
+            self.polls += 1
+
+
+Hook = Callable[[QueryEvent], None]
+
+# Hooks that are called for the events of every screen
+_global_hooks: List[Hook] = []
+
+
+def add_hook(hook: Hook):
+    _global_hooks.append(hook)
+
+
+def remove_hook(hook: Hook):
+    _global_hooks.remove(hook)
+
+
+__all__ = ["QueryEvent", "add_hook", "remove_hook"]
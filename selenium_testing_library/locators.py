@@ -1,5 +1,6 @@
-import json
-from typing import Iterable, Optional, Union
+import copy
+import re
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple, Union
 
 from selenium.webdriver.common.by import By as SeleniumBy
 
@@ -24,8 +25,23 @@ class By:
     DISPLAY_VALUE = "display value"
 
 
+# Testing Library queries accept regex patterns wherever they accept text
+Matcher = Union[str, Pattern[str]]
+
+_js_regex_flags = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+
+
+def _js_value(value: Any) -> Any:
+    # Patterns are sent as source and flags and become a RegExp in the browser
+    if isinstance(value, Pattern):
+        flags = "".join(js for flag, js in _js_regex_flags if value.flags & flag)
+        return {"regex": value.pattern, "flags": flags}
+    return value
+
+
 class Locator:
     BY: str
+    _filters: Tuple[Dict[str, Any], ...] = ()
 
     def __init__(self, selector: str, *, exact: bool = True):
         self.selector = selector
@@ -36,7 +52,79 @@ class Locator:
         yield self.selector
 
     def __repr__(self):
-        return f"{self.__class__.__name__}('{self.selector}', exact={self.exact})"
+        return f"{self.__class__.__name__}('{self.selector}', exact={self.exact}){self._filters_repr()}"
+
+    def filter(
+        self,
+        *,
+        visible_only: bool = False,
+        enabled_only: bool = False,
+        attribute_equals: Optional[Dict[str, str]] = None,
+        attribute_contains: Optional[Dict[str, str]] = None,
+        has: Optional["Locator"] = None,
+    ) -> "Locator":
+        filters: List[Dict[str, Any]] = []
+        if visible_only:
+            filters.append({"type": "visible"})
+        if enabled_only:
+            filters.append({"type": "enabled"})
+        for name, value in (attribute_equals or {}).items():
+            filters.append({"type": "attribute", "name": name, "value": value})
+        for name, value in (attribute_contains or {}).items():
+            filters.append(
+                {"type": "attribute", "name": name, "value": value, "contains": True}
+            )
+        if has is not None:
+            filters.append({"type": "has", "has": has})
+        return self._with_filters(*filters)
+
+    def within(self, locator: "Locator") -> "Scoped":
+        return Scoped(self, locator)
+
+    def or_(self, *locators: "Locator") -> "Or":
+        return Or(self, *locators)
+
+    def nth(self, index: int) -> "Locator":
+        return self._with_filters({"type": "nth", "index": index})
+
+    def _with_filters(self, *filters: Dict[str, Any]) -> "Locator":
+        # Locators are never modified in place so they can be shared and reused
+        loc = copy.copy(self)
+        loc._filters = self._filters + filters
+        return loc
+
+    def _filters_repr(self) -> str:
+        res = ""
+        for f in self._filters:
+            if f["type"] == "visible":
+                res += ".filter(visible_only=True)"
+            elif f["type"] == "enabled":
+                res += ".filter(enabled_only=True)"
+            elif f["type"] == "attribute":
+                kind = "attribute_contains" if f.get("contains") else "attribute_equals"
+                res += f".filter({kind}={{{f['name']!r}: {f['value']!r}}})"
+            elif f["type"] == "has":
+                res += f".filter(has={f['has']!r})"
+            elif f["type"] == "nth":
+                res += f".nth({f['index']})"
+        return res
+
+    def _query_spec(self) -> Dict[str, Any]:
+        return {"by": self.BY, "value": self.selector}
+
+    def _js_spec(self) -> Dict[str, Any]:
+        spec = self._query_spec()
+        if "value" in spec:
+            spec["value"] = _js_value(spec["value"])
+        if "options" in spec:
+            spec["options"] = {k: _js_value(v) for k, v in spec["options"].items()}
+        if self._filters:
+            spec["filters"] = [
+                # Copies, so the locator stays untouched when it's shared between threads
+                {**f, "has": f["has"]._js_spec()} if "has" in f else dict(f)
+                for f in self._filters
+            ]
+        return spec
 
 
 class Css(Locator):
@@ -79,8 +167,8 @@ class Role(Locator):
         role: str,
         *,
         hidden: bool = False,
-        name: Optional[str] = None,
-        description: Optional[str] = None,
+        name: Optional[Matcher] = None,
+        description: Optional[Matcher] = None,
         selected: Optional[bool] = None,
         checked: Optional[bool] = None,
         pressed: Optional[bool] = None,
@@ -114,31 +202,24 @@ class Role(Locator):
     expanded={self.expanded},
     queryFallbacks={self.queryFallbacks},
     level={self.level},
-)"""
-
-    def _testing_library_js_str(self):
-        res = f"return __stl__.queryAllByRole(document, {json.dumps(self.role)}, {{ "
-        res += f"hidden: {json.dumps(self.hidden)},"
-        if self.name is not None:
-            res += f"name: {json.dumps(self.name)},"
-        if self.description is not None:
-            res += f"description: {json.dumps(self.description)},"
-        if self.selected is not None:
-            res += f"selected: {json.dumps(self.selected)},"
-        if self.checked is not None:
-            res += f"checked: {json.dumps(self.checked)},"
-        if self.pressed is not None:
-            res += f"pressed: {json.dumps(self.pressed)},"
-        if self.current is not None:
-            res += f"current: {json.dumps(self.current)},"
-        if self.expanded is not None:
-            res += f"expanded: {json.dumps(self.expanded)},"
-        if self.queryFallbacks is not None:
-            res += f"queryFallbacks: {json.dumps(self.queryFallbacks)},"
-        if self.level is not None:
-            res += f"level: {json.dumps(self.level)},"
-        res += "});"
-        return res
+){self._filters_repr()}"""
+
+    def _query_spec(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"hidden": self.hidden}
+        for option in (
+            "name",
+            "description",
+            "selected",
+            "checked",
+            "pressed",
+            "current",
+            "expanded",
+            "queryFallbacks",
+            "level",
+        ):
+            if getattr(self, option) is not None:
+                options[option] = getattr(self, option)
+        return {"by": self.BY, "value": self.role, "options": options}
 
 
 class Text(Locator):
@@ -146,7 +227,7 @@ class Text(Locator):
 
     def __init__(
         self,
-        text: str,
+        text: Matcher,
         *,
         selector: str = "*",
         exact: bool = True,
@@ -163,10 +244,18 @@ class Text(Locator):
     selector='{self.selector}',
     exact={self.exact},
     ignore='{self.ignore}',
-)"""
+){self._filters_repr()}"""
 
-    def _testing_library_js_str(self):
-        return f"return __stl__.queryAllByText(document, {json.dumps(self.text)}, {{selector: {json.dumps(self.selector)}, exact: {json.dumps(self.exact)}, ignore: {json.dumps(self.ignore)}}});"
+    def _query_spec(self) -> Dict[str, Any]:
+        return {
+            "by": self.BY,
+            "value": self.text,
+            "options": {
+                "selector": self.selector,
+                "exact": self.exact,
+                "ignore": self.ignore,
+            },
+        }
 
 
 class PlaceholderText(Locator):
@@ -174,7 +263,7 @@ class PlaceholderText(Locator):
 
     def __init__(
         self,
-        text: str,
+        text: Matcher,
         *,
         exact: bool = True,
     ):
@@ -182,10 +271,14 @@ class PlaceholderText(Locator):
         self.exact = exact
 
     def __repr__(self):
-        return f"{self.__class__.__name__}('{self.text}', exact={self.exact})"
+        return f"{self.__class__.__name__}('{self.text}', exact={self.exact}){self._filters_repr()}"
 
-    def _testing_library_js_str(self):
-        return f"return __stl__.queryAllByPlaceholderText(document, {json.dumps(self.text)}, {{exact: {json.dumps(self.exact)}}});"
+    def _query_spec(self) -> Dict[str, Any]:
+        return {
+            "by": self.BY,
+            "value": self.text,
+            "options": {"exact": self.exact},
+        }
 
 
 class LabelText(Locator):
@@ -193,7 +286,7 @@ class LabelText(Locator):
 
     def __init__(
         self,
-        text: str,
+        text: Matcher,
         *,
         selector: str = "*",
         exact: bool = True,
@@ -203,10 +296,14 @@ class LabelText(Locator):
         self.exact = exact
 
     def __repr__(self):
-        return f"{self.__class__.__name__}('{self.text}', selector={self.selector}, exact={self.exact})"
+        return f"{self.__class__.__name__}('{self.text}', selector={self.selector}, exact={self.exact}){self._filters_repr()}"
 
-    def _testing_library_js_str(self):
-        return f"return __stl__.queryAllByLabelText(document, {json.dumps(self.text)}, {{selector: {json.dumps(self.selector)}, exact: {json.dumps(self.exact)}}});"
+    def _query_spec(self) -> Dict[str, Any]:
+        return {
+            "by": self.BY,
+            "value": self.text,
+            "options": {"selector": self.selector, "exact": self.exact},
+        }
 
 
 class AltText(Locator):
@@ -214,7 +311,7 @@ class AltText(Locator):
 
     def __init__(
         self,
-        text: str,
+        text: Matcher,
         *,
         exact: bool = True,
     ):
@@ -222,10 +319,14 @@ class AltText(Locator):
         self.exact = exact
 
     def __repr__(self):
-        return f"{self.__class__.__name__}('{self.text}', exact={self.exact})"
+        return f"{self.__class__.__name__}('{self.text}', exact={self.exact}){self._filters_repr()}"
 
-    def _testing_library_js_str(self):
-        return f"return __stl__.queryAllByAltText(document, {json.dumps(self.text)}, {{exact: {json.dumps(self.exact)}}});"
+    def _query_spec(self) -> Dict[str, Any]:
+        return {
+            "by": self.BY,
+            "value": self.text,
+            "options": {"exact": self.exact},
+        }
 
 
 class Title(Locator):
@@ -233,7 +334,7 @@ class Title(Locator):
 
     def __init__(
         self,
-        title: str,
+        title: Matcher,
         *,
         exact: bool = True,
     ):
@@ -241,18 +342,22 @@ class Title(Locator):
         self.exact = exact
 
     def __repr__(self):
-        return f"{self.__class__.__name__}('{self.title}', exact={self.exact})"
+        return f"{self.__class__.__name__}('{self.title}', exact={self.exact}){self._filters_repr()}"
 
-    def _testing_library_js_str(self):
-        return f"return __stl__.queryAllByTitle(document, {json.dumps(self.title)}, {{exact: {json.dumps(self.exact)}}});"
+    def _query_spec(self) -> Dict[str, Any]:
+        return {
+            "by": self.BY,
+            "value": self.title,
+            "options": {"exact": self.exact},
+        }
 
 
 class TestId(Locator):
-    BY = By.TITLE
+    BY = By.TEST_ID
 
     def __init__(
         self,
-        text: str,
+        text: Matcher,
         *,
         exact: bool = True,
     ):
@@ -260,10 +365,14 @@ class TestId(Locator):
         self.exact = exact
 
     def __repr__(self):
-        return f"{self.__class__.__name__}('{self.text}', exact={self.exact})"
+        return f"{self.__class__.__name__}('{self.text}', exact={self.exact}){self._filters_repr()}"
 
-    def _testing_library_js_str(self):
-        return f"return __stl__.queryAllByTestId(document, {json.dumps(self.text)}, {{exact: {json.dumps(self.exact)}}});"
+    def _query_spec(self) -> Dict[str, Any]:
+        return {
+            "by": self.BY,
+            "value": self.text,
+            "options": {"exact": self.exact},
+        }
 
 
 class DisplayValue(Locator):
@@ -271,7 +380,7 @@ class DisplayValue(Locator):
 
     def __init__(
         self,
-        value: str,
+        value: Matcher,
         *,
         exact: bool = True,
     ):
@@ -279,10 +388,48 @@ class DisplayValue(Locator):
         self.exact = exact
 
     def __repr__(self):
-        return f"{self.__class__.__name__}('{self.value}', exact={self.exact})"
+        return f"{self.__class__.__name__}('{self.value}', exact={self.exact}){self._filters_repr()}"
+
+    def _query_spec(self) -> Dict[str, Any]:
+        return {
+            "by": self.BY,
+            "value": self.value,
+            "options": {"exact": self.exact},
+        }
+
+
+class Scoped(Locator):
+    BY = "within"
+
+    def __init__(self, outer: Locator, inner: Locator):
+        self.outer = outer
+        self.inner = inner
+
+    def __repr__(self):
+        return f"{self.outer!r}.within({self.inner!r}){self._filters_repr()}"
+
+    def _query_spec(self) -> Dict[str, Any]:
+        return {
+            "by": self.BY,
+            "outer": self.outer._js_spec(),
+            "inner": self.inner._js_spec(),
+        }
+
+
+class Or(Locator):
+    BY = "or"
+
+    def __init__(self, *locators: Locator):
+        if len(locators) < 2:
+            raise ValueError(f"Or needs at least two locators, got {len(locators)}")
+        self.locators = locators
+
+    def __repr__(self):
+        first, *rest = self.locators
+        return f"{first!r}.or_({', '.join(repr(loc) for loc in rest)}){self._filters_repr()}"
 
-    def _testing_library_js_str(self):
-        return f"return __stl__.queryAllByDisplayValue(document, {json.dumps(self.value)}, {{exact: {json.dumps(self.exact)}}});"
+    def _query_spec(self) -> Dict[str, Any]:
+        return {"by": self.BY, "locators": [loc._js_spec() for loc in self.locators]}
 
 
 LocatorType = Union[
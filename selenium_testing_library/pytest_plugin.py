@@ -0,0 +1,306 @@
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+from urllib.parse import urlsplit
+
+import pytest  # type: ignore
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from .hooks import QueryEvent, add_hook, remove_hook
+from .screen import Screen, Within
+from .trace import locator_name
+
+browsers = ("chrome", "firefox", "edge")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("selenium-testing-library")
+    group.addoption(
+        "--stl-browser",
+        choices=browsers,
+        default="chrome",
+        help="Browser used by the screen fixture (default: chrome)",
+    )
+    group.addoption(
+        "--stl-headless",
+        action="store_true",
+        help="Run the browser used by the screen fixture in headless mode",
+    )
+    group.addoption(
+        "--stl-profile",
+        type=int,
+        metavar="N",
+        default=None,
+        help="Show the N slowest locators and the N tests with the most round trips (N=0 for all)",
+    )
+    group.addoption(
+        "--stl-profile-json",
+        metavar="PATH",
+        default=None,
+        help="Write the query profile of every test to a JSON file",
+    )
+
+
+def pytest_configure(config):
+    if (
+        config.getoption("--stl-profile") is not None
+        or config.getoption("--stl-profile-json") is not None
+    ):
+        config.pluginmanager.register(QueryProfile(config), "stl_profile")
+
+
+def create_driver(browser: str, *, headless: bool = False) -> WebDriver:
+    if browser == "firefox":
+        firefox_options = webdriver.FirefoxOptions()
+        if headless:
+            firefox_options.add_argument("-headless")
+        return webdriver.Firefox(options=firefox_options)
+    if browser == "edge":
+        edge_options = webdriver.EdgeOptions()
+        if headless:
+            edge_options.add_argument("headless")
+        return webdriver.Edge(options=edge_options)
+    chrome_options = webdriver.ChromeOptions()
+    if headless:
+        chrome_options.add_argument("headless")
+    return webdriver.Chrome(options=chrome_options)
+
+
+clear_storage_script = """
+try { localStorage.clear(); sessionStorage.clear() } catch (e) {}
+return location.origin
+"""
+
+
+def _origin(url: str) -> Optional[str]:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _visited_origins(execute_cdp_cmd: Callable[..., Any]) -> Set[str]:
+    # The pages the window navigated through and the frames of the current one
+    urls = [
+        entry["url"]
+        for entry in execute_cdp_cmd("Page.getNavigationHistory", {})["entries"]
+    ]
+    frames = [execute_cdp_cmd("Page.getFrameTree", {})["frameTree"]]
+    while frames:
+        frame = frames.pop()
+        urls.append(frame["frame"]["url"])
+        frames.extend(frame.get("childFrames", []))
+    return {origin for origin in map(_origin, urls) if origin}
+
+
+def reset_driver(driver: WebDriver):
+    # Much cheaper than starting a new browser, the next test starts from an empty page without any state.
+    # Every window's page gets its storage cleared. Chromium browsers also clear every origin the
+    # windows went through, other browsers can't tell which origins were visited before.
+    execute_cdp_cmd = getattr(driver, "execute_cdp_cmd", None)
+    origins: Set[str] = set()
+    handles = driver.window_handles
+    for handle in reversed(handles):
+        driver.switch_to.window(handle)
+        origin = driver.execute_script(clear_storage_script)
+        if origin and origin != "null":
+            origins.add(origin)
+        if execute_cdp_cmd is not None:
+            origins |= _visited_origins(execute_cdp_cmd)
+        if handle != handles[0]:
+            driver.close()
+    driver.switch_to.window(handles[0])
+    if execute_cdp_cmd is None:
+        driver.delete_all_cookies()
+    else:
+        execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origin in sorted(origins):
+            execute_cdp_cmd(
+                "Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"}
+            )
+    driver.get("about:blank")
+
+
+class BrowserPool:
+    # Every xdist worker is its own process and gets its own pool, so sessions are never shared between workers
+    def __init__(self, factory: Callable[[], WebDriver]):
+        self.factory = factory
+        self.drivers: List[WebDriver] = []
+        self._idle: List[WebDriver] = []
+
+    def acquire(self) -> WebDriver:
+        if self._idle:
+            return self._idle.pop()
+        driver = self.factory()
+        Screen(driver).preload()
+        self.drivers.append(driver)
+        return driver
+
+    def release(self, driver: WebDriver):
+        try:
+            reset_driver(driver)
+        except WebDriverException:
+            # The browser crashed or hangs, the next test gets a new one
+            self.drivers.remove(driver)
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+            return
+        self._idle.append(driver)
+
+    def close(self):
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+        self.drivers = []
+        self._idle = []
+
+
+@pytest.fixture(scope="session")
+def stl_driver_factory(request) -> Callable[[], WebDriver]:
+    browser = request.config.getoption("--stl-browser")
+    headless = request.config.getoption("--stl-headless")
+    return lambda: create_driver(browser, headless=headless)
+
+
+@pytest.fixture(scope="session")
+def stl_browser_pool(stl_driver_factory) -> Iterator[BrowserPool]:
+    pool = BrowserPool(stl_driver_factory)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def stl_driver(stl_browser_pool: BrowserPool) -> Iterator[WebDriver]:
+    driver = stl_browser_pool.acquire()
+    yield driver
+    stl_browser_pool.release(driver)
+
+
+@pytest.fixture
+def screen(stl_driver: WebDriver) -> Screen[WebDriver]:
+    return Screen(stl_driver)
+
+
+@pytest.fixture
+def within() -> Callable[..., Within]:
+    def within(element: WebElement, **options: Any) -> Within:
+        return Within(element, **options)
+
+    return within
+
+
+def _new_test_profile() -> Dict[str, Any]:
+    return {
+        "queries": 0,
+        "round_trips": 0,
+        "injections": 0,
+        "query_time": 0.0,
+        "wait_time": 0.0,
+        "locators": {},
+    }
+
+
+class QueryProfile:
+    # Collects the query events of every test. xdist workers send their profiles to the main process
+    # when they finish, the same way they send coverage data
+    def __init__(self, config: Any):
+        self.config = config
+        self.tests: Dict[str, Dict[str, Any]] = {}
+        self._current: Optional[Dict[str, Any]] = None
+        add_hook(self.record)
+
+    def record(self, event: QueryEvent):
+        test = self._current
+        if test is None:
+            return
+        if event.kind == "inject":
+            test["injections"] += 1
+        if event.nested:
+            return
+        test["round_trips"] += event.round_trips
+        if event.kind in ("find", "wait") or event.polls:
+            test["wait_time"] += event.duration
+        if event.kind in ("get", "query", "find", "all"):
+            test["queries"] += 1
+            test["query_time"] += event.duration
+            stats = test["locators"].setdefault(
+                locator_name(repr(event.locator)),
+                {"count": 0, "total": 0.0, "max": 0.0},
+            )
+            stats["count"] += 1
+            stats["total"] += event.duration
+            stats["max"] = max(stats["max"], event.duration)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        self._current = self.tests[item.nodeid] = _new_test_profile()
+        yield
+        self._current = None
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node):
+        self.tests.update(getattr(node, "workeroutput", {}).get("stl_profile", {}))
+
+    def locators(self) -> Dict[str, Dict[str, Any]]:
+        locators: Dict[str, Dict[str, Any]] = {}
+        for test in self.tests.values():
+            for name, stats in test["locators"].items():
+                total = locators.setdefault(
+                    name, {"count": 0, "total": 0.0, "max": 0.0}
+                )
+                total["count"] += stats["count"]
+                total["total"] += stats["total"]
+                total["max"] = max(total["max"], stats["max"])
+        return locators
+
+    def pytest_terminal_summary(self, terminalreporter):
+        limit = self.config.getoption("--stl-profile")
+        if limit is None or not self.tests:
+            return
+        limit = limit or None
+
+        terminalreporter.write_sep("=", "slowest locators")
+        locators = sorted(
+            self.locators().items(), key=lambda item: item[1]["total"], reverse=True
+        )
+        for name, stats in locators[:limit]:
+            terminalreporter.write_line(
+                f"{stats['total']:8.2f}s total {stats['max']:8.2f}s max "
+                f"{stats['count']:6} queries  {name}"
+            )
+
+        terminalreporter.write_sep("=", "most WebDriver round trips")
+        tests = sorted(
+            self.tests.items(), key=lambda item: item[1]["round_trips"], reverse=True
+        )
+        for nodeid, test in tests[:limit]:
+            terminalreporter.write_line(
+                f"{test['round_trips']:6} round trips {test['injections']:4} injections "
+                f"{test['wait_time']:8.2f}s waiting  {nodeid}"
+            )
+
+        query_time = sum(test["query_time"] for test in self.tests.values())
+        wait_time = sum(test["wait_time"] for test in self.tests.values())
+        injections = sum(test["injections"] for test in self.tests.values())
+        terminalreporter.write_line(
+            f"\n{query_time:.2f}s in queries, {wait_time:.2f}s of it waiting, "
+            f"{injections} injections in {len(self.tests)} tests"
+        )
+
+    def pytest_sessionfinish(self):
+        remove_hook(self.record)
+        if hasattr(self.config, "workerinput"):
+            self.config.workeroutput["stl_profile"] = self.tests
+            return
+        path = self.config.getoption("--stl-profile-json")
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(
+                    {"tests": self.tests, "locators": self.locators()}, f, indent=2
+                )
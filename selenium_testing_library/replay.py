@@ -0,0 +1,349 @@
+import gzip
+import json
+from typing import IO, Any, Callable, Dict, List, Optional, TypeVar
+
+from selenium.common import exceptions
+from selenium.webdriver.remote.webelement import WebElement
+
+from . import locators
+from .screen import testing_library
+
+T = TypeVar("T")
+
+
+class ReplayMismatchError(AssertionError): ...
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t")  # type: ignore
+    return open(path, mode)
+
+
+class RecordedElement:
+    # Wraps the elements returned by the driver so the queries made within them are recorded too.
+    # Everything else, like `click()` or `text`, goes straight to the element.
+    def __init__(self, recorder: "RecordingFinder", element: WebElement):
+        self.parent = recorder
+        self.element = element
+
+    @property
+    def id(self) -> str:
+        return self.element.id
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RecordedElement) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.element, name)
+
+    def find_elements(self, by: str, value: Optional[str] = None) -> List[Any]:
+        return self.parent._call(
+            "find_elements", self, None, [by, value], self.element.find_elements
+        )
+
+    def get_attribute(self, name: str) -> Any:
+        return self.parent._call(
+            "get_attribute", self, None, [name], self.element.get_attribute
+        )
+
+    def polling(self, method: Callable[[Any], T]) -> Callable[[Any], T]:
+        return self.parent.polling(method)
+
+
+class _Polls:
+    # Screen wraps the polls of its waits with polling(), the calls they make are marked so the replay
+    # knows which ones may be repeated or skipped
+    _polling = False
+
+    def polling(self, method: Callable[[Any], T]) -> Callable[[Any], T]:
+        def poll(driver: Any) -> T:
+            polling, self._polling = self._polling, True
+            try:
+                return method(driver)
+            finally:
+                self._polling = polling
+
+        return poll
+
+    def _key(self, method: str) -> Dict[str, Any]:
+        call: Dict[str, Any] = {"method": method}
+        if self._polling:
+            call["poll"] = True
+        return call
+
+
+class RecordingFinder(_Polls):
+    # Runs everything on the driver and records the scripts, element lookups and their responses
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.calls: List[Dict[str, Any]] = []
+        self.scripts: List[str] = []
+        self._script_index: Dict[str, int] = {}
+        self._element_index: Dict[str, int] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        # Navigation and everything else Screen doesn't need isn't recorded
+        return getattr(self.driver, name)
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        return self._call(
+            "execute_script", None, script, list(args), self.driver.execute_script
+        )
+
+    def execute_async_script(self, script: str, *args: Any) -> Any:
+        return self._call(
+            "execute_async_script",
+            None,
+            script,
+            list(args),
+            self.driver.execute_async_script,
+        )
+
+    def find_elements(
+        self, by: str = locators.By.ID, value: Optional[str] = None
+    ) -> List[Any]:
+        return self._call(
+            "find_elements", None, None, [by, value], self.driver.find_elements
+        )
+
+    def _call(
+        self,
+        method: str,
+        target: Optional[RecordedElement],
+        script: Optional[str],
+        args: List[Any],
+        run: Callable[..., Any],
+    ) -> Any:
+        call = self._key(method)
+        if target is not None:
+            call["target"] = self._encode(target)
+        if script is not None:
+            call.update(_script_key(script, self._add_script))
+        call["args"] = self._encode(args)
+        self.calls.append(call)
+        real_args = _unwrap(args)
+        try:
+            result = run(script, *real_args) if script is not None else run(*real_args)
+        except exceptions.WebDriverException as e:
+            call["error"] = {"type": type(e).__name__, "message": e.msg}
+            raise
+        call["result"] = self._encode(result)
+        return self._wrap(result)
+
+    def _add_script(self, script: str) -> int:
+        if script not in self._script_index:
+            self._script_index[script] = len(self.scripts)
+            self.scripts.append(script)
+        return self._script_index[script]
+
+    def _encode(self, value: Any) -> Any:
+        if isinstance(value, (WebElement, RecordedElement)):
+            index = self._element_index.setdefault(value.id, len(self._element_index))
+            return {"$element": index}
+        if isinstance(value, dict):
+            return {key: self._encode(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        return value
+
+    def _wrap(self, value: Any) -> Any:
+        if isinstance(value, WebElement):
+            return RecordedElement(self, value)
+        if isinstance(value, dict):
+            return {key: self._wrap(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        return value
+
+    def save(self, path: str):
+        with _open(path, "w") as f:
+            json.dump(
+                {"version": 1, "scripts": self.scripts, "calls": self.calls},
+                f,
+                separators=(",", ":"),
+            )
+
+
+def _script_key(script: str, add_script: Callable[[str], int]) -> Dict[str, Any]:
+    # The bundle is left out so recordings stay small and keep working after it's rebuilt
+    bundle = script.startswith(f"{testing_library};")
+    if bundle:
+        script = script[len(testing_library) + 1 :]
+    return {"script": add_script(script), "bundle": bundle}
+
+
+def _unwrap(value: Any) -> Any:
+    if isinstance(value, RecordedElement):
+        return value.element
+    if isinstance(value, dict):
+        return {key: _unwrap(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_unwrap(item) for item in value]
+    return value
+
+
+class ReplayElement:
+    # Stands in for an element of the recording
+    def __init__(self, replay: "ReplayFinder", index: int):
+        self.parent = replay
+        self.index = index
+        self.id = f"element-{index}"
+
+    def __repr__(self) -> str:
+        return f"<ReplayElement {self.index}>"
+
+    def find_elements(self, by: str, value: Optional[str] = None) -> List[Any]:
+        return self.parent._replay("find_elements", self, None, [by, value])
+
+    def get_attribute(self, name: str) -> Any:
+        return self.parent._replay("get_attribute", self, None, [name])
+
+    def polling(self, method: Callable[[Any], T]) -> Callable[[Any], T]:
+        return self.parent.polling(method)
+
+
+class ReplayFinder(_Polls):
+    # Answers the calls of a recording in order, without a browser. A call that doesn't match the
+    # recording, or is made more often than during the recording, raises ReplayMismatchError. Only the
+    # polls of a wait can differ: a wait that polls more often than during the recording gets the last
+    # response again and one that polls less skips the extra ones.
+    def __init__(self, recording: Dict[str, Any]):
+        self.scripts: List[str] = recording["scripts"]
+        self.calls: List[Dict[str, Any]] = recording["calls"]
+        self.position = 0
+        self._elements: Dict[int, ReplayElement] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayFinder":
+        with _open(path, "r") as f:
+            return cls(json.load(f))
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        return self._replay("execute_script", None, script, list(args))
+
+    def execute_async_script(self, script: str, *args: Any) -> Any:
+        return self._replay("execute_async_script", None, script, list(args))
+
+    def find_elements(
+        self, by: str = locators.By.ID, value: Optional[str] = None
+    ) -> List[Any]:
+        return self._replay("find_elements", None, None, [by, value])
+
+    def assert_done(self):
+        position = self._skip_polls()
+        if position < len(self.calls):
+            raise ReplayMismatchError(
+                f"{len(self.calls) - position} recorded calls were not made, "
+                f"the next one is {self._describe(self.calls[position])}"
+            )
+
+    def _replay(
+        self,
+        method: str,
+        target: Optional[ReplayElement],
+        script: Optional[str],
+        args: List[Any],
+    ) -> Any:
+        call = self._key(method)
+        if target is not None:
+            call["target"] = self._encode(target)
+        if script is not None:
+            call.update(_script_key(script, self._script_number))
+        call["args"] = self._encode(args)
+
+        recorded = self._next(call)
+        if "error" in recorded:
+            error = recorded["error"]
+            exception = getattr(
+                exceptions, error["type"], exceptions.WebDriverException
+            )
+            raise exception(error["message"])
+        return self._decode(recorded["result"])
+
+    def _next(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        for position in (self.position, self._skip_polls()):
+            if position < len(self.calls) and _same_call(self.calls[position], call):
+                self.position = position + 1
+                return self.calls[position]
+        previous = self.calls[self.position - 1] if self.position else None
+        if previous is not None and "poll" in previous and _same_call(previous, call):
+            # The recording polled less often, the extra poll gets the last response again
+            return previous
+        expected = (
+            self._describe(self.calls[self.position])
+            if self.position < len(self.calls)
+            else "the end of the recording"
+        )
+        raise ReplayMismatchError(
+            f"Call {self.position} doesn't match the recording:\n"
+            f"  expected {expected}\n"
+            f"  received {self._describe(call)}"
+        )
+
+    def _skip_polls(self) -> int:
+        # Where the recording continues if it polled more often, after the polls repeating the last one
+        position = self.position
+        if position:
+            previous = self.calls[position - 1]
+            while (
+                position < len(self.calls)
+                and "poll" in self.calls[position]
+                and _same_call(self.calls[position], previous)
+            ):
+                position += 1
+        return position
+
+    def _script_number(self, script: str) -> Any:
+        # Unknown scripts are kept as text so they can be shown in the error
+        try:
+            return self.scripts.index(script)
+        except ValueError:
+            return script
+
+    def _describe(self, call: Dict[str, Any]) -> str:
+        description = call["method"]
+        if "target" in call:
+            description += f" on element {call['target']['$element']}"
+        if "script" in call:
+            script = call["script"]
+            if isinstance(script, int):
+                script = self.scripts[script]
+            description += f" {' '.join(script.split())[:200]!r}"
+            if call.get("bundle"):
+                description += " with the bundle"
+        return f"{description} with arguments {json.dumps(call['args'])[:500]}"
+
+    def _encode(self, value: Any) -> Any:
+        if isinstance(value, ReplayElement):
+            return {"$element": value.index}
+        if isinstance(value, dict):
+            return {key: self._encode(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        return value
+
+    def _decode(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if set(value) == {"$element"}:
+                index = value["$element"]
+                if index not in self._elements:
+                    self._elements[index] = ReplayElement(self, index)
+                return self._elements[index]
+            return {key: self._decode(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        return value
+
+
+def _same_call(recorded: Dict[str, Any], call: Dict[str, Any]) -> bool:
+    return all(
+        recorded.get(key) == call.get(key)
+        for key in ("method", "target", "script", "bundle", "args", "poll")
+    )
+
+
+__all__ = ["RecordingFinder", "ReplayFinder", "ReplayMismatchError"]
@@ -1,37 +1,77 @@
+import functools
+import time
+import warnings
+import weakref
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from pathlib import Path
 from typing import (
     Any,
     Callable,
+    Dict,
     Generic,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Protocol,
+    Sequence,
+    Tuple,
     TypeVar,
     Union,
     cast,
 )
 
 from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    JavascriptException,
     NoSuchElementException,
     TimeoutException,
     WebDriverException,
 )
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.select import Select
 from selenium.webdriver.support.ui import WebDriverWait
 
 from . import locators
+from .clock import Clock
+from .expect import Expect
+from .hooks import Hook, QueryEvent, _global_hooks
+from .snapshot import Snapshot, SnapshotNode
+from .trace import TraceWriter
 
 testing_library = (Path(__file__).parent / Path("main.js")).read_text()
 
 Locator = locators.LocatorType
 
+# Calls an async `__stl__` function with the script arguments and reports rejections back to Python
+async_script = """const done = arguments[arguments.length - 1];
+__stl__.{}.apply(null, Array.prototype.slice.call(arguments, 0, -1)).then(
+    done, (e) => done({{
+        error: e.name === "QueryBudgetExceeded" ? "budget" : "exception",
+        message: String(e),
+    }})
+);"""
+
+# Added to the wait's timeout so the page reports a timeout before the driver's script timeout hits
+script_timeout_margin = 5
+# The script timeout of every driver, as far as this library knows
+_script_timeouts: "weakref.WeakKeyDictionary[Any, float]" = weakref.WeakKeyDictionary()
+
 T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
 
 
 class MultipleSuchElementsException(WebDriverException): ...
 
 
+class QueryBudgetExceededException(TimeoutException): ...
+
+
+class SlowQueryWarning(UserWarning): ...
+
+
 by_to_locator = {
     locators.By.CLASS_NAME: locators.ClassName,
     locators.By.CSS_SELECTOR: locators.Css,
@@ -48,6 +88,76 @@ by_to_locator = {
     locators.By.ALT_TEXT: locators.AltText,
 }
 
+selenium_locators = (
+    locators.Css,
+    locators.XPath,
+    locators.Id,
+    locators.Name,
+    locators.TagName,
+    locators.LinkText,
+    locators.PartialLinkText,
+    locators.ClassName,
+)
+
+
+def _is_selenium_query(locator: locators.Locator) -> bool:
+    # Selenium can run native locators itself unless they need filtering in the page
+    return isinstance(locator, selenium_locators) and not locator._filters
+
+
+@contextmanager
+def _switched_to(driver: Any, frames: Sequence[WebElement]) -> Iterator[None]:
+    switched = 0
+    try:
+        for frame in frames:
+            driver.switch_to.frame(frame)
+            switched += 1
+        yield
+    finally:
+        for _ in range(switched):
+            driver.switch_to.parent_frame()
+
+
+def _bundle_missing(error: WebDriverException) -> bool:
+    # Chromium and Firefox say `__stl__ is not defined`, Safari `Can't find variable: __stl__`
+    message = error.msg or ""
+    return "__stl__" in message and (
+        "not defined" in message or "find variable" in message
+    )
+
+
+def _describe_container(container: Any) -> str:
+    if container is None:
+        return "page"
+    if isinstance(container, dict):
+        return "frame" if container["kind"] == "frame" else "all frames"
+    return f"element {container.id}"
+
+
+def _count(value: Any) -> int:
+    if isinstance(value, list):
+        return len(value)
+    return 0 if value is None or value is False else 1
+
+
+def _observed(kind: str, *, wait: bool = False) -> Callable[[F], F]:
+    # Reports the query to the hooks. Without hooks, or when the query is part of another one, the
+    # method is called directly so there's no overhead
+    def decorator(method: F) -> F:
+        @functools.wraps(method)
+        def wrapper(self: "Screen", locator: Locator, *args: Any, **kwargs: Any):
+            if self._event is not None or not (_global_hooks or self._hooks):
+                return method(self, locator, *args, **kwargs)
+            with self._observe(kind, locator) as event:
+                event.wait = wait
+                result = method(self, locator, *args, **kwargs)
+                event.result_count = _count(result)
+                return result
+
+        return cast(F, wrapper)
+
+    return decorator
+
 
 class ElementsFinder(Protocol):
     def find_elements(
@@ -56,38 +166,169 @@ class ElementsFinder(Protocol):
 
     def execute_script(self, script: str, *args) -> List[WebElement]: ...
 
-
-DriverType = TypeVar("DriverType", bound=ElementsFinder)
+    def execute_async_script(self, script: str, *args) -> Any: ...
 
 
-class Screen(Generic[DriverType]):
-    def __init__(self, driver: DriverType):
-        self.driver = driver
-        self._finder: ElementsFinder = driver
-
-    def _find_elements(self, locator: Locator) -> List[WebElement]:
-        loc = self._ensure_locator(locator)
-        if not isinstance(
+DriverType = TypeVar("DriverType", bound=ElementsFinder)
+ScreenType = TypeVar("ScreenType", bound="_BaseScreen")
+# What the queries of a screen return, see _BaseScreen
+ElementType = TypeVar("ElementType")
+OptionalElementType = TypeVar("OptionalElementType")
+ElementListType = TypeVar("ElementListType")
+
+
+class _BaseScreen(ABC, Generic[ElementType, OptionalElementType, ElementListType]):
+    # What Screen and AsyncScreen share: options, hooks, error handling and the query shortcuts.
+    # Screen's queries return elements, AsyncScreen's return awaitables of them
+    _container: Any = None
+    _frame_path: Sequence[WebElement] = ()
+    _hooks: Sequence[Hook] = ()
+    # The event of the query that is running, round trips are added to it
+    _event: Optional[QueryEvent] = None
+
+    def _configure(
+        self,
+        *,
+        idle_window: Optional[float],
+        fast_forward: bool,
+        query_budget: Optional[float],
+        slow_query_threshold: Optional[float],
+    ):
+        self.idle_window = idle_window
+        self.fast_forward = fast_forward
+        self.query_budget = query_budget
+        self.slow_query_threshold = slow_query_threshold
+
+    def _options(self) -> Dict[str, Any]:
+        # Screens created from this one behave the same way
+        return {
+            "idle_window": self.idle_window,
+            "fast_forward": self.fast_forward,
+            "query_budget": self.query_budget,
+            "slow_query_threshold": self.slow_query_threshold,
+        }
+
+    def _prelude(self) -> str:
+        # Runs before every script so the page is set up again after navigating
+        return "__stl__.fastForward();" if self.fast_forward else ""
+
+    def add_hook(self, hook: Hook):
+        self._hooks = [*self._hooks, hook]
+
+    def remove_hook(self, hook: Hook):
+        hooks = list(self._hooks)
+        hooks.remove(hook)
+        self._hooks = hooks
+
+    def _has_hooks(self) -> bool:
+        return bool(_global_hooks or self._hooks)
+
+    def _share_hooks(self, screen: "ScreenType") -> "ScreenType":
+        # Screens created from this one report to the same hooks
+        screen._hooks = self._hooks
+        return screen
+
+    @contextmanager
+    def _observe(
+        self, kind: str, locator: Optional[Locator] = None
+    ) -> Iterator[QueryEvent]:
+        parent = self._event
+        if locator is not None:
+            loc: Optional[locators.Locator] = self._ensure_locator(locator)
+        else:
+            loc = parent.locator if parent else None
+        event = QueryEvent(
+            kind,
             loc,
-            (
-                locators.Role,
-                locators.Text,
-                locators.PlaceholderText,
-                locators.LabelText,
-                locators.AltText,
-                locators.Title,
-                locators.TestId,
-                locators.DisplayValue,
-            ),
-        ):
-            return self._finder.find_elements(*loc)
-        script_to_run = loc._testing_library_js_str()
+            time.time(),
+            nested=parent is not None,
+            container=_describe_container(self._container),
+        )
+        self._event = event
+        start = time.perf_counter()
         try:
-            # Optimistically run the query, if __stl__ isn't defined on the page we'll get a JavaScript exception
-            return self._finder.execute_script(script_to_run)
-        except WebDriverException:
-            # We assume that the error was `__stl__ is not defined` so we add __stl__ to the DOM and run the command again
-            return self._finder.execute_script(f"{testing_library};{script_to_run}")
+            yield event
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            event.duration = time.perf_counter() - start
+            self._event = parent
+            if parent is not None:
+                parent._add(event)
+            for hook in (*_global_hooks, *self._hooks):
+                hook(event)
+
+    def _round_trip(self, script: str = ""):
+        if self._event is not None:
+            self._event.round_trips += 1
+            self._event.script_bytes += len(script)
+
+    def _budget(self, query_budget: Optional[float]) -> Optional[float]:
+        return self.query_budget if query_budget is None else query_budget
+
+    def _check_query_time(
+        self, loc: locators.Locator, result: Dict[str, Any], budget: Optional[float]
+    ) -> List[Any]:
+        elapsed = result["time"] / 1000
+        if self._event is not None:
+            self._event.eval_time = (self._event.eval_time or 0) + elapsed
+        if result.get("error") == "budget":
+            raise QueryBudgetExceededException(
+                f"Query with locator {loc} was aborted after {elapsed:.3f}s"
+                + ("" if budget is None else f", its budget is {budget}s")
+            )
+        if (
+            self.slow_query_threshold is not None
+            and elapsed > self.slow_query_threshold
+        ):
+            warnings.warn(
+                f"Query with locator {loc} took {elapsed:.3f}s",
+                SlowQueryWarning,
+                stacklevel=5,
+            )
+        return result["elements"]
+
+    def _wait_options(
+        self, timeout: float, *, query_budget: Optional[float] = None, **options: Any
+    ) -> Dict[str, Any]:
+        idle = None if self.idle_window is None else self.idle_window * 1000
+        budget = self._budget(query_budget)
+        return {
+            "timeout": timeout * 1000,
+            "idle": idle,
+            "budget": None if budget is None else budget * 1000,
+            **options,
+        }
+
+    def _raise_for_error(self, locator: locators.Locator, result: Dict[str, Any]):
+        # "missing" and "multiple" need the screen's error messages, so the screens handle them first
+        error = result.get("error")
+        if not error:
+            return
+        if error == "option":
+            raise NoSuchElementException(
+                f"No option {result['option']!r} found for locator {locator}"
+            )
+        if error == "value":
+            raise TypeError(
+                f"Element found with locator {locator} is a checkbox or radio, "
+                f"its value has to be True or False, not {result['value']!r}"
+            )
+        if error == "send keys":
+            raise TypeError(
+                f"Element found with locator {locator} is a {result['kind']}, "
+                "it can't be filled with send_keys"
+            )
+        if error == "not actionable":
+            raise ElementNotInteractableException(
+                f"Element found with locator {locator} is not actionable: {result['reason']}"
+            )
+        if error == "budget":
+            raise QueryBudgetExceededException(
+                f"Query with locator {locator} exceeded its time budget"
+            )
+        raise JavascriptException(result.get("message"))
 
     def _ensure_locator(self, locator: Locator) -> locators.Locator:
         if isinstance(locator, locators.Locator):
@@ -95,72 +336,64 @@ class Screen(Generic[DriverType]):
         by, selector = locator
         return by_to_locator[by](selector)
 
-    def get_by(self, locator: Locator) -> WebElement:
-        els = self._find_elements(locator)
-
-        if not els:
-            raise NoSuchElementException(self._get_no_element_message(locator))
-
-        if len(els) > 1:
-            raise MultipleSuchElementsException(
-                self._get_multiple_elements_message(locator, els)
+    def _fill_entries(
+        self, values: Dict[str, Any], send_keys: Union[bool, str, Iterable[str]]
+    ) -> List[List[Any]]:
+        # [label, value, whether the field is typed into with send_keys() instead]
+        if isinstance(send_keys, str):
+            send_keys = [send_keys]
+        native = set(values) if send_keys is True else set(send_keys or ())
+        unknown = native - set(values)
+        if unknown:
+            raise ValueError(
+                f"send_keys lists fields that aren't being filled: {sorted(unknown)}"
             )
+        return [[label, value, label in native] for label, value in values.items()]
 
-        return els[0]
+    # Implemented by Screen, AsyncScreen and SnapshotScreen, the shortcuts below are built on them
+    @abstractmethod
+    def get_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> ElementType: ...
 
-    def query_by(self, locator: Locator) -> Optional[WebElement]:
-        els = self._find_elements(locator)
-
-        if not els:
-            return None
-        if len(els) > 1:
-            raise MultipleSuchElementsException(
-                self._get_multiple_elements_message(locator, els)
-            )
-
-        return els[0]
+    @abstractmethod
+    def query_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> OptionalElementType: ...
 
+    @abstractmethod
     def find_by(
-        self, locator: Locator, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> WebElement:
-        try:
-            els = self.wait_for(
-                lambda _: self._find_elements(locator),
-                timeout=timeout,
-                poll_frequency=poll_frequency,
-            )
-        except TimeoutException:
-            raise NoSuchElementException(self._get_no_element_message(locator))
-        if len(els) > 1:
-            raise MultipleSuchElementsException(
-                self._get_multiple_elements_message(locator, els)
-            )
-        return els[0]
-
-    def get_all_by(self, locator: Locator) -> List[WebElement]:
-        els = self._find_elements(locator)
-        if not els:
-            raise NoSuchElementException(self._get_no_element_message(locator))
-
-        return els
-
-    def query_all_by(self, locator: Locator) -> List[WebElement]:
-        try:
-            return self.get_all_by(locator)
-        except NoSuchElementException:
-            return []
-
+        self,
+        locator: Locator,
+        *,
+        timeout: float = 5,
+        poll_frequency: float = 0.5,
+        scroll_container: Optional[Locator] = None,
+        stable: bool = False,
+        query_budget: Optional[float] = None,
+    ) -> ElementType: ...
+
+    @abstractmethod
+    def get_all_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> ElementListType: ...
+
+    @abstractmethod
+    def query_all_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> ElementListType: ...
+
+    @abstractmethod
     def find_all_by(
-        self, locator: Locator, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> List[WebElement]:
-        try:
-            return self.wait_for(
-                lambda _: self._find_elements(locator),
-                timeout=timeout,
-                poll_frequency=poll_frequency,
-            )
-        except TimeoutException:
-            raise NoSuchElementException(self._get_no_element_message(locator))
+        self,
+        locator: Locator,
+        *,
+        timeout: float = 5,
+        poll_frequency: float = 0.5,
+        min_count: Optional[int] = None,
+        stable_for: Optional[float] = None,
+        query_budget: Optional[float] = None,
+    ) -> ElementListType: ...
 
     ## Testing Library Selectors
     # By role
@@ -169,8 +402,8 @@ class Screen(Generic[DriverType]):
         role: str,
         *,
         hidden: bool = False,
-        name: Optional[str] = None,
-        description: Optional[str] = None,
+        name: Optional[locators.Matcher] = None,
+        description: Optional[locators.Matcher] = None,
         selected: Optional[bool] = None,
         checked: Optional[bool] = None,
         pressed: Optional[bool] = None,
@@ -178,7 +411,7 @@ class Screen(Generic[DriverType]):
         expanded: Optional[bool] = None,
         queryFallbacks: Optional[bool] = None,
         level: Optional[int] = None,
-    ) -> WebElement:
+    ) -> ElementType:
         return self.get_by(
             locators.Role(
                 role,
@@ -200,8 +433,8 @@ class Screen(Generic[DriverType]):
         role: str,
         *,
         hidden: bool = False,
-        name: Optional[str] = None,
-        description: Optional[str] = None,
+        name: Optional[locators.Matcher] = None,
+        description: Optional[locators.Matcher] = None,
         selected: Optional[bool] = None,
         checked: Optional[bool] = None,
         pressed: Optional[bool] = None,
@@ -209,8 +442,8 @@ class Screen(Generic[DriverType]):
         expanded: Optional[bool] = None,
         queryFallbacks: Optional[bool] = None,
         level: Optional[int] = None,
-    ) -> Optional[WebElement]:
-        return self.get_by(
+    ) -> OptionalElementType:
+        return self.query_by(
             locators.Role(
                 role,
                 hidden=hidden,
@@ -231,8 +464,8 @@ class Screen(Generic[DriverType]):
         role: str,
         *,
         hidden: bool = False,
-        name: Optional[str] = None,
-        description: Optional[str] = None,
+        name: Optional[locators.Matcher] = None,
+        description: Optional[locators.Matcher] = None,
         selected: Optional[bool] = None,
         checked: Optional[bool] = None,
         pressed: Optional[bool] = None,
@@ -242,7 +475,7 @@ class Screen(Generic[DriverType]):
         level: Optional[int] = None,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.Role(
                 role,
@@ -266,8 +499,8 @@ class Screen(Generic[DriverType]):
         role: str,
         *,
         hidden: bool = False,
-        name: Optional[str] = None,
-        description: Optional[str] = None,
+        name: Optional[locators.Matcher] = None,
+        description: Optional[locators.Matcher] = None,
         selected: Optional[bool] = None,
         checked: Optional[bool] = None,
         pressed: Optional[bool] = None,
@@ -275,7 +508,7 @@ class Screen(Generic[DriverType]):
         expanded: Optional[bool] = None,
         queryFallbacks: Optional[bool] = None,
         level: Optional[int] = None,
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.get_all_by(
             locators.Role(
                 role,
@@ -297,8 +530,8 @@ class Screen(Generic[DriverType]):
         role: str,
         *,
         hidden: bool = False,
-        name: Optional[str] = None,
-        description: Optional[str] = None,
+        name: Optional[locators.Matcher] = None,
+        description: Optional[locators.Matcher] = None,
         selected: Optional[bool] = None,
         checked: Optional[bool] = None,
         pressed: Optional[bool] = None,
@@ -306,7 +539,7 @@ class Screen(Generic[DriverType]):
         expanded: Optional[bool] = None,
         queryFallbacks: Optional[bool] = None,
         level: Optional[int] = None,
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.query_all_by(
             locators.Role(
                 role,
@@ -328,8 +561,8 @@ class Screen(Generic[DriverType]):
         role: str,
         *,
         hidden: bool = False,
-        name: Optional[str] = None,
-        description: Optional[str] = None,
+        name: Optional[locators.Matcher] = None,
+        description: Optional[locators.Matcher] = None,
         selected: Optional[bool] = None,
         checked: Optional[bool] = None,
         pressed: Optional[bool] = None,
@@ -339,7 +572,7 @@ class Screen(Generic[DriverType]):
         level: Optional[int] = None,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.Role(
                 role,
@@ -361,38 +594,38 @@ class Screen(Generic[DriverType]):
     # By text
     def get_by_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         selector: str = "*",
         exact: bool = True,
         ignore: Union[str, bool] = "script, style",
-    ) -> WebElement:
+    ) -> ElementType:
         return self.get_by(
             locators.Text(text, selector=selector, exact=exact, ignore=ignore)
         )
 
     def query_by_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         selector: str = "*",
         exact: bool = True,
         ignore: Union[str, bool] = "script, style",
-    ) -> Optional[WebElement]:
+    ) -> OptionalElementType:
         return self.query_by(
             locators.Text(text, selector=selector, exact=exact, ignore=ignore)
         )
 
     def find_by_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         selector: str = "*",
         exact: bool = True,
         ignore: Union[str, bool] = "script, style",
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.Text(text, selector=selector, exact=exact, ignore=ignore),
             timeout=timeout,
@@ -401,38 +634,38 @@ class Screen(Generic[DriverType]):
 
     def get_all_by_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         selector: str = "*",
         exact: bool = True,
         ignore: Union[str, bool] = "script, style",
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.get_all_by(
             locators.Text(text, selector=selector, exact=exact, ignore=ignore)
         )
 
     def query_all_by_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         selector: str = "*",
         exact: bool = True,
         ignore: Union[str, bool] = "script, style",
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.query_all_by(
             locators.Text(text, selector=selector, exact=exact, ignore=ignore)
         )
 
     def find_all_by_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         selector: str = "*",
         exact: bool = True,
         ignore: Union[str, bool] = "script, style",
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.Text(text, selector=selector, exact=exact, ignore=ignore),
             timeout=timeout,
@@ -440,22 +673,24 @@ class Screen(Generic[DriverType]):
         )
 
     # By placeholder
-    def get_by_placeholder_text(self, text: str, *, exact: bool = True) -> WebElement:
+    def get_by_placeholder_text(
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> ElementType:
         return self.get_by(locators.PlaceholderText(text, exact=exact))
 
     def query_by_placeholder_text(
-        self, text: str, *, exact: bool = True
-    ) -> Optional[WebElement]:
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> OptionalElementType:
         return self.query_by(locators.PlaceholderText(text, exact=exact))
 
     def find_by_placeholder_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.PlaceholderText(text, exact=exact),
             timeout=timeout,
@@ -463,23 +698,23 @@ class Screen(Generic[DriverType]):
         )
 
     def get_all_by_placeholder_text(
-        self, text: str, *, exact: bool = True
-    ) -> List[WebElement]:
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> ElementListType:
         return self.get_all_by(locators.PlaceholderText(text, exact=exact))
 
     def query_all_by_placeholder_text(
-        self, text: str, *, exact: bool = True
-    ) -> List[WebElement]:
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> ElementListType:
         return self.query_all_by(locators.PlaceholderText(text, exact=exact))
 
     def find_all_by_placeholder_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.PlaceholderText(text, exact=exact),
             timeout=timeout,
@@ -488,24 +723,24 @@ class Screen(Generic[DriverType]):
 
     # By label text
     def get_by_label_text(
-        self, text: str, *, selector: str = "*", exact: bool = True
-    ) -> WebElement:
+        self, text: locators.Matcher, *, selector: str = "*", exact: bool = True
+    ) -> ElementType:
         return self.get_by(locators.LabelText(text, selector=selector, exact=exact))
 
     def query_by_label_text(
-        self, text: str, *, selector: str = "*", exact: bool = True
-    ) -> Optional[WebElement]:
+        self, text: locators.Matcher, *, selector: str = "*", exact: bool = True
+    ) -> OptionalElementType:
         return self.query_by(locators.LabelText(text, selector=selector, exact=exact))
 
     def find_by_label_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         selector: str = "*",
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.LabelText(text, selector=selector, exact=exact),
             timeout=timeout,
@@ -513,26 +748,26 @@ class Screen(Generic[DriverType]):
         )
 
     def get_all_by_label_text(
-        self, text: str, *, selector: str = "*", exact: bool = True
-    ) -> List[WebElement]:
+        self, text: locators.Matcher, *, selector: str = "*", exact: bool = True
+    ) -> ElementListType:
         return self.get_all_by(locators.LabelText(text, selector=selector, exact=exact))
 
     def query_all_by_label_text(
-        self, text: str, *, selector: str = "*", exact: bool = True
-    ) -> List[WebElement]:
+        self, text: locators.Matcher, *, selector: str = "*", exact: bool = True
+    ) -> ElementListType:
         return self.query_all_by(
             locators.LabelText(text, selector=selector, exact=exact)
         )
 
     def find_all_by_label_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         selector: str = "*",
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.LabelText(text, selector=selector, exact=exact),
             timeout=timeout,
@@ -540,44 +775,48 @@ class Screen(Generic[DriverType]):
         )
 
     # By alt text
-    def get_by_alt_text(self, text: str, *, exact: bool = True) -> WebElement:
+    def get_by_alt_text(
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> ElementType:
         return self.get_by(locators.AltText(text, exact=exact))
 
     def query_by_alt_text(
-        self, text: str, *, exact: bool = True
-    ) -> Optional[WebElement]:
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> OptionalElementType:
         return self.query_by(locators.AltText(text, exact=exact))
 
     def find_by_alt_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.AltText(text, exact=exact),
             timeout=timeout,
             poll_frequency=poll_frequency,
         )
 
-    def get_all_by_alt_text(self, text: str, *, exact: bool = True) -> List[WebElement]:
+    def get_all_by_alt_text(
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> ElementListType:
         return self.get_all_by(locators.AltText(text, exact=exact))
 
     def query_all_by_alt_text(
-        self, text: str, *, exact: bool = True
-    ) -> List[WebElement]:
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> ElementListType:
         return self.query_all_by(locators.AltText(text, exact=exact))
 
     def find_all_by_alt_text(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.AltText(text, exact=exact),
             timeout=timeout,
@@ -585,40 +824,48 @@ class Screen(Generic[DriverType]):
         )
 
     # By title
-    def get_by_title(self, title: str, *, exact: bool = True) -> WebElement:
+    def get_by_title(
+        self, title: locators.Matcher, *, exact: bool = True
+    ) -> ElementType:
         return self.get_by(locators.Title(title, exact=exact))
 
-    def query_by_title(self, title: str, *, exact: bool = True) -> Optional[WebElement]:
+    def query_by_title(
+        self, title: locators.Matcher, *, exact: bool = True
+    ) -> OptionalElementType:
         return self.query_by(locators.Title(title, exact=exact))
 
     def find_by_title(
         self,
-        title: str,
+        title: locators.Matcher,
         *,
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.Title(title, exact=exact),
             timeout=timeout,
             poll_frequency=poll_frequency,
         )
 
-    def get_all_by_title(self, title: str, *, exact: bool = True) -> List[WebElement]:
+    def get_all_by_title(
+        self, title: locators.Matcher, *, exact: bool = True
+    ) -> ElementListType:
         return self.get_all_by(locators.Title(title, exact=exact))
 
-    def query_all_by_title(self, title: str, *, exact: bool = True) -> List[WebElement]:
+    def query_all_by_title(
+        self, title: locators.Matcher, *, exact: bool = True
+    ) -> ElementListType:
         return self.query_all_by(locators.Title(title, exact=exact))
 
     def find_all_by_title(
         self,
-        title: str,
+        title: locators.Matcher,
         *,
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.Title(title, exact=exact),
             timeout=timeout,
@@ -626,44 +873,48 @@ class Screen(Generic[DriverType]):
         )
 
     # By test id
-    def get_by_test_id(self, text: str, *, exact: bool = True) -> WebElement:
+    def get_by_test_id(
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> ElementType:
         return self.get_by(locators.TestId(text, exact=exact))
 
     def query_by_test_id(
-        self, text: str, *, exact: bool = True
-    ) -> Optional[WebElement]:
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> OptionalElementType:
         return self.query_by(locators.TestId(text, exact=exact))
 
     def find_by_test_id(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.TestId(text, exact=exact),
             timeout=timeout,
             poll_frequency=poll_frequency,
         )
 
-    def get_all_by_test_id(self, text: str, *, exact: bool = True) -> List[WebElement]:
+    def get_all_by_test_id(
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> ElementListType:
         return self.get_all_by(locators.TestId(text, exact=exact))
 
     def query_all_by_test_id(
-        self, text: str, *, exact: bool = True
-    ) -> List[WebElement]:
+        self, text: locators.Matcher, *, exact: bool = True
+    ) -> ElementListType:
         return self.query_all_by(locators.TestId(text, exact=exact))
 
     def find_all_by_test_id(
         self,
-        text: str,
+        text: locators.Matcher,
         *,
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.TestId(text, exact=exact),
             timeout=timeout,
@@ -671,22 +922,24 @@ class Screen(Generic[DriverType]):
         )
 
     # By display value
-    def get_by_display_value(self, value: str, *, exact: bool = True) -> WebElement:
+    def get_by_display_value(
+        self, value: locators.Matcher, *, exact: bool = True
+    ) -> ElementType:
         return self.get_by(locators.DisplayValue(value, exact=exact))
 
     def query_by_display_value(
-        self, value: str, *, exact: bool = True
-    ) -> Optional[WebElement]:
+        self, value: locators.Matcher, *, exact: bool = True
+    ) -> OptionalElementType:
         return self.query_by(locators.DisplayValue(value, exact=exact))
 
     def find_by_display_value(
         self,
-        value: str,
+        value: locators.Matcher,
         *,
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.DisplayValue(value, exact=exact),
             timeout=timeout,
@@ -694,23 +947,23 @@ class Screen(Generic[DriverType]):
         )
 
     def get_all_by_display_value(
-        self, value: str, *, exact: bool = True
-    ) -> List[WebElement]:
+        self, value: locators.Matcher, *, exact: bool = True
+    ) -> ElementListType:
         return self.get_all_by(locators.DisplayValue(value, exact=exact))
 
     def query_all_by_display_value(
-        self, value: str, *, exact: bool = True
-    ) -> List[WebElement]:
+        self, value: locators.Matcher, *, exact: bool = True
+    ) -> ElementListType:
         return self.query_all_by(locators.DisplayValue(value, exact=exact))
 
     def find_all_by_display_value(
         self,
-        value: str,
+        value: locators.Matcher,
         *,
         exact: bool = True,
         timeout: float = 5,
         poll_frequency: float = 0.5,
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.DisplayValue(value, exact=exact),
             timeout=timeout,
@@ -719,192 +972,192 @@ class Screen(Generic[DriverType]):
 
     ## Selenium Selectors
     # By css
-    def get_by_css(self, css: str) -> WebElement:
+    def get_by_css(self, css: str) -> ElementType:
         return self.get_by(locators.Css(css))
 
-    def query_by_css(self, css: str) -> Optional[WebElement]:
+    def query_by_css(self, css: str) -> OptionalElementType:
         return self.query_by(locators.Css(css))
 
     def find_by_css(
         self, css: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.Css(css), timeout=timeout, poll_frequency=poll_frequency
         )
 
-    def get_all_by_css(self, css: str) -> List[WebElement]:
+    def get_all_by_css(self, css: str) -> ElementListType:
         return self.get_all_by(locators.Css(css))
 
-    def query_all_by_css(self, css: str) -> List[WebElement]:
+    def query_all_by_css(self, css: str) -> ElementListType:
         return self.query_all_by(locators.Css(css))
 
     def find_all_by_css(
         self, css: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.Css(css), timeout=timeout, poll_frequency=poll_frequency
         )
 
     # By xpath
-    def get_by_xpath(self, xpath: str) -> WebElement:
+    def get_by_xpath(self, xpath: str) -> ElementType:
         return self.get_by(locators.XPath(xpath))
 
-    def query_by_xpath(self, xpath: str) -> Optional[WebElement]:
+    def query_by_xpath(self, xpath: str) -> OptionalElementType:
         return self.query_by(locators.XPath(xpath))
 
     def find_by_xpath(
         self, xpath: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.XPath(xpath), timeout=timeout, poll_frequency=poll_frequency
         )
 
-    def get_all_by_xpath(self, xpath: str) -> List[WebElement]:
+    def get_all_by_xpath(self, xpath: str) -> ElementListType:
         return self.get_all_by(locators.XPath(xpath))
 
-    def query_all_by_xpath(self, xpath: str) -> List[WebElement]:
+    def query_all_by_xpath(self, xpath: str) -> ElementListType:
         return self.query_all_by(locators.XPath(xpath))
 
     def find_all_by_xpath(
         self, xpath: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.XPath(xpath), timeout=timeout, poll_frequency=poll_frequency
         )
 
     # By id
-    def get_by_id(self, id: str) -> WebElement:
+    def get_by_id(self, id: str) -> ElementType:
         return self.get_by(locators.Id(id))
 
-    def query_by_id(self, id: str) -> Optional[WebElement]:
+    def query_by_id(self, id: str) -> OptionalElementType:
         return self.query_by(locators.Id(id))
 
     def find_by_id(
         self, id: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.Id(id), timeout=timeout, poll_frequency=poll_frequency
         )
 
-    def get_all_by_id(self, id: str) -> List[WebElement]:
+    def get_all_by_id(self, id: str) -> ElementListType:
         return self.get_all_by(locators.Id(id))
 
-    def query_all_by_id(self, id: str) -> List[WebElement]:
+    def query_all_by_id(self, id: str) -> ElementListType:
         return self.query_all_by(locators.Id(id))
 
     def find_all_by_id(
         self, id: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.Id(id), timeout=timeout, poll_frequency=poll_frequency
         )
 
     # By name
-    def get_by_name(self, name: str) -> WebElement:
+    def get_by_name(self, name: str) -> ElementType:
         return self.get_by(locators.Name(name))
 
-    def query_by_name(self, name: str) -> Optional[WebElement]:
+    def query_by_name(self, name: str) -> OptionalElementType:
         return self.query_by(locators.Name(name))
 
     def find_by_name(
         self, name: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.Name(name), timeout=timeout, poll_frequency=poll_frequency
         )
 
-    def get_all_by_name(self, name: str) -> List[WebElement]:
+    def get_all_by_name(self, name: str) -> ElementListType:
         return self.get_all_by(locators.Name(name))
 
-    def query_all_by_name(self, name: str) -> List[WebElement]:
+    def query_all_by_name(self, name: str) -> ElementListType:
         return self.query_all_by(locators.Name(name))
 
     def find_all_by_name(
         self, name: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.Name(name), timeout=timeout, poll_frequency=poll_frequency
         )
 
     # By tag name
-    def get_by_tag_name(self, name: str) -> WebElement:
+    def get_by_tag_name(self, name: str) -> ElementType:
         return self.get_by(locators.TagName(name))
 
-    def query_by_tag_name(self, name: str) -> Optional[WebElement]:
+    def query_by_tag_name(self, name: str) -> OptionalElementType:
         return self.query_by(locators.TagName(name))
 
     def find_by_tag_name(
         self, name: str, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.TagName(name), timeout=timeout, poll_frequency=poll_frequency
         )
 
-    def get_all_by_tag_name(self, name: str) -> List[WebElement]:
+    def get_all_by_tag_name(self, name: str) -> ElementListType:
         return self.get_all_by(locators.TagName(name))
 
-    def query_all_by_tag_name(self, name: str) -> List[WebElement]:
+    def query_all_by_tag_name(self, name: str) -> ElementListType:
         return self.query_all_by(locators.TagName(name))
 
     def find_all_by_tag_name(
         self, name: str, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.TagName(name), timeout=timeout, poll_frequency=poll_frequency
         )
 
     # By link text
-    def get_by_link_text(self, value: str) -> WebElement:
+    def get_by_link_text(self, value: str) -> ElementType:
         return self.get_by(locators.LinkText(value))
 
-    def query_by_link_text(self, value: str) -> Optional[WebElement]:
+    def query_by_link_text(self, value: str) -> OptionalElementType:
         return self.query_by(locators.LinkText(value))
 
     def find_by_link_text(
         self, value: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.LinkText(value), timeout=timeout, poll_frequency=poll_frequency
         )
 
-    def get_all_by_link_text(self, value: str) -> List[WebElement]:
+    def get_all_by_link_text(self, value: str) -> ElementListType:
         return self.get_all_by(locators.LinkText(value))
 
-    def query_all_by_link_text(self, value: str) -> List[WebElement]:
+    def query_all_by_link_text(self, value: str) -> ElementListType:
         return self.query_all_by(locators.LinkText(value))
 
     def find_all_by_link_text(
         self, value: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.LinkText(value), timeout=timeout, poll_frequency=poll_frequency
         )
 
     # By partial text
-    def get_by_partial_link_text(self, text: str) -> WebElement:
+    def get_by_partial_link_text(self, text: str) -> ElementType:
         return self.get_by(locators.PartialLinkText(text))
 
-    def query_by_partial_link_text(self, text: str) -> Optional[WebElement]:
+    def query_by_partial_link_text(self, text: str) -> OptionalElementType:
         return self.query_by(locators.PartialLinkText(text))
 
     def find_by_partial_link_text(
         self, text: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.PartialLinkText(text),
             timeout=timeout,
             poll_frequency=poll_frequency,
         )
 
-    def get_all_by_partial_link_text(self, text: str) -> List[WebElement]:
+    def get_all_by_partial_link_text(self, text: str) -> ElementListType:
         return self.get_all_by(locators.PartialLinkText(text))
 
-    def query_all_by_partial_link_text(self, text: str) -> List[WebElement]:
+    def query_all_by_partial_link_text(self, text: str) -> ElementListType:
         return self.query_all_by(locators.PartialLinkText(text))
 
     def find_all_by_partial_link_text(
         self, text: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.PartialLinkText(text),
             timeout=timeout,
@@ -912,36 +1165,616 @@ class Screen(Generic[DriverType]):
         )
 
     # By class name
-    def get_by_class_name(self, name: str) -> WebElement:
+    def get_by_class_name(self, name: str) -> ElementType:
         return self.get_by(locators.ClassName(name))
 
-    def query_by_class_name(self, name: str) -> Optional[WebElement]:
+    def query_by_class_name(self, name: str) -> OptionalElementType:
         return self.query_by(locators.ClassName(name))
 
     def find_by_class_name(
         self, name: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> WebElement:
+    ) -> ElementType:
         return self.find_by(
             locators.ClassName(name),
             timeout=timeout,
             poll_frequency=poll_frequency,
         )
 
-    def get_all_by_class_name(self, name: str) -> List[WebElement]:
+    def get_all_by_class_name(self, name: str) -> ElementListType:
         return self.get_all_by(locators.ClassName(name))
 
-    def query_all_by_class_name(self, name: str) -> List[WebElement]:
+    def query_all_by_class_name(self, name: str) -> ElementListType:
         return self.query_all_by(locators.ClassName(name))
 
     def find_all_by_class_name(
         self, name: str, *, timeout: float = 5, poll_frequency: float = 0.5
-    ) -> List[WebElement]:
+    ) -> ElementListType:
         return self.find_all_by(
             locators.ClassName(name),
             timeout=timeout,
             poll_frequency=poll_frequency,
         )
 
+
+class Screen(
+    _BaseScreen[WebElement, Optional[WebElement], List[WebElement]],
+    Generic[DriverType],
+):
+
+    def __init__(
+        self,
+        driver: DriverType,
+        *,
+        idle_window: Optional[float] = None,
+        fast_forward: bool = False,
+        query_budget: Optional[float] = None,
+        slow_query_threshold: Optional[float] = None,
+    ):
+        self.driver = driver
+        self._finder: ElementsFinder = driver
+        self._configure(
+            idle_window=idle_window,
+            fast_forward=fast_forward,
+            query_budget=query_budget,
+            slow_query_threshold=slow_query_threshold,
+        )
+
+    @property
+    def clock(self) -> Clock:
+        return Clock(self)
+
+    def trace(self, path: str, *, buffer_size: int = 100) -> TraceWriter:
+        writer = TraceWriter(path, driver=self.driver, buffer_size=buffer_size)
+        self.add_hook(writer)
+        return writer
+
+    def _inject(self, execute: Callable[..., Any], script: str, *args) -> Any:
+        with self._observe("inject") as event:
+            event.injected = True
+            script = f"{testing_library};{script}"
+            self._round_trip(script)
+            return execute(script, *args)
+
+    def _poll(self, method: Callable[[Any], T]) -> Callable[[Any], T]:
+        # Every poll of a wait is reported on its own and counted in the query that waits.
+        # Finders that record or replay the calls also get to know which ones are polls.
+        polling = getattr(self._finder, "polling", None)
+        if polling is not None:
+            method = polling(method)
+        if not self._has_hooks():
+            return method
+
+        def poll(driver: Any) -> T:
+            with self._observe("wait") as event:
+                value = method(driver)
+                event.result_count = _count(value)
+                return value
+
+        return poll
+
+    def preload(self) -> bool:
+        # Chromium only: every document opened from now on gets __stl__ before its own scripts run,
+        # so the first query on a page doesn't have to fail and inject the bundle
+        execute_cdp_cmd = getattr(self.driver, "execute_cdp_cmd", None)
+        if execute_cdp_cmd is None:
+            return False
+        source = testing_library
+        if self.idle_window is not None:
+            # The waits with an idle window then see every request, not just the ones after they start
+            source += ";__stl__.settle.install()"
+        execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        return True
+
+    def snapshot(self) -> "SnapshotScreen":
+        # A single round trip for the whole page or element, the snapshot is queried in Python
+        results = self._execute_script(
+            "return __stl__.snapshot(arguments[0])", self._container
+        )
+        return self._share_hooks(
+            SnapshotScreen(self.driver, self._snapshots(results, ()))
+        )
+
+    def _snapshots(
+        self, results: List[Dict[str, Any]], path: Sequence[WebElement]
+    ) -> List[Snapshot]:
+        # A snapshot for every document of the container. `path` are the frames they were taken in,
+        # besides the ones _execute_script() switches into itself
+        container = self._container
+
+        def resolver(index: int) -> Callable[[List[int], List[str]], List[WebElement]]:
+            def resolve(indexes: List[int], tags: List[str]) -> List[WebElement]:
+                with _switched_to(self.driver, path):
+                    return self._execute_script(
+                        "return __stl__.resolve(arguments[0], arguments[1], arguments[2], arguments[3])",
+                        container,
+                        indexes,
+                        tags,
+                        index,
+                    )
+
+            return resolve
+
+        return [
+            Snapshot(
+                result["html"],
+                result["flags"],
+                result["values"],
+                page=not isinstance(container, WebElement),
+                resolve=resolver(index),
+            )
+            for index, result in enumerate(results)
+        ]
+
+    def _find_elements(
+        self, locator: Locator, query_budget: Optional[float] = None
+    ) -> List[WebElement]:
+        loc = self._ensure_locator(locator)
+        if _is_selenium_query(loc):
+            self._round_trip()
+            return self._finder.find_elements(*loc)
+        return self._query_all(loc, query_budget)
+
+    def _query_all(
+        self, loc: locators.Locator, query_budget: Optional[float] = None
+    ) -> List[WebElement]:
+        budget = self._budget(query_budget)
+        result = self._execute_script(
+            "return __stl__.query(arguments[0], arguments[1], arguments[2])",
+            self._container,
+            loc._js_spec(),
+            {"budget": None if budget is None else budget * 1000},
+        )
+        return self._check_query_time(loc, result, budget)
+
+    def _execute_script(self, script: str, *args) -> Any:
+        script = self._prelude() + script
+        if self._event is not None:
+            self._round_trip(script)
+        try:
+            # Optimistically run the query, if __stl__ isn't defined on the page we'll get a JavaScript exception
+            return self._finder.execute_script(script, *args)
+        except WebDriverException as e:
+            # Any other error is raised as is, running the script again could repeat its side effects
+            if not _bundle_missing(e):
+                raise
+            return self._inject(self._finder.execute_script, script, *args)
+
+    def _execute_async_script(self, function: str, *args) -> Any:
+        # The last argument holds the options of the wait, its timeout is in milliseconds
+        options = args[-1] if args and isinstance(args[-1], dict) else {}
+        if options.get("timeout") is not None:
+            self._ensure_script_timeout(options["timeout"] / 1000)
+        script = self._prelude() + async_script.format(function)
+        if self._event is not None:
+            self._round_trip(script)
+        try:
+            return self._finder.execute_async_script(script, *args)
+        except WebDriverException as e:
+            if not _bundle_missing(e):
+                raise
+            return self._inject(self._finder.execute_async_script, script, *args)
+
+    def _ensure_script_timeout(self, timeout: float):
+        # Waits run inside an asynchronous script, so the driver's script timeout is raised when it
+        # is shorter than the wait. It's never lowered, so this is a round trip at most once per timeout.
+        set_script_timeout = getattr(self._finder, "set_script_timeout", None)
+        if set_script_timeout is None:
+            return
+        needed = timeout + script_timeout_margin
+        current = _script_timeouts.get(self._finder)
+        if current is None:
+            timeouts = getattr(self._finder, "timeouts", None)
+            current = timeouts.script if timeouts is not None else 0
+            _script_timeouts[self._finder] = current
+        if current >= needed:
+            return
+        self._round_trip()
+        set_script_timeout(needed)
+        _script_timeouts[self._finder] = needed
+
+    @_observed("get")
+    def get_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> WebElement:
+        els = self._find_elements(locator, query_budget)
+
+        if not els:
+            raise NoSuchElementException(self._get_no_element_message(locator))
+
+        if len(els) > 1:
+            raise MultipleSuchElementsException(
+                self._get_multiple_elements_message(locator, els)
+            )
+
+        return els[0]
+
+    @_observed("query")
+    def query_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> Optional[WebElement]:
+        els = self._find_elements(locator, query_budget)
+
+        if not els:
+            return None
+        if len(els) > 1:
+            raise MultipleSuchElementsException(
+                self._get_multiple_elements_message(locator, els)
+            )
+
+        return els[0]
+
+    @_observed("find", wait=True)
+    def find_by(
+        self,
+        locator: Locator,
+        *,
+        timeout: float = 5,
+        poll_frequency: float = 0.5,
+        scroll_container: Optional[Locator] = None,
+        stable: bool = False,
+        query_budget: Optional[float] = None,
+    ) -> WebElement:
+        if scroll_container is not None:
+            el = self._scroll_find(
+                self._ensure_locator(locator),
+                self._ensure_locator(scroll_container),
+                timeout=timeout,
+            )
+            return self.wait_for_stable(el, timeout=timeout) if stable else el
+        if stable:
+            loc = self._ensure_locator(locator)
+            result = self._execute_async_script(
+                "findStable",
+                self._container,
+                loc._js_spec(),
+                self._wait_options(timeout, query_budget=query_budget),
+            )
+            self._raise_for_error(loc, result)
+            return result["element"]
+        if self.idle_window is not None:
+            els = self._find_all_in_page(
+                self._ensure_locator(locator),
+                timeout=timeout,
+                min_count=1,
+                stable_for=0,
+                query_budget=query_budget,
+            )
+        else:
+            try:
+                els = self.wait_for(
+                    lambda _: self._find_elements(locator, query_budget),
+                    timeout=timeout,
+                    poll_frequency=poll_frequency,
+                )
+            except QueryBudgetExceededException:
+                raise
+            except TimeoutException:
+                raise NoSuchElementException(self._get_no_element_message(locator))
+        if len(els) > 1:
+            raise MultipleSuchElementsException(
+                self._get_multiple_elements_message(locator, els)
+            )
+        return els[0]
+
+    @_observed("all")
+    def get_all_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> List[WebElement]:
+        els = self._find_elements(locator, query_budget)
+        if not els:
+            raise NoSuchElementException(self._get_no_element_message(locator))
+
+        return els
+
+    @_observed("all")
+    def query_all_by(
+        self, locator: Locator, *, query_budget: Optional[float] = None
+    ) -> List[WebElement]:
+        try:
+            return self.get_all_by(locator, query_budget=query_budget)
+        except NoSuchElementException:
+            return []
+
+    @_observed("all", wait=True)
+    def find_all_by(
+        self,
+        locator: Locator,
+        *,
+        timeout: float = 5,
+        poll_frequency: float = 0.5,
+        min_count: Optional[int] = None,
+        stable_for: Optional[float] = None,
+        query_budget: Optional[float] = None,
+    ) -> List[WebElement]:
+        if (
+            min_count is not None
+            or stable_for is not None
+            or self.idle_window is not None
+        ):
+            return self._find_all_in_page(
+                self._ensure_locator(locator),
+                timeout=timeout,
+                min_count=1 if min_count is None else min_count,
+                stable_for=stable_for or 0,
+                query_budget=query_budget,
+            )
+        try:
+            return self.wait_for(
+                lambda _: self._find_elements(locator, query_budget),
+                timeout=timeout,
+                poll_frequency=poll_frequency,
+            )
+        except QueryBudgetExceededException:
+            # It's a TimeoutException too, but the query was aborted rather than not finding anything
+            raise
+        except TimeoutException:
+            raise NoSuchElementException(self._get_no_element_message(locator))
+
+    def map(
+        self,
+        containers: Union[locators.Locator, Sequence[WebElement]],
+        locator: Locator,
+        *,
+        mode: str = "get",
+    ) -> List[Any]:
+        if mode not in ("get", "query", "all"):
+            raise ValueError(f"mode must be 'get', 'query' or 'all', not {mode!r}")
+        if isinstance(containers, locators.Locator):
+            outer: Any = containers._js_spec()
+        else:
+            outer = list(containers)
+            if not outer:
+                return []
+        loc = self._ensure_locator(locator)
+        slots = self._execute_script(
+            "return __stl__.map(arguments[0], arguments[1], arguments[2])",
+            self._container,
+            outer,
+            loc._js_spec(),
+        )
+        return [self._map_slot(loc, slot, mode) for slot in slots]
+
+    def _map_slot(self, locator: locators.Locator, slot: Dict[str, Any], mode: str):
+        if slot.get("error"):
+            return JavascriptException(slot.get("message"))
+        els = slot["elements"]
+        if mode == "all":
+            return els
+        if len(els) > 1:
+            return MultipleSuchElementsException(
+                self._get_multiple_elements_message(locator, els)
+            )
+        if not els:
+            if mode == "query":
+                return None
+            return NoSuchElementException(f"No element found with locator {locator}")
+        return els[0]
+
+    def find_first(
+        self, locator_list: Sequence[Locator], *, timeout: float = 5
+    ) -> Tuple[int, WebElement]:
+        locs = [self._ensure_locator(locator) for locator in locator_list]
+        results = self._find_each(locs, timeout=timeout, all=False)
+        for index, (loc, els) in enumerate(zip(locs, results)):
+            if len(els) > 1:
+                raise MultipleSuchElementsException(
+                    self._get_multiple_elements_message(loc, els)
+                )
+            if els:
+                return index, els[0]
+        raise NoSuchElementException(
+            f"No element found with any of the locators {locs}"
+        )
+
+    def find_all_of(
+        self, locator_list: Sequence[Locator], *, timeout: float = 5
+    ) -> List[WebElement]:
+        locs = [self._ensure_locator(locator) for locator in locator_list]
+        results = self._find_each(locs, timeout=timeout, all=True)
+        missing = [loc for loc, els in zip(locs, results) if not els]
+        if missing:
+            raise NoSuchElementException(f"No element found with locators {missing}")
+        for loc, els in zip(locs, results):
+            if len(els) > 1:
+                raise MultipleSuchElementsException(
+                    self._get_multiple_elements_message(loc, els)
+                )
+        return [els[0] for els in results]
+
+    def _find_each(
+        self, locs: List[locators.Locator], *, timeout: float, all: bool
+    ) -> List[List[WebElement]]:
+        if not locs:
+            raise ValueError("At least one locator is required")
+        result = self._execute_async_script(
+            "findEach",
+            self._container,
+            [loc._js_spec() for loc in locs],
+            self._wait_options(timeout, all=all),
+        )
+        self._raise_for_error(locs[0], result)
+        return result["results"]
+
+    def _scroll_find(
+        self,
+        locator: locators.Locator,
+        scroll_container: locators.Locator,
+        *,
+        timeout: float,
+    ) -> WebElement:
+        result = self._execute_async_script(
+            "scrollFind",
+            self._container,
+            locator._js_spec(),
+            scroll_container._js_spec(),
+            {"timeout": timeout * 1000},
+        )
+        self._raise_for_error(
+            scroll_container if result.get("container") else locator, result
+        )
+        return result["element"]
+
+    def _find_all_in_page(
+        self,
+        locator: locators.Locator,
+        *,
+        timeout: float,
+        min_count: int,
+        stable_for: float,
+        query_budget: Optional[float] = None,
+    ) -> List[WebElement]:
+        result = self._execute_async_script(
+            "findAll",
+            self._container,
+            locator._js_spec(),
+            self._wait_options(
+                timeout,
+                query_budget=query_budget,
+                minCount=min_count,
+                stableFor=stable_for * 1000,
+            ),
+        )
+        self._raise_for_error(locator, result)
+        els = result["elements"]
+        if not els:
+            raise NoSuchElementException(self._get_no_element_message(locator))
+        if len(els) < min_count:
+            raise NoSuchElementException(
+                f"Expected at least {min_count} elements with locator {locator}, found {len(els)}"
+            )
+        if not result["done"]:
+            raise NoSuchElementException(
+                f"Elements found with locator {locator} kept changing for {timeout}s"
+            )
+        return els
+
+    def query_all_by_texts(
+        self,
+        texts: Iterable[str],
+        *,
+        selector: str = "*",
+        exact: bool = True,
+        ignore: Union[str, bool] = "script, style",
+    ) -> Dict[str, List[WebElement]]:
+        texts = list(texts)
+        results = self._execute_script(
+            "return __stl__.queryAllByTexts(arguments[0], arguments[1], arguments[2])",
+            self._container,
+            texts,
+            {"selector": selector, "exact": exact, "ignore": ignore},
+        )
+        return dict(zip(texts, results))
+
+    ## Frames
+    def within_frame(self, frame: Union[Locator, WebElement]) -> "WithinFrame":
+        if not isinstance(frame, WebElement):
+            frame = self.get_by(frame)
+        return self._share_hooks(WithinFrame(frame, parent=self, **self._options()))
+
+    def all_frames(self) -> "AllFrames":
+        return self._share_hooks(AllFrames(self._finder, **self._options()))
+
+    ## Interactions
+    def fill(
+        self,
+        values: Dict[str, Any],
+        *,
+        exact: bool = True,
+        send_keys: Union[bool, str, Iterable[str]] = False,
+    ) -> List[WebElement]:
+        entries = self._fill_entries(values, send_keys)
+        result = self._execute_script(
+            "return __stl__.fill(arguments[0], arguments[1], arguments[2])",
+            self._container,
+            entries,
+            {"exact": exact},
+        )
+
+        if result.get("error"):
+            locator = locators.LabelText(entries[result["index"]][0], exact=exact)
+            self._raise_for_error(locator, result)
+
+        els = result["elements"]
+        for (_, value, use_send_keys), el in zip(entries, els):
+            # Fields that need genuine key events are left untouched in the page
+            if use_send_keys:
+                el.clear()
+                el.send_keys(str(value))
+        return els
+
+    def click_by(
+        self, locator: Locator, *, timeout: float = 5, trusted: bool = False
+    ) -> WebElement:
+        el = self._act(locator, "click", None, timeout=timeout, trusted=trusted)
+        if trusted:
+            el.click()
+        return el
+
+    def type_by(
+        self,
+        locator: Locator,
+        text: str,
+        *,
+        clear: bool = True,
+        timeout: float = 5,
+        trusted: bool = False,
+    ) -> WebElement:
+        el = self._act(
+            locator,
+            "type",
+            {"text": text, "clear": clear},
+            timeout=timeout,
+            trusted=trusted,
+        )
+        if trusted:
+            if clear:
+                el.clear()
+            el.send_keys(text)
+        return el
+
+    def select_by(
+        self,
+        locator: Locator,
+        value: Union[str, List[str]],
+        *,
+        timeout: float = 5,
+        trusted: bool = False,
+    ) -> WebElement:
+        el = self._act(locator, "select", value, timeout=timeout, trusted=trusted)
+        if trusted:
+            select = Select(el)
+            for option in [value] if isinstance(value, str) else value:
+                try:
+                    select.select_by_value(option)
+                except NoSuchElementException:
+                    select.select_by_visible_text(option)
+        return el
+
+    def _act(
+        self,
+        locator: Locator,
+        action: str,
+        value: Any,
+        *,
+        timeout: float,
+        trusted: bool,
+    ) -> WebElement:
+        loc = self._ensure_locator(locator)
+        result = self._execute_async_script(
+            "act",
+            self._container,
+            loc._js_spec(),
+            action,
+            value,
+            self._wait_options(timeout, trusted=trusted),
+        )
+        self._raise_for_error(loc, result)
+        return result["element"]
+
+    ## Assertions
+    def expect(self, locator: Locator, *, timeout: float = 5) -> Expect:
+        return Expect(self, self._ensure_locator(locator), timeout=timeout)
+
     def wait_for(
         self,
         method: Callable[[DriverType], T],
@@ -955,7 +1788,7 @@ class Screen(Generic[DriverType]):
             timeout=timeout,
             poll_frequency=poll_frequency,
             ignored_exceptions=ignored_exceptions,
-        ).until(method)
+        ).until(self._poll(method))
 
     def wait_for_stale(
         self, element: WebElement, *, timeout: float = 5, poll_frequency: float = 0.5
@@ -966,6 +1799,35 @@ class Screen(Generic[DriverType]):
             poll_frequency=poll_frequency,
         )
 
+    def wait_for_stable(self, element: WebElement, *, timeout: float = 5) -> WebElement:
+        result = self._execute_async_script(
+            "waitForStable", element, self._wait_options(timeout)
+        )
+        if result.get("error") == "not actionable":
+            raise ElementNotInteractableException(
+                f"Element did not become stable within {timeout}s: {result['reason']}"
+            )
+        if result.get("error"):
+            raise JavascriptException(result.get("message"))
+        return element
+
+    def wait_for_settled(
+        self, *, timeout: float = 5, idle_window: Optional[float] = None
+    ) -> None:
+        idle = idle_window if idle_window is not None else self.idle_window
+        result = self._execute_async_script(
+            "settled",
+            {"timeout": timeout * 1000, "idle": (0.5 if idle is None else idle) * 1000},
+        )
+        if result.get("error"):
+            raise JavascriptException(result.get("message"))
+        if not result["done"]:
+            pending = result["pending"]
+            raise TimeoutException(
+                f"Page did not settle within {timeout}s: "
+                f"{pending['requests']} pending requests, {pending['timers']} pending timers"
+            )
+
     def log_testing_playground_url(
         self, element: Optional[WebElement] = None
     ) -> Optional[str]:
@@ -973,67 +1835,63 @@ class Screen(Generic[DriverType]):
             script_to_run = "return __stl__.logTestingPlaygroundURL(arguments[0])"
         else:
             script_to_run = "return __stl__.logTestingPlaygroundURL()"
-        url = None
-        try:
-            # Optimistically run the query, if __stl__ isn't defined on the page we'll get a JavaScript exception
-            url = self._finder.execute_script(script_to_run, element)
-        except WebDriverException:
-            # We assume that the error was `__stl__ is not defined` so we add __stl__ to the DOM and run the command again
-            url = self._finder.execute_script(
-                f"{testing_library};{script_to_run}", element
-            )
+        url = self._execute_script(script_to_run, element)
 
         print(url)
         return cast(str, url)
 
+    def _raise_for_error(self, locator: locators.Locator, result: Dict[str, Any]):
+        if result.get("error") == "missing":
+            raise NoSuchElementException(self._get_no_element_message(locator))
+        if result.get("error") == "multiple":
+            raise MultipleSuchElementsException(
+                self._get_multiple_elements_message(locator, result["elements"])
+            )
+        super()._raise_for_error(locator, result)
+
     def _get_no_element_message(self, locator: Locator):
-        return f"No element found with locator {locator}"
+        with self._observe("message", locator):
+            return f"No element found with locator {locator}"
 
     def _get_multiple_elements_message(self, locator: Locator, els: List[WebElement]):
-        el_str = ""
-        for i, el in enumerate(els):
-            el_str += f"{i}. {' '.join(el.get_attribute('outerHTML').splitlines())}\n"
-        raise MultipleSuchElementsException(
-            f"{len(els)} elements found with locator {locator}:\n{el_str}"
-        )
+        with self._observe("message", locator) as event:
+            el_str = ""
+            for i, el in enumerate(els):
+                event.round_trips += 1
+                el_str += (
+                    f"{i}. {' '.join(el.get_attribute('outerHTML').splitlines())}\n"
+                )
+            return f"{len(els)} elements found with locator {locator}:\n{el_str}"
 
 
 class Within(Screen[WebElement]):
-    def __init__(self, element: WebElement):
+    def __init__(
+        self,
+        element: WebElement,
+        *,
+        idle_window: Optional[float] = None,
+        fast_forward: bool = False,
+        query_budget: Optional[float] = None,
+        slow_query_threshold: Optional[float] = None,
+    ):
         self.element = element
+        self._container = element
         self._finder: ElementsFinder = element.parent
+        self._configure(
+            idle_window=idle_window,
+            fast_forward=fast_forward,
+            query_budget=query_budget,
+            slow_query_threshold=slow_query_threshold,
+        )
 
-    def _find_elements(self, locator: Locator) -> List[WebElement]:
+    def _find_elements(
+        self, locator: Locator, query_budget: Optional[float] = None
+    ) -> List[WebElement]:
         loc = self._ensure_locator(locator)
-
-        if not isinstance(
-            loc,
-            (
-                locators.Role,
-                locators.Text,
-                locators.PlaceholderText,
-                locators.LabelText,
-                locators.AltText,
-                locators.Title,
-                locators.TestId,
-                locators.DisplayValue,
-            ),
-        ):
+        if _is_selenium_query(loc):
+            self._round_trip()
             return self.element.find_elements(*loc)
-
-        script_to_run = loc._testing_library_js_str().replace(
-            "(document", "(arguments[0]"
-        )
-        try:
-            return self.element.parent.execute_script(
-                script_to_run,
-                self.element,
-            )
-        except WebDriverException:
-            return self.element.parent.execute_script(
-                f"{testing_library};{script_to_run}",
-                self.element,
-            )
+        return super()._find_elements(loc, query_budget)
 
     def wait_for(
         self,
@@ -1048,16 +1906,236 @@ class Within(Screen[WebElement]):
             timeout=timeout,
             poll_frequency=poll_frequency,
             ignored_exceptions=ignored_exceptions,
-        ).until(method)
+        ).until(self._poll(method))
 
     def _get_no_element_message(self, locator: Locator):
-        return f"No element found with locator {locator}:\n{self.element.get_attribute('outerHTML')}"
+        with self._observe("message", locator) as event:
+            event.round_trips += 1
+            return f"No element found with locator {locator}:\n{self.element.get_attribute('outerHTML')}"
+
+
+class WithinFrame(Screen[Any]):
+    def __init__(
+        self,
+        frame: WebElement,
+        *,
+        parent: Optional[Screen] = None,
+        idle_window: Optional[float] = None,
+        fast_forward: bool = False,
+        query_budget: Optional[float] = None,
+        slow_query_threshold: Optional[float] = None,
+    ):
+        self.element = frame
+        self.driver = frame.parent
+        self._finder: ElementsFinder = frame.parent
+        self._configure(
+            idle_window=idle_window,
+            fast_forward=fast_forward,
+            query_budget=query_budget,
+            slow_query_threshold=slow_query_threshold,
+        )
+        # A frame found in a same-origin frame belongs to that frame's document, so it's used from there
+        if isinstance(parent, WithinFrame):
+            path = parent._document_path()
+        else:
+            path = tuple(parent._frame_path) if parent else ()
+        with _switched_to(self.driver, path):
+            same_origin = self.driver.execute_script(
+                "return arguments[0].contentDocument !== null", frame
+            )
+        if same_origin:
+            # Same-origin frames are searched from the current document through `contentDocument`
+            self._frame_path = path
+            self._container = {"kind": "frame", "frame": frame}
+        else:
+            # Cross-origin frames can only be searched by switching into them
+            self._frame_path = (*path, frame)
+
+    def _document_path(self) -> Tuple[WebElement, ...]:
+        # The frames to switch through to get into the frame's own document
+        path = tuple(self._frame_path)
+        if self._container is not None:
+            path = (*path, self.element)
+        return path
+
+    @contextmanager
+    def switch_to(self) -> Iterator[None]:
+        with _switched_to(self.driver, self._document_path()):
+            yield
+
+    def _find_elements(
+        self, locator: Locator, query_budget: Optional[float] = None
+    ) -> List[WebElement]:
+        loc = self._ensure_locator(locator)
+        if _is_selenium_query(loc) and self._container is None:
+            self._round_trip()
+            with _switched_to(self.driver, self._frame_path):
+                return self._finder.find_elements(*loc)
+        return self._query_all(loc, query_budget)
+
+    def _execute_script(self, script: str, *args) -> Any:
+        with _switched_to(self.driver, self._frame_path):
+            return super()._execute_script(script, *args)
+
+    def _execute_async_script(self, function: str, *args) -> Any:
+        with _switched_to(self.driver, self._frame_path):
+            return super()._execute_async_script(function, *args)
+
+    def _get_multiple_elements_message(self, locator: Locator, els: List[WebElement]):
+        with self.switch_to():
+            return super()._get_multiple_elements_message(locator, els)
+
+
+class AllFrames(Screen[DriverType]):
+    def __init__(self, driver: DriverType, **options: Any):
+        super().__init__(driver, **options)
+        self._container = {"kind": "frames"}
+
+    def _find_elements(
+        self, locator: Locator, query_budget: Optional[float] = None
+    ) -> List[WebElement]:
+        loc = self._ensure_locator(locator)
+        budget = self._budget(query_budget)
+        result, frame_paths = self._execute_script(
+            "return [__stl__.query(arguments[0], arguments[1], arguments[2]), __stl__.crossOriginFrames()]",
+            self._container,
+            loc._js_spec(),
+            {"budget": None if budget is None else budget * 1000},
+        )
+        els = self._check_query_time(loc, result, budget)
+        for path in frame_paths:
+            with _switched_to(self.driver, path):
+                frames = self._share_hooks(AllFrames(self.driver, **self._options()))
+                # The frames are searched as part of this query
+                frames._event = self._event
+                els += frames._find_elements(loc, query_budget)
+        return els
+
+    def snapshot(self) -> "SnapshotScreen":
+        return self._share_hooks(SnapshotScreen(self.driver, self._frame_snapshots(())))
+
+    def _frame_snapshots(self, path: Sequence[WebElement]) -> List[Snapshot]:
+        # A round trip for the same-origin frames and one for every cross-origin frame
+        with _switched_to(self.driver, path):
+            results, frame_paths = self._execute_script(
+                "return [__stl__.snapshot(arguments[0]), __stl__.crossOriginFrames()]",
+                self._container,
+            )
+        snapshots = self._snapshots(results, path)
+        for frame_path in frame_paths:
+            snapshots += self._frame_snapshots((*path, *frame_path))
+        return snapshots
+
+
+class SnapshotScreen(
+    _BaseScreen[SnapshotNode, Optional[SnapshotNode], List[SnapshotNode]]
+):
+    # Answers queries from snapshots of the page without any round trips, so the results don't change
+    # and only the queries are available. The find_by methods don't wait and the options of the
+    # queries are ignored. Locators that need the browser to lay out the page, like Role, aren't
+    # supported.
+    def __init__(self, driver: Any, snapshots: Sequence[Snapshot]):
+        self.driver = driver
+        self._snapshots = list(snapshots)
+        self._configure(
+            idle_window=None,
+            fast_forward=False,
+            query_budget=None,
+            slow_query_threshold=None,
+        )
+
+    def snapshot(self) -> "SnapshotScreen":
+        return self
+
+    def elements(self, nodes: Sequence[SnapshotNode]) -> List[WebElement]:
+        # A round trip for every snapshot the nodes come from
+        positions: Dict[Snapshot, List[int]] = {}
+        for i, node in enumerate(nodes):
+            positions.setdefault(node.snapshot, []).append(i)
+        elements: List[Any] = [None] * len(nodes)
+        for snapshot, indexes in positions.items():
+            found = snapshot.elements([nodes[i] for i in indexes])
+            for i, element in zip(indexes, found):
+                elements[i] = element
+        return elements
+
+    def _find_elements(self, locator: Locator) -> List[SnapshotNode]:
+        loc = self._ensure_locator(locator)
+        return [
+            node for snapshot in self._snapshots for node in snapshot.query_all(loc)
+        ]
+
+    @_observed("get")
+    def get_by(self, locator: Locator, **_options: Any) -> SnapshotNode:
+        node = self.query_by(locator)
+        if node is None:
+            raise NoSuchElementException(f"No element found with locator {locator}")
+        return node
+
+    @_observed("query")
+    def query_by(self, locator: Locator, **_options: Any) -> Optional[SnapshotNode]:
+        nodes = self._find_elements(locator)
+        if len(nodes) > 1:
+            raise MultipleSuchElementsException(
+                self._get_multiple_elements_message(locator, nodes)
+            )
+        return nodes[0] if nodes else None
+
+    @_observed("find")
+    def find_by(self, locator: Locator, **_options: Any) -> SnapshotNode:
+        return self.get_by(locator)
+
+    @_observed("all")
+    def get_all_by(self, locator: Locator, **_options: Any) -> List[SnapshotNode]:
+        nodes = self._find_elements(locator)
+        if not nodes:
+            raise NoSuchElementException(f"No element found with locator {locator}")
+        return nodes
+
+    @_observed("all")
+    def query_all_by(self, locator: Locator, **_options: Any) -> List[SnapshotNode]:
+        return self._find_elements(locator)
+
+    @_observed("all")
+    def find_all_by(self, locator: Locator, **_options: Any) -> List[SnapshotNode]:
+        return self.get_all_by(locator)
+
+    def query_all_by_texts(
+        self,
+        texts: Iterable[str],
+        *,
+        selector: str = "*",
+        exact: bool = True,
+        ignore: Union[str, bool] = "script, style",
+    ) -> Dict[str, List[SnapshotNode]]:
+        found: Dict[str, List[SnapshotNode]] = {text: [] for text in texts}
+        for snapshot in self._snapshots:
+            nodes = snapshot.query_all_by_texts(
+                found, selector=selector, exact=exact, ignore=ignore
+            )
+            for text, matched in nodes.items():
+                found[text] += matched
+        return found
+
+    def _get_multiple_elements_message(
+        self, locator: Locator, els: List[SnapshotNode]
+    ) -> str:
+        nodes = "".join(
+            f"{i}. {' '.join(node.outer_html.splitlines())}\n"
+            for i, node in enumerate(els)
+        )
+        return f"{len(els)} elements found with locator {locator}:\n{nodes}"
 
 
 __all__ = [
+    "AllFrames",
     "MultipleSuchElementsException",
     "NoSuchElementException",
+    "QueryBudgetExceededException",
     "Screen",
+    "SlowQueryWarning",
+    "SnapshotScreen",
     "Within",
+    "WithinFrame",
     "locators",
 ]
@@ -0,0 +1,1875 @@
+import inspect
+import math
+import operator
+import re
+from functools import lru_cache
+from html import escape, unescape
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+from . import locators
+
+void_elements = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+}
+# The browser doesn't turn the content of these into elements of the document, so it's skipped
+inert_elements = {"template", "noscript", "iframe", "noembed", "noframes", "xmp"}
+raw_text_elements = {"script", "style"}
+labelable_elements = {
+    "button",
+    "meter",
+    "output",
+    "progress",
+    "select",
+    "textarea",
+    "input",
+}
+form_elements = {
+    "button",
+    "input",
+    "select",
+    "textarea",
+    "optgroup",
+    "option",
+    "fieldset",
+}
+
+VISIBLE, ENABLED, SELECTED, CHECKED, DISABLED = 1, 2, 4, 8, 16
+
+
+class SnapshotNode:
+    # An element of a snapshot. It has the state of the element when the snapshot was taken and
+    # `element()` finds it in the page again
+    __slots__ = (
+        "attributes",
+        "children",
+        "elements",
+        "end",
+        "flags",
+        "index",
+        "parent_node",
+        "position",
+        "snapshot",
+        "tag_name",
+        "value",
+    )
+
+    def __init__(
+        self,
+        snapshot: "Snapshot",
+        index: int,
+        tag_name: str,
+        attributes: Dict[str, str],
+        parent_node: Optional["SnapshotNode"],
+    ):
+        self.snapshot = snapshot
+        self.index = index
+        # Index of the last descendant, the descendants are the nodes in between
+        self.end = index
+        self.tag_name = tag_name
+        self.attributes = attributes
+        self.parent_node = parent_node
+        self.children: List[Any] = []
+        self.elements: List[SnapshotNode] = []
+        self.position = 0
+        self.flags = VISIBLE | ENABLED
+        self.value: Optional[str] = attributes.get("value")
+        if parent_node is not None:
+            self.position = len(parent_node.elements)
+            parent_node.children.append(self)
+            parent_node.elements.append(self)
+
+    def __repr__(self) -> str:
+        return f"<SnapshotNode {self.index} {self.outer_html[:80]}>"
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        if name == "value" and self.value is not None:
+            return self.value
+        if name == "outerHTML":
+            return self.outer_html
+        return self.attributes.get(name)
+
+    def is_displayed(self) -> bool:
+        return bool(self.flags & VISIBLE)
+
+    def is_enabled(self) -> bool:
+        return bool(self.flags & ENABLED)
+
+    def is_selected(self) -> bool:
+        return bool(self.flags & (SELECTED | CHECKED))
+
+    @property
+    def text_content(self) -> str:
+        return "".join(_texts(self))
+
+    @property
+    def outer_html(self) -> str:
+        return "".join(_serialize(self))
+
+    def element(self) -> Any:
+        return self.snapshot.elements([self])[0]
+
+
+def _texts(node: SnapshotNode, skip: Iterable[str] = ()) -> Iterable[str]:
+    stack: List[Any] = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+        elif item.tag_name not in skip:
+            stack.extend(reversed(item.children))
+
+
+def _serialize(node: SnapshotNode) -> Iterable[str]:
+    stack: List[Any] = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, tuple):
+            yield item[0]
+        elif isinstance(item, str):
+            yield escape(item, quote=False)
+        else:
+            attributes = "".join(
+                f' {name}="{escape(value)}"' for name, value in item.attributes.items()
+            )
+            yield f"<{item.tag_name}{attributes}>"
+            if item.tag_name in void_elements:
+                continue
+            stack.append((f"</{item.tag_name}>",))
+            # Scripts and styles aren't escaped
+            raw = item.tag_name in raw_text_elements
+            for child in reversed(item.children):
+                stack.append((child,) if raw and isinstance(child, str) else child)
+
+
+# `outerHTML` is always well formed: attribute values are quoted and every element that isn't void has
+# an end tag, so it's tokenized with regular expressions instead of a full HTML parser
+_markup = re.compile(
+    r"""<(?:(/?)([A-Za-z][^\s/>]*)((?:[^>"']|"[^"]*"|'[^']*')*)>|!--.*?-->|!\[CDATA\[(.*?)\]\]>|[!?][^>]*>)""",
+    re.S,
+)
+_attribute = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+_template = re.compile(r"<(/?)template\b[^>]*>", re.I)
+
+
+def _unescape_html(text: str) -> str:
+    return unescape(text) if "&" in text else text
+
+
+def _parse(snapshot: "Snapshot", html: str) -> List[SnapshotNode]:
+    nodes: List[SnapshotNode] = []
+    stack: List[SnapshotNode] = []
+
+    def text(data: str):
+        if data and stack:
+            stack[-1].children.append(_unescape_html(data))
+
+    def close(tag: str):
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i].tag_name == tag:
+                for node in stack[i:]:
+                    node.end = len(nodes) - 1
+                del stack[i:]
+                return
+
+    pos = 0
+    while True:
+        match = _markup.search(html, pos)
+        if match is None:
+            text(html[pos:])
+            break
+        text(html[pos : match.start()])
+        pos = match.end()
+        closing, tag, attributes, cdata = match.groups()
+        if tag is None:
+            if cdata and stack:
+                stack[-1].children.append(cdata)
+            continue
+        tag = tag.lower()
+        if closing:
+            close(tag)
+            continue
+        node = SnapshotNode(
+            snapshot,
+            len(nodes),
+            tag,
+            (
+                {
+                    name.lower(): _unescape_html(double or single or bare)
+                    for name, double, single, bare in _attribute.findall(attributes)
+                }
+                if attributes.strip(" /")
+                else {}
+            ),
+            stack[-1] if stack else None,
+        )
+        nodes.append(node)
+        if tag in void_elements or attributes.endswith("/"):
+            continue
+        if tag in raw_text_elements or tag in inert_elements:
+            # The content is text, or isn't part of the document like the content of templates
+            end = _end_of_content(html, tag, pos)
+            if tag in raw_text_elements and pos < end:
+                node.children.append(html[pos:end])
+            pos = html.find(">", end) + 1 or len(html)
+            node.end = len(nodes) - 1
+            continue
+        stack.append(node)
+    for node in stack:
+        node.end = len(nodes) - 1
+    return nodes
+
+
+def _end_of_content(html: str, tag: str, pos: int) -> int:
+    if tag != "template":
+        end = re.compile(f"</{tag}\\b", re.I).search(html, pos)
+        return len(html) if end is None else end.start()
+    # Templates can be nested
+    depth = 0
+    for match in _template.finditer(html, pos):
+        if not match.group(1):
+            depth += 1
+        elif depth:
+            depth -= 1
+        else:
+            return match.start()
+    return len(html)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _matches(text: Optional[str], matcher: locators.Matcher, exact: bool) -> bool:
+    # The same matching as Testing Library with its default normalizer
+    if text is None:
+        return False
+    text = _normalize(text)
+    if isinstance(matcher, str):
+        return text == matcher if exact else matcher.lower() in text.lower()
+    return matcher.search(text) is not None
+
+
+class _Compound:
+    __slots__ = ("attributes", "classes", "ids", "pseudos", "tag")
+
+    def __init__(self) -> None:
+        self.tag: Optional[str] = None
+        self.ids: List[str] = []
+        self.classes: List[str] = []
+        self.attributes: List[Tuple[str, Optional[str], Optional[str], bool]] = []
+        self.pseudos: List[Callable[[SnapshotNode], bool]] = []
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.tag or self.ids or self.classes or self.attributes or self.pseudos
+        )
+
+
+# A complex selector is a list of compound selectors and the combinators before them
+_Complex = List[Tuple[Optional[str], _Compound]]
+
+_css_combinator = re.compile(r"\s*([>+~,])?\s*")
+_css_ident = re.compile(r"-?(?:[\w-]|\\.)+")
+_css_attribute = re.compile(
+    r"""\[\s*((?:[\w:-]|\\.)+)\s*(?:([~|^$*]?=)\s*(?:"((?:[^"\\]|\\.)*)"|'((?:[^'\\]|\\.)*)'|((?:[\w-]|\\.)+))\s*([iIsS])?\s*)?\]"""
+)
+_css_nth = re.compile(r"^([+-]?\d*)n\s*(?:([+-])\s*(\d+))?$")
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+def _nth(argument: str) -> Tuple[int, int]:
+    argument = argument.strip().lower()
+    if argument == "odd":
+        return 2, 1
+    if argument == "even":
+        return 2, 0
+    if re.fullmatch(r"[+-]?\d+", argument):
+        return 0, int(argument)
+    match = _css_nth.match(argument)
+    if match is None:
+        raise ValueError(f"Invalid nth argument: {argument!r}")
+    a = {"": 1, "+": 1, "-": -1}.get(match.group(1))
+    b = int(match.group(3) or 0) * (-1 if match.group(2) == "-" else 1)
+    return int(match.group(1)) if a is None else a, b
+
+
+def _nth_matches(a: int, b: int, position: int) -> bool:
+    if a == 0:
+        return position == b
+    return (position - b) % a == 0 and (position - b) // a >= 0
+
+
+def _siblings(node: SnapshotNode) -> List[SnapshotNode]:
+    return node.parent_node.elements if node.parent_node is not None else [node]
+
+
+def _of_type(node: SnapshotNode) -> List[SnapshotNode]:
+    return [sibling for sibling in _siblings(node) if sibling.tag_name == node.tag_name]
+
+
+def _pseudo(name: str, argument: Optional[str]) -> Callable[[SnapshotNode], bool]:
+    if argument is None and name in _pseudo_classes:
+        return _pseudo_classes[name]
+    if argument is not None and name in ("not", "is", "where"):
+        selectors = _parse_css(argument)
+        if name == "not":
+            return lambda node: not _matches_selectors(node, selectors)
+        return lambda node: _matches_selectors(node, selectors)
+    if argument is not None and name in _nth_positions:
+        a, b = _nth(argument)
+        position = _nth_positions[name]
+        return lambda node: _nth_matches(a, b, position(node))
+    raise ValueError(f"The :{name} pseudo-class isn't supported in snapshots")
+
+
+# The position the `:nth-*()` pseudo-classes count, starting at 1
+_nth_positions: Dict[str, Callable[[SnapshotNode], int]] = {
+    "nth-child": lambda node: node.position + 1,
+    "nth-last-child": lambda node: len(_siblings(node)) - node.position,
+    "nth-of-type": lambda node: _of_type(node).index(node) + 1,
+    "nth-last-of-type": lambda node: len(_of_type(node)) - _of_type(node).index(node),
+}
+
+_pseudo_classes: Dict[str, Callable[[SnapshotNode], bool]] = {
+    "first-child": lambda node: node.position == 0,
+    "last-child": lambda node: node.position == len(_siblings(node)) - 1,
+    "only-child": lambda node: len(_siblings(node)) == 1,
+    "first-of-type": lambda node: _of_type(node)[0] is node,
+    "last-of-type": lambda node: _of_type(node)[-1] is node,
+    "only-of-type": lambda node: len(_of_type(node)) == 1,
+    "empty": lambda node: not any(node.children),
+    "root": lambda node: node.parent_node is None and node.snapshot.page,
+    "checked": lambda node: bool(node.flags & (CHECKED | SELECTED)),
+    "disabled": lambda node: bool(node.flags & DISABLED),
+    "enabled": lambda node: node.tag_name in form_elements
+    and not node.flags & DISABLED,
+}
+
+
+def _closing_parenthesis(selector: str, start: int) -> int:
+    depth = 0
+    quote = None
+    for i in range(start, len(selector)):
+        char = selector[i]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError(f"Unbalanced parentheses in {selector!r}")
+
+
+@lru_cache(maxsize=256)
+def _parse_css(selector: str) -> Tuple[_Complex, ...]:
+    # The selectors that don't depend on layout or user interaction
+    text = selector.strip()
+    groups: List[_Complex] = []
+    steps: _Complex = []
+    compound = _Compound()
+    combinator: Optional[str] = None
+    pos = 0
+    while pos < len(text):
+        if not (text[pos].isspace() or text[pos] in ">+~,"):
+            pos = _parse_simple(selector, text, pos, compound)
+            continue
+        match = _css_combinator.match(text, pos)
+        assert match is not None
+        pos = match.end()
+        if not compound:
+            raise ValueError(f"Invalid CSS selector: {selector!r}")
+        steps.append((combinator, compound))
+        compound = _Compound()
+        combinator = match.group(1) or " "
+        if combinator == ",":
+            groups.append(steps)
+            steps = []
+            combinator = None
+    if not compound:
+        raise ValueError(f"Invalid CSS selector: {selector!r}")
+    steps.append((combinator, compound))
+    groups.append(steps)
+    return tuple(groups)
+
+
+def _parse_simple(selector: str, text: str, pos: int, compound: _Compound) -> int:
+    # Adds the simple selector at `pos` to the compound selector and returns where it ends
+    char = text[pos]
+    if char == "*":
+        compound.tag = "*"
+        return pos + 1
+    if char in "#.":
+        match = _css_ident.match(text, pos + 1)
+        if match is None:
+            raise ValueError(f"Invalid CSS selector: {selector!r}")
+        name = _unescape(match.group())
+        (compound.ids if char == "#" else compound.classes).append(name)
+        return match.end()
+    if char == "[":
+        return _parse_attribute(selector, text, pos, compound)
+    if char == ":":
+        return _parse_pseudo(selector, text, pos, compound)
+    match = _css_ident.match(text, pos)
+    if match is None or compound:
+        raise ValueError(f"Invalid CSS selector: {selector!r}")
+    compound.tag = _unescape(match.group()).lower()
+    return match.end()
+
+
+def _parse_attribute(selector: str, text: str, pos: int, compound: _Compound) -> int:
+    match = _css_attribute.match(text, pos)
+    if match is None:
+        raise ValueError(f"Invalid attribute selector in {selector!r}")
+    name, operator, *values, flag = match.groups()
+    value = next((v for v in values if v is not None), None)
+    compound.attributes.append(
+        (
+            _unescape(name).lower(),
+            operator,
+            None if value is None else _unescape(value),
+            flag in ("i", "I"),
+        )
+    )
+    return match.end()
+
+
+def _parse_pseudo(selector: str, text: str, pos: int, compound: _Compound) -> int:
+    if text.startswith("::", pos):
+        raise ValueError(f"Pseudo-elements can't be queried: {selector!r}")
+    match = _css_ident.match(text, pos + 1)
+    if match is None:
+        raise ValueError(f"Invalid CSS selector: {selector!r}")
+    pos = match.end()
+    argument = None
+    if text.startswith("(", pos):
+        end = _closing_parenthesis(text, pos)
+        argument = text[pos + 1 : end]
+        pos = end + 1
+    compound.pseudos.append(_pseudo(match.group().lower(), argument))
+    return pos
+
+
+_attribute_operators: Dict[str, Callable[[str, str], bool]] = {
+    "=": lambda actual, value: actual == value,
+    "~=": lambda actual, value: value in actual.split(),
+    "|=": lambda actual, value: actual == value or actual.startswith(value + "-"),
+    # An empty value never matches these
+    "^=": lambda actual, value: bool(value) and actual.startswith(value),
+    "$=": lambda actual, value: bool(value) and actual.endswith(value),
+    "*=": lambda actual, value: bool(value) and value in actual,
+}
+
+
+def _matches_attribute(
+    node: SnapshotNode,
+    name: str,
+    operator: Optional[str],
+    value: Optional[str],
+    ignore_case: bool,
+) -> bool:
+    actual = node.attributes.get(name)
+    if actual is None:
+        return False
+    if operator is None or value is None:
+        return True
+    if ignore_case:
+        actual, value = actual.lower(), value.lower()
+    return _attribute_operators[operator](actual, value)
+
+
+def _matches_compound(node: SnapshotNode, compound: _Compound) -> bool:
+    if compound.tag not in (None, "*") and node.tag_name != compound.tag:
+        return False
+    if any(node.attributes.get("id") != value for value in compound.ids):
+        return False
+    if compound.classes:
+        classes = node.attributes.get("class", "").split()
+        if any(name not in classes for name in compound.classes):
+            return False
+    return all(
+        _matches_attribute(node, *attribute) for attribute in compound.attributes
+    ) and all(pseudo(node) for pseudo in compound.pseudos)
+
+
+def _matches_complex(node: SnapshotNode, steps: _Complex, i: int) -> bool:
+    combinator, compound = steps[i]
+    if not _matches_compound(node, compound):
+        return False
+    if i == 0:
+        return True
+    return any(
+        _matches_complex(other, steps, i - 1) for other in _combined(node, combinator)
+    )
+
+
+def _combined(node: SnapshotNode, combinator: Optional[str]) -> Iterable[SnapshotNode]:
+    # The elements the compound selector before the combinator has to match one of
+    if combinator == ">":
+        return [] if node.parent_node is None else [node.parent_node]
+    if combinator == " ":
+        return _ancestors(node)
+    siblings = _siblings(node)[: node.position]
+    return siblings[-1:] if combinator == "+" else siblings
+
+
+def _ancestors(node: SnapshotNode) -> Iterator[SnapshotNode]:
+    ancestor = node.parent_node
+    while ancestor is not None:
+        yield ancestor
+        ancestor = ancestor.parent_node
+
+
+def _matches_selectors(node: SnapshotNode, selectors: Sequence[_Complex]) -> bool:
+    return any(_matches_complex(node, steps, len(steps) - 1) for steps in selectors)
+
+
+# XPath 1.0 without namespaces and variables: location paths on every axis, predicates, the operators and
+# the core functions, like contains(), starts-with(), normalize-space() and text(). The snapshot itself
+# is the document node and the root element its only child.
+class _TextNode:
+    __slots__ = ("order", "parent_node", "value")
+
+    def __init__(
+        self, parent_node: SnapshotNode, value: str, order: Tuple[int, int, int]
+    ):
+        self.parent_node = parent_node
+        self.value = value
+        self.order = order
+
+
+class _AttributeNode:
+    __slots__ = ("name", "order", "parent_node", "value")
+
+    def __init__(self, parent_node: SnapshotNode, name: str, position: int):
+        self.parent_node = parent_node
+        self.name = name
+        self.value = parent_node.attributes[name]
+        self.order = (parent_node.index, 1, position)
+
+
+# Evaluated with the snapshot, the context node, its position and the size of the context
+_XPathContext = Tuple[Any, Any, int, int]
+_XPathExpression = Callable[[_XPathContext], Any]
+# The expressions know what they return: "nodes", "string", "number", "boolean" or "any"
+_Compiled = Tuple[_XPathExpression, str]
+_StepSpec = Tuple[str, Tuple[str, str], List[_XPathExpression], bool]
+# The selection, the predicates and whether the axis lists the nodes in reverse document order
+_Step = Tuple[Callable[[Any, Any], List[Any]], List[_XPathExpression], bool]
+
+
+def _order(item: Any) -> Tuple[int, int, int]:
+    # Sorts nodes in document order: elements by index, their attributes and the text after them next
+    if isinstance(item, SnapshotNode):
+        return (item.index, 0, 0)
+    if isinstance(item, Snapshot):
+        return (-1, 0, 0)
+    return item.order
+
+
+def _string_value(item: Any) -> str:
+    if isinstance(item, SnapshotNode):
+        return item.text_content
+    if isinstance(item, Snapshot):
+        return item.root.text_content
+    return item.value
+
+
+def _child_items(node: SnapshotNode) -> List[Any]:
+    items: List[Any] = []
+    after = node.index
+    for i, child in enumerate(node.children):
+        if isinstance(child, str):
+            items.append(_TextNode(node, child, (after, 2, i)))
+        else:
+            items.append(child)
+            after = child.end
+    return items
+
+
+def _descendant_items(node: SnapshotNode) -> List[Any]:
+    items: List[Any] = []
+    stack = _child_items(node)[::-1]
+    while stack:
+        item = stack.pop()
+        items.append(item)
+        if isinstance(item, SnapshotNode):
+            stack.extend(_child_items(item)[::-1])
+    return items
+
+
+def _children(snapshot: "Snapshot", item: Any, text: bool) -> List[Any]:
+    if item is snapshot:
+        return [snapshot.root]
+    if not isinstance(item, SnapshotNode):
+        return []
+    return _child_items(item) if text else item.elements
+
+
+def _descendants(snapshot: "Snapshot", item: Any, text: bool) -> List[Any]:
+    if item is snapshot:
+        item = snapshot.root
+        return [item, *(_descendant_items(item) if text else snapshot.nodes[1:])]
+    if not isinstance(item, SnapshotNode):
+        return []
+    if text:
+        return _descendant_items(item)
+    return snapshot.nodes[item.index + 1 : item.end + 1]
+
+
+def _descendants_named(snapshot: "Snapshot", item: Any, name: str) -> List[Any]:
+    nodes = snapshot._by_tag.get(name, [])
+    if item is snapshot:
+        return nodes
+    if not isinstance(item, SnapshotNode):
+        return []
+    return snapshot._in_scope(nodes, (item.index + 1, item.end))
+
+
+def _xpath_ancestors(snapshot: "Snapshot", item: Any) -> List[Any]:
+    ancestors = []
+    while item is not snapshot:
+        item = item.parent_node or snapshot
+        ancestors.append(item)
+    return ancestors
+
+
+def _contains(ancestor: Any, item: Any) -> bool:
+    while isinstance(item, (SnapshotNode, _TextNode, _AttributeNode)):
+        item = item.parent_node
+        if item is ancestor:
+            return True
+    return False
+
+
+def _sibling_items(item: Any, text: bool) -> List[Any]:
+    if isinstance(item, _AttributeNode) or getattr(item, "parent_node", None) is None:
+        return []
+    return _child_items(item.parent_node) if text else item.parent_node.elements
+
+
+def _following(snapshot: "Snapshot", item: Any, text: bool) -> List[Any]:
+    if isinstance(item, SnapshotNode) and not text:
+        return snapshot.nodes[item.end + 1 :]
+    key = _order(item)
+    return [
+        other
+        for other in _descendants(snapshot, snapshot, text)
+        if _order(other) > key and not _contains(item, other)
+    ]
+
+
+def _preceding(snapshot: "Snapshot", item: Any, text: bool) -> List[Any]:
+    # Reverse axes list the nearest nodes first
+    if isinstance(item, SnapshotNode) and not text:
+        return (
+            [
+                node
+                for node in snapshot.nodes[item.index - 1 :: -1]
+                if node.end < item.index
+            ]
+            if item.index
+            else []
+        )
+    key = _order(item)
+    return [
+        other
+        for other in _descendants(snapshot, snapshot, text)[::-1]
+        if _order(other) < key and not _contains(other, item)
+    ]
+
+
+def _attributes(item: Any) -> List[Any]:
+    if not isinstance(item, SnapshotNode):
+        return []
+    return [_AttributeNode(item, name, i) for i, name in enumerate(item.attributes)]
+
+
+def _named_attribute(item: Any, name: str) -> List[Any]:
+    if not isinstance(item, SnapshotNode) or name not in item.attributes:
+        return []
+    return [_AttributeNode(item, name, list(item.attributes).index(name))]
+
+
+# Every axis gets the snapshot, the context node and whether text nodes are needed
+_xpath_axes: Dict[str, Callable[[Any, Any, bool], List[Any]]] = {
+    "ancestor": lambda snapshot, item, _text: _xpath_ancestors(snapshot, item),
+    "ancestor-or-self": lambda snapshot, item, _text: [
+        item,
+        *_xpath_ancestors(snapshot, item),
+    ],
+    "attribute": lambda _snapshot, item, _text: _attributes(item),
+    "child": _children,
+    "descendant": _descendants,
+    "descendant-or-self": lambda snapshot, item, text: [
+        item,
+        *_descendants(snapshot, item, text),
+    ],
+    "following": _following,
+    "following-sibling": lambda _snapshot, item, text: [
+        other for other in _sibling_items(item, text) if _order(other) > _order(item)
+    ],
+    "parent": lambda snapshot, item, _text: _xpath_ancestors(snapshot, item)[:1],
+    "preceding": _preceding,
+    "preceding-sibling": lambda _snapshot, item, text: [
+        other
+        for other in _sibling_items(item, text)[::-1]
+        if _order(other) < _order(item)
+    ],
+    "self": lambda _snapshot, item, _text: [item],
+}
+_xpath_node_types: Dict[str, Callable[[Any], bool]] = {
+    "comment": lambda _item: False,
+    "node": lambda _item: True,
+    "processing-instruction": lambda _item: False,
+    "text": lambda item: isinstance(item, _TextNode),
+}
+
+
+def _node_test(axis: str, test: Tuple[str, str]) -> Callable[[Any], bool]:
+    kind, name = test
+    if kind in _xpath_node_types:
+        return _xpath_node_types[kind]
+    if axis == "attribute":
+        return lambda item: kind == "*" or item.name == name
+    if kind == "*":
+        return lambda item: isinstance(item, SnapshotNode)
+    return lambda item: isinstance(item, SnapshotNode) and item.tag_name == name
+
+
+def _step_select(axis: str, test: Tuple[str, str]) -> Callable[[Any, Any], List[Any]]:
+    kind, name = test
+    if kind == "name" and axis == "attribute":
+        return lambda _snapshot, item: _named_attribute(item, name)
+    if kind == "name" and axis == "descendant":
+        return lambda snapshot, item: _descendants_named(snapshot, item, name)
+    items = _xpath_axes[axis]
+    text = kind in ("text", "node")
+    matches = _node_test(axis, test)
+    return lambda snapshot, item: [
+        other for other in items(snapshot, item, text) if matches(other)
+    ]
+
+
+_reverse_axes = ("ancestor", "ancestor-or-self", "preceding", "preceding-sibling")
+_descendant_or_self: _StepSpec = ("descendant-or-self", ("node", ""), [], False)
+
+
+def _compile_steps(specs: List[_StepSpec]) -> List[_Step]:
+    # `//name` is the descendant axis unless its predicates count positions, which avoids going through
+    # every node of the snapshot
+    merged: List[_StepSpec] = []
+    for spec in specs:
+        axis, test, predicates, positional = spec
+        if (
+            merged
+            and merged[-1] is _descendant_or_self
+            and axis == "child"
+            and not positional
+        ):
+            merged[-1] = ("descendant", test, predicates, False)
+        else:
+            merged.append(spec)
+    return [
+        (_step_select(axis, test), predicates, axis in _reverse_axes)
+        for axis, test, predicates, _ in merged
+    ]
+
+
+def _filter_items(
+    snapshot: "Snapshot", items: List[Any], predicates: List[_XPathExpression]
+) -> List[Any]:
+    for predicate in predicates:
+        size = len(items)
+        kept = []
+        for position, item in enumerate(items, 1):
+            value = predicate((snapshot, item, position, size))
+            # A number selects the node at that position
+            if (value == position) if isinstance(value, float) else _to_boolean(value):
+                kept.append(item)
+        items = kept
+    return items
+
+
+def _run_steps(snapshot: "Snapshot", items: List[Any], steps: List[_Step]) -> List[Any]:
+    for select, predicates, reverse in steps:
+        if len(items) == 1:
+            # The nodes of a single one are already unique, like in most predicates
+            items = _filter_items(snapshot, select(snapshot, items[0]), predicates)
+            if reverse:
+                items = items[::-1]
+            continue
+        found: Dict[Tuple[int, int, int], Any] = {}
+        for item in items:
+            for other in _filter_items(snapshot, select(snapshot, item), predicates):
+                found.setdefault(_order(other), other)
+        items = [found[key] for key in sorted(found)]
+    return items
+
+
+def _node_set(value: Any) -> List[Any]:
+    if not isinstance(value, list):
+        raise ValueError(f"Expected a node-set instead of {_to_string(value)!r}")
+    return value
+
+
+def _union(left: Any, right: Any) -> List[Any]:
+    found = {_order(item): item for item in (*_node_set(left), *_node_set(right))}
+    return [found[key] for key in sorted(found)]
+
+
+def _to_string(value: Any) -> str:
+    if isinstance(value, list):
+        return _string_value(value[0]) if value else ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+        return str(int(value)) if value == int(value) else repr(value)
+    return value
+
+
+_xpath_number = re.compile(r"\s*-?(?:\d+(?:\.\d*)?|\.\d+)\s*")
+
+
+def _to_number(value: Any) -> float:
+    if isinstance(value, list):
+        value = _to_string(value)
+    if isinstance(value, str):
+        return float(value) if _xpath_number.fullmatch(value) else math.nan
+    return float(value)
+
+
+def _to_boolean(value: Any) -> bool:
+    if isinstance(value, float):
+        return not (value == 0 or math.isnan(value))
+    return bool(value)
+
+
+_xpath_relations: Dict[str, Callable[[float, float], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _compare_values(comparison: str, left: Any, right: Any) -> bool:
+    if comparison not in ("=", "!="):
+        return _xpath_relations[comparison](_to_number(left), _to_number(right))
+    if isinstance(left, bool) or isinstance(right, bool):
+        left, right = _to_boolean(left), _to_boolean(right)
+    elif isinstance(left, float) or isinstance(right, float):
+        left, right = _to_number(left), _to_number(right)
+    return (left == right) == (comparison == "=")
+
+
+def _compare(comparison: str, left: Any, right: Any) -> bool:
+    # Node-sets are compared through the string values of their nodes, a comparison is true when it's
+    # true for any of them
+    if isinstance(left, list) and isinstance(right, list):
+        values = [_string_value(item) for item in right]
+        return any(
+            _compare_values(comparison, _string_value(item), value)
+            for item in left
+            for value in values
+        )
+    if isinstance(right, list):
+        return _compare(
+            {"<": ">", "<=": ">=", ">": "<", ">=": "<="}.get(comparison, comparison),
+            right,
+            left,
+        )
+    if not isinstance(left, list):
+        return _compare_values(comparison, left, right)
+    if isinstance(right, bool):
+        return _compare_values(comparison, _to_boolean(left), right)
+    return any(_compare_values(comparison, _string_value(item), right) for item in left)
+
+
+def _divide(left: float, right: float) -> float:
+    if right != 0:
+        return left / right
+    if left == 0 or math.isnan(left):
+        return math.nan
+    return math.copysign(math.inf, left) * math.copysign(1, right)
+
+
+def _modulo(left: float, right: float) -> float:
+    if right == 0 or not math.isfinite(left):
+        return math.nan
+    return math.fmod(left, right)
+
+
+def _integral(function: Callable[[float], int], number: float) -> float:
+    # NaN and the infinities stay as they are
+    return float(function(number)) if math.isfinite(number) else number
+
+
+def _round(number: float) -> float:
+    # Halves are rounded up, also the negative ones
+    return _integral(lambda number: math.floor(number + 0.5), number)
+
+
+def _comparison(comparison: str) -> Callable[..., _XPathExpression]:
+    return lambda left, right: lambda context: _compare(
+        comparison, left(context), right(context)
+    )
+
+
+def _arithmetic(
+    function: Callable[[float, float], float],
+) -> Callable[..., _XPathExpression]:
+    return lambda left, right: lambda context: function(
+        _to_number(left(context)), _to_number(right(context))
+    )
+
+
+_xpath_operators: Dict[str, Callable[..., _XPathExpression]] = {
+    "or": lambda left, right: lambda context: _to_boolean(left(context))
+    or _to_boolean(right(context)),
+    "and": lambda left, right: lambda context: _to_boolean(left(context))
+    and _to_boolean(right(context)),
+    **{
+        comparison: _comparison(comparison)
+        for comparison in ("=", "!=", *_xpath_relations)
+    },
+    "+": _arithmetic(operator.add),
+    "-": _arithmetic(operator.sub),
+    "*": _arithmetic(operator.mul),
+    "div": _arithmetic(_divide),
+    "mod": _arithmetic(_modulo),
+}
+
+
+def _context_or(context: _XPathContext, value: Any) -> Any:
+    # Functions whose argument is optional use the context node instead
+    return [context[1]] if value is None else value
+
+
+def _substring(
+    _context: _XPathContext, text: Any, start: Any, length: Any = None
+) -> str:
+    first = _round(_to_number(start))
+    last = math.inf if length is None else first + _round(_to_number(length))
+    return "".join(
+        char
+        for position, char in enumerate(_to_string(text), 1)
+        if first <= position < last
+    )
+
+
+def _substring_before(_context: _XPathContext, text: Any, separator: Any) -> str:
+    text, separator = _to_string(text), _to_string(separator)
+    if not separator:
+        return ""
+    before, found, _ = text.partition(separator)
+    return before if found else ""
+
+
+def _substring_after(_context: _XPathContext, text: Any, separator: Any) -> str:
+    text, separator = _to_string(text), _to_string(separator)
+    if not separator:
+        return text
+    _, found, after = text.partition(separator)
+    return after if found else ""
+
+
+def _translate(_context: _XPathContext, text: Any, source: Any, target: Any) -> str:
+    source, target = _to_string(source), _to_string(target)
+    table: Dict[int, Optional[str]] = {}
+    for i, char in enumerate(source):
+        table.setdefault(ord(char), target[i] if i < len(target) else None)
+    return _to_string(text).translate(table)
+
+
+def _name(context: _XPathContext, nodes: Any = None) -> str:
+    items = _node_set(_context_or(context, nodes))
+    if items and isinstance(items[0], SnapshotNode):
+        return items[0].tag_name
+    if items and isinstance(items[0], _AttributeNode):
+        return items[0].name
+    return ""
+
+
+def _id(context: _XPathContext, ids: Any) -> List[Any]:
+    values = (
+        [_string_value(item) for item in ids]
+        if isinstance(ids, list)
+        else [_to_string(ids)]
+    )
+    found = {
+        node.index: node
+        for value in values
+        for name in value.split()
+        for node in context[0]._by_id.get(name, [])[:1]
+    }
+    return [found[index] for index in sorted(found)]
+
+
+# Every function gets the context and its arguments, and declares what it returns
+_xpath_functions: Dict[str, Tuple[Callable[..., Any], str]] = {
+    "boolean": (lambda _context, value: _to_boolean(value), "boolean"),
+    "ceiling": (
+        lambda _context, value: _integral(math.ceil, _to_number(value)),
+        "number",
+    ),
+    "concat": (
+        lambda _context, first, second, *rest: "".join(
+            map(_to_string, (first, second, *rest))
+        ),
+        "string",
+    ),
+    "contains": (
+        lambda _context, text, part: _to_string(part) in _to_string(text),
+        "boolean",
+    ),
+    "count": (lambda _context, nodes: float(len(_node_set(nodes))), "number"),
+    "false": (lambda _context: False, "boolean"),
+    "floor": (
+        lambda _context, value: _integral(math.floor, _to_number(value)),
+        "number",
+    ),
+    "id": (_id, "nodes"),
+    "last": (lambda context: float(context[3]), "number"),
+    "local-name": (_name, "string"),
+    "name": (_name, "string"),
+    "normalize-space": (
+        lambda context, text=None: _normalize(_to_string(_context_or(context, text))),
+        "string",
+    ),
+    "not": (lambda _context, value: not _to_boolean(value), "boolean"),
+    "number": (
+        lambda context, value=None: _to_number(_context_or(context, value)),
+        "number",
+    ),
+    "position": (lambda context: float(context[2]), "number"),
+    "round": (lambda _context, value: _round(_to_number(value)), "number"),
+    "starts-with": (
+        lambda _context, text, prefix: _to_string(text).startswith(_to_string(prefix)),
+        "boolean",
+    ),
+    "string": (
+        lambda context, value=None: _to_string(_context_or(context, value)),
+        "string",
+    ),
+    "string-length": (
+        lambda context, text=None: float(len(_to_string(_context_or(context, text)))),
+        "number",
+    ),
+    "substring": (_substring, "string"),
+    "substring-after": (_substring_after, "string"),
+    "substring-before": (_substring_before, "string"),
+    "sum": (
+        lambda _context, nodes: sum(
+            _to_number(_string_value(item)) for item in _node_set(nodes)
+        ),
+        "number",
+    ),
+    "translate": (_translate, "string"),
+    "true": (lambda _context: True, "boolean"),
+}
+
+_xpath_token = re.compile(
+    r"""\s*(?:(\d+(?:\.\d*)?|\.\d+)|"([^"]*)"|'([^']*)'|(\.\.|::|//|!=|<=|>=|[()\[\].@,/|+\-=<>*$])|((?:[A-Za-z_][\w.\-]*:)?[A-Za-z_][\w.\-]*))"""
+)
+
+
+def _xpath_tokens(xpath: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    while xpath[pos:].strip():
+        match = _xpath_token.match(xpath, pos)
+        if match is None:
+            raise ValueError(
+                f"Invalid XPath {xpath!r}: unexpected {xpath[pos:].strip()[0]!r}"
+            )
+        number, double, single, symbol, name = match.groups()
+        if number is not None:
+            tokens.append(("number", number))
+        elif symbol is not None:
+            tokens.append(("symbol", symbol))
+        elif name is not None:
+            tokens.append(("name", name))
+        else:
+            tokens.append(("literal", single if double is None else double))
+        pos = match.end()
+    return [*tokens, ("end", ""), ("end", "")]
+
+
+class _XPathParser:
+    # Compiles an expression into functions of the context, by recursive descent over the grammar of
+    # XPath 1.0. The binary operators are parsed from the lowest precedence to the highest.
+    def __init__(self, xpath: str):
+        self.xpath = xpath
+        self.tokens = _xpath_tokens(xpath)
+        self.pos = 0
+        # Whether each predicate being parsed uses position() or last(), the innermost one last
+        self.positional: List[bool] = []
+        # The expressions that are a string literal or a relative `@name`, by what they are
+        self.literals: Dict[_XPathExpression, str] = {}
+        self.attributes: Dict[_XPathExpression, str] = {}
+
+    def parse(self) -> _XPathExpression:
+        expression, _ = self.expression()
+        if self.peek()[0] != "end":
+            raise self.error()
+        return expression
+
+    def peek(self, offset: int = 0) -> Tuple[str, str]:
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def accept(self, *symbols: str) -> Optional[str]:
+        kind, value = self.peek()
+        if kind == "symbol" and value in symbols:
+            self.pos += 1
+            return value
+        return None
+
+    def expect(self, symbol: str):
+        if self.accept(symbol) is None:
+            raise self.error(f"expected {symbol!r} instead of")
+
+    def error(self, reason: str = "unexpected") -> ValueError:
+        kind, value = self.peek()
+        if kind == "end":
+            return ValueError(f"Invalid XPath {self.xpath!r}: it ends too early")
+        return ValueError(f"Invalid XPath {self.xpath!r}: {reason} {value!r}")
+
+    def unsupported(self, what: str) -> ValueError:
+        return ValueError(
+            f"The XPath {self.xpath!r} isn't supported in snapshots: {what} can't be used"
+        )
+
+    def binary(
+        self, operand: Callable[[], _Compiled], operators: Tuple[str, ...], kind: str
+    ) -> _Compiled:
+        left, left_kind = operand()
+        while True:
+            token_kind, value = self.peek()
+            # Operator names like `and` and `div` are only operators where an operator is expected
+            if token_kind not in ("symbol", "name") or value not in operators:
+                return left, left_kind
+            self.pos += 1
+            right, _ = operand()
+            left, left_kind = (
+                self.attribute_comparison(value, left, right)
+                or _xpath_operators[value](left, right)
+            ), kind
+
+    def attribute_comparison(
+        self, comparison: str, left: _XPathExpression, right: _XPathExpression
+    ) -> Optional[_XPathExpression]:
+        # `@name = 'value'` looks the attribute up instead of going through its node-set
+        if comparison not in ("=", "!="):
+            return None
+        if left in self.literals:
+            left, right = right, left
+        if left not in self.attributes or right not in self.literals:
+            return None
+        name, value, equal = (
+            self.attributes[left],
+            self.literals[right],
+            comparison == "=",
+        )
+        return lambda context: (
+            isinstance(context[1], SnapshotNode)
+            and name in context[1].attributes
+            and (context[1].attributes[name] == value) == equal
+        )
+
+    def expression(self) -> _Compiled:
+        return self.binary(self.and_expression, ("or",), "boolean")
+
+    def and_expression(self) -> _Compiled:
+        return self.binary(self.equality, ("and",), "boolean")
+
+    def equality(self) -> _Compiled:
+        return self.binary(self.relational, ("=", "!="), "boolean")
+
+    def relational(self) -> _Compiled:
+        return self.binary(self.additive, tuple(_xpath_relations), "boolean")
+
+    def additive(self) -> _Compiled:
+        return self.binary(self.multiplicative, ("+", "-"), "number")
+
+    def multiplicative(self) -> _Compiled:
+        return self.binary(self.unary, ("*", "div", "mod"), "number")
+
+    def unary(self) -> _Compiled:
+        if self.accept("-"):
+            operand, _ = self.unary()
+            return (lambda context: -_to_number(operand(context))), "number"
+        left, kind = self.path()
+        while self.accept("|"):
+            right, _ = self.path()
+            left, kind = self.union(left, right), "nodes"
+        return left, kind
+
+    @staticmethod
+    def union(left: _XPathExpression, right: _XPathExpression) -> _XPathExpression:
+        return lambda context: _union(left(context), right(context))
+
+    def path(self) -> _Compiled:
+        kind, value = self.peek()
+        if kind == "symbol" and value == "$":
+            raise self.unsupported("variables")
+        is_function = (
+            kind == "name"
+            and self.peek(1) == ("symbol", "(")
+            and value not in _xpath_node_types
+        )
+        if not (kind in ("number", "literal") or value == "(" or is_function):
+            return self.location_path(), "nodes"
+        primary, primary_kind = self.primary()
+        predicates, _ = self.predicates()
+        if predicates:
+            primary, primary_kind = self.filtered(primary, predicates), "nodes"
+        separator = self.accept("/", "//")
+        if separator is None:
+            return primary, primary_kind
+        specs = [_descendant_or_self] if separator == "//" else []
+        steps = _compile_steps([*specs, *self.relative_path()])
+        return (
+            lambda context: _run_steps(context[0], _node_set(primary(context)), steps)
+        ), "nodes"
+
+    @staticmethod
+    def filtered(
+        primary: _XPathExpression, predicates: List[_XPathExpression]
+    ) -> _XPathExpression:
+        return lambda context: _filter_items(
+            context[0], _node_set(primary(context)), predicates
+        )
+
+    def primary(self) -> _Compiled:
+        kind, value = self.peek()
+        self.pos += 1
+        if kind == "number":
+            number = float(value)
+            return (lambda _context: number), "number"
+        if kind == "literal":
+
+            def literal(_context: _XPathContext) -> str:
+                return value
+
+            self.literals[literal] = value
+            return literal, "string"
+        if kind == "symbol":
+            expression = self.expression()
+            self.expect(")")
+            return expression
+        return self.function_call(value)
+
+    def function_call(self, name: str) -> _Compiled:
+        if name not in _xpath_functions:
+            raise self.unsupported(f"the {name}() function")
+        function, kind = _xpath_functions[name]
+        self.expect("(")
+        arguments: List[_XPathExpression] = []
+        if not self.accept(")"):
+            arguments.append(self.expression()[0])
+            while self.accept(","):
+                arguments.append(self.expression()[0])
+            self.expect(")")
+        try:
+            inspect.signature(function).bind(None, *arguments)
+        except TypeError:
+            raise ValueError(
+                f"Invalid XPath {self.xpath!r}: wrong number of arguments for {name}()"
+            ) from None
+        if name in ("position", "last") and self.positional:
+            self.positional[-1] = True
+        return (
+            lambda context: function(
+                context, *(argument(context) for argument in arguments)
+            )
+        ), kind
+
+    def location_path(self) -> _XPathExpression:
+        specs: List[_StepSpec] = []
+        absolute = self.accept("/", "//")
+        if absolute == "//":
+            specs.append(_descendant_or_self)
+        if absolute != "/" or self.at_step():
+            specs += self.relative_path()
+        steps = _compile_steps(specs)
+        if absolute:
+            return lambda context: _run_steps(context[0], [context[0]], steps)
+
+        def path(context: _XPathContext) -> List[Any]:
+            return _run_steps(context[0], [context[1]], steps)
+
+        if len(specs) == 1:
+            axis, (kind, name), predicates, _ = specs[0]
+            if axis == "attribute" and kind == "name" and not predicates:
+                self.attributes[path] = name
+        return path
+
+    def at_step(self) -> bool:
+        kind, value = self.peek()
+        return kind == "name" or (kind == "symbol" and value in (".", "..", "@", "*"))
+
+    def relative_path(self) -> List[_StepSpec]:
+        specs = [self.step()]
+        while True:
+            separator = self.accept("/", "//")
+            if separator is None:
+                return specs
+            if separator == "//":
+                specs.append(_descendant_or_self)
+            specs.append(self.step())
+
+    def step(self) -> _StepSpec:
+        if self.accept("."):
+            return ("self", ("node", ""), [], False)
+        if self.accept(".."):
+            return ("parent", ("node", ""), [], False)
+        axis = "child"
+        if self.accept("@"):
+            axis = "attribute"
+        elif self.peek(1) == ("symbol", "::"):
+            axis = self.peek()[1]
+            if axis not in _xpath_axes:
+                raise self.unsupported(f"the {axis} axis")
+            self.pos += 2
+        test = self.node_test()
+        predicates, positional = self.predicates()
+        return axis, test, predicates, positional
+
+    def node_test(self) -> Tuple[str, str]:
+        kind, value = self.peek()
+        if kind not in ("symbol", "name") or (kind == "symbol" and value != "*"):
+            raise self.error()
+        self.pos += 1
+        if value == "*":
+            return ("*", "")
+        if value in _xpath_node_types and self.accept("("):
+            if value == "processing-instruction" and self.peek()[0] == "literal":
+                self.pos += 1
+            self.expect(")")
+            return (value, "")
+        if ":" in value:
+            raise self.unsupported("namespaces")
+        # Element and attribute names are lowercase in HTML documents
+        return ("name", value.lower())
+
+    def predicates(self) -> Tuple[List[_XPathExpression], bool]:
+        predicates = []
+        positional = False
+        while self.accept("["):
+            self.positional.append(False)
+            predicate, kind = self.expression()
+            # A predicate that is a number selects a position
+            positional = (
+                self.positional.pop() or kind in ("number", "any") or positional
+            )
+            self.expect("]")
+            predicates.append(predicate)
+        return predicates, positional
+
+
+@lru_cache(maxsize=256)
+def _compile_xpath(xpath: str) -> _XPathExpression:
+    return _XPathParser(xpath).parse()
+
+
+def _label_own_text(node: SnapshotNode) -> str:
+    # The text of a label without the text of the controls inside it
+    return "".join(_texts(node, skip=labelable_elements))
+
+
+# Queries run on a range of node indexes: the descendants of a node are the nodes between its index
+# and `end`, because the nodes are numbered in document order
+Scope = Tuple[int, int]
+
+
+class Snapshot:
+    # The elements of a page or an element, parsed from its HTML, with indexes for the queries that
+    # are answered from it
+    def __init__(
+        self,
+        html: str,
+        flags: Sequence[int],
+        values: Dict[str, str],
+        *,
+        page: bool = True,
+        resolve: Optional[Callable[[List[int], List[str]], List[Any]]] = None,
+    ):
+        self.page: bool = page
+        self._resolve = resolve
+        self.nodes = _parse(self, html)
+        if len(self.nodes) != len(flags):
+            raise ValueError(
+                f"The snapshot has {len(self.nodes)} elements but the page had {len(flags)}"
+            )
+        for node, node_flags in zip(self.nodes, flags):
+            node.flags = node_flags
+        for index, value in values.items():
+            self.nodes[int(index)].value = value
+        self.root = self.nodes[0]
+
+        self._by_id: Dict[str, List[SnapshotNode]] = {}
+        self._by_tag: Dict[str, List[SnapshotNode]] = {}
+        self._by_class: Dict[str, List[SnapshotNode]] = {}
+        self._by_attribute: Dict[str, List[SnapshotNode]] = {}
+        for node in self.nodes:
+            self._by_tag.setdefault(node.tag_name, []).append(node)
+            for name, value in node.attributes.items():
+                self._by_attribute.setdefault(name, []).append(node)
+            if "id" in node.attributes:
+                self._by_id.setdefault(node.attributes["id"], []).append(node)
+            for name in node.attributes.get("class", "").split():
+                self._by_class.setdefault(name, []).append(node)
+        # Built the first time they're needed
+        self._by_text: Optional[Dict[str, List[SnapshotNode]]] = None
+        self._by_value: Dict[str, Dict[str, List[SnapshotNode]]] = {}
+        self._labels: Optional[Dict[int, List[SnapshotNode]]] = None
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def elements(self, nodes: Sequence[SnapshotNode]) -> List[Any]:
+        # Finds the nodes in the page with a single round trip
+        if self._resolve is None:
+            raise ValueError("The snapshot isn't connected to a page")
+        elements = self._resolve(
+            [node.index for node in nodes], [node.tag_name for node in nodes]
+        )
+        for node, element in zip(nodes, elements):
+            if element is None:
+                raise StaleElementReferenceException(
+                    f"{node!r} has changed since the snapshot was taken"
+                )
+        return elements
+
+    def query_all(self, locator: locators.Locator) -> List[SnapshotNode]:
+        # The page itself is the container of page snapshots, so the root element is included
+        return self._query(locator, (0 if self.page else 1, self.root.end), None)
+
+    def query_all_by_texts(
+        self,
+        texts: Iterable[str],
+        *,
+        selector: str = "*",
+        exact: bool = True,
+        ignore: Union[str, bool] = "script, style",
+    ) -> Dict[str, List[SnapshotNode]]:
+        # A single pass over the nodes for all the texts, like Text locators the root element of an
+        # element snapshot is included as the container
+        found: Dict[str, List[SnapshotNode]] = {text: [] for text in texts}
+        lowered = [(text, text.lower()) for text in found]
+        for node in self.nodes:
+            node_text = _normalize(self._node_text(node))
+            if exact:
+                matched = [node_text] if node_text in found else []
+            else:
+                lower = node_text.lower()
+                matched = [text for text, wanted in lowered if wanted in lower]
+            if (
+                matched
+                and self._matches_css(node, selector)
+                and not (ignore and self._matches_css(node, str(ignore)))
+            ):
+                for text in matched:
+                    found[text].append(node)
+        return found
+
+    def _query(
+        self,
+        locator: locators.Locator,
+        scope: Scope,
+        container: Optional[SnapshotNode],
+    ) -> List[SnapshotNode]:
+        nodes = self._base_query(locator, scope, container)
+        for f in locator._filters:
+            if f["type"] == "nth":
+                index = f["index"]
+                nodes = [nodes[index]] if -len(nodes) <= index < len(nodes) else []
+            elif f["type"] == "visible":
+                nodes = [node for node in nodes if node.flags & VISIBLE]
+            elif f["type"] == "enabled":
+                nodes = [node for node in nodes if node.flags & ENABLED]
+            elif f["type"] == "attribute":
+                nodes = [
+                    node
+                    for node in nodes
+                    if node.attributes.get(f["name"]) is not None
+                    and (
+                        f["value"] in node.attributes[f["name"]]
+                        if f.get("contains")
+                        else node.attributes[f["name"]] == f["value"]
+                    )
+                ]
+            elif f["type"] == "has":
+                nodes = [
+                    node
+                    for node in nodes
+                    if self._query(f["has"], (node.index + 1, node.end), node)
+                ]
+        return nodes
+
+    def _base_query(
+        self,
+        locator: locators.Locator,
+        scope: Scope,
+        container: Optional[SnapshotNode],
+    ) -> List[SnapshotNode]:
+        query = _snapshot_queries.get(locator.BY)
+        if query is None:
+            raise ValueError(
+                f"{locator.__class__.__name__} locators need the browser and can't be queried in a snapshot"
+            )
+        return query(self, locator, scope, container)
+
+    def _scoped(
+        self,
+        locator: locators.Scoped,
+        scope: Scope,
+        container: Optional[SnapshotNode],
+    ) -> List[SnapshotNode]:
+        found = {
+            node.index: node
+            for outer in self._query(locator.outer, scope, container)
+            for node in self._query(locator.inner, (outer.index + 1, outer.end), outer)
+        }
+        return [found[index] for index in sorted(found)]
+
+    def _or(
+        self,
+        locator: locators.Or,
+        scope: Scope,
+        container: Optional[SnapshotNode],
+    ) -> List[SnapshotNode]:
+        found = {
+            node.index: node
+            for inner in locator.locators
+            for node in self._query(inner, scope, container)
+        }
+        return [found[index] for index in sorted(found)]
+
+    def _alt_text(self, locator: locators.AltText, scope: Scope) -> List[SnapshotNode]:
+        return [
+            node
+            for node in self._with_attribute("alt", locator.text, locator.exact, scope)
+            if node.tag_name in ("img", "input", "area") or "-" in node.tag_name
+        ]
+
+    def _in_scope(self, nodes: List[SnapshotNode], scope: Scope) -> List[SnapshotNode]:
+        start, end = scope
+        if start == 0 and end == len(self.nodes) - 1:
+            return list(nodes)
+        return [node for node in nodes if start <= node.index <= end]
+
+    def _scope_nodes(self, scope: Scope) -> List[SnapshotNode]:
+        return self.nodes[scope[0] : scope[1] + 1]
+
+    def _select(self, selector: str, scope: Scope) -> List[SnapshotNode]:
+        selectors = _parse_css(selector)
+        found: Dict[int, SnapshotNode] = {}
+        for steps in selectors:
+            compound = steps[-1][1]
+            # Only the elements that can match the last compound selector are checked
+            if compound.ids:
+                candidates = self._by_id.get(compound.ids[0], [])
+            elif compound.classes:
+                candidates = self._by_class.get(compound.classes[0], [])
+            elif compound.tag not in (None, "*"):
+                candidates = self._by_tag.get(compound.tag, [])
+            elif compound.attributes:
+                candidates = self._by_attribute.get(compound.attributes[0][0], [])
+            else:
+                candidates = self.nodes
+            for node in self._in_scope(candidates, scope):
+                if _matches_complex(node, steps, len(steps) - 1):
+                    found[node.index] = node
+        return [found[index] for index in sorted(found)]
+
+    def _matches_css(self, node: SnapshotNode, selector: str) -> bool:
+        return selector == "*" or _matches_selectors(node, _parse_css(selector))
+
+    def _xpath(
+        self, xpath: str, scope: Scope, container: Optional[SnapshotNode]
+    ) -> List[SnapshotNode]:
+        # Relative paths start from the container, absolute ones from the document
+        context: Any = container or (self if self.page else self.root)
+        found = _compile_xpath(xpath)((self, context, 1, 1))
+        if not isinstance(found, list):
+            raise ValueError(f"The XPath {xpath!r} doesn't select elements")
+        start, end = scope
+        return [
+            node
+            for node in found
+            if isinstance(node, SnapshotNode) and start <= node.index <= end
+        ]
+
+    def _node_text(self, node: SnapshotNode) -> str:
+        # The text Testing Library matches: the node's own text, or the value of input buttons
+        if node.tag_name == "input" and node.attributes.get("type", "").lower() in (
+            "submit",
+            "button",
+            "reset",
+        ):
+            return node.value or ""
+        return "".join(child for child in node.children if isinstance(child, str))
+
+    def _text(
+        self,
+        locator: locators.Text,
+        scope: Scope,
+        container: Optional[SnapshotNode],
+    ) -> List[SnapshotNode]:
+        if isinstance(locator.text, str) and locator.exact:
+            if self._by_text is None:
+                self._by_text = {}
+                for node in self.nodes:
+                    self._by_text.setdefault(
+                        _normalize(self._node_text(node)), []
+                    ).append(node)
+            candidates = self._in_scope(self._by_text.get(locator.text, []), scope)
+        else:
+            candidates = [
+                node
+                for node in self._scope_nodes(scope)
+                if _matches(self._node_text(node), locator.text, locator.exact)
+            ]
+        # Testing Library also matches the container itself
+        if container is None and not self.page:
+            container = self.root
+        if container is not None and _matches(
+            self._node_text(container), locator.text, locator.exact
+        ):
+            candidates.insert(0, container)
+        return [
+            node
+            for node in candidates
+            if self._matches_css(node, locator.selector)
+            and not (locator.ignore and self._matches_css(node, str(locator.ignore)))
+        ]
+
+    def _with_attribute(
+        self, name: str, matcher: locators.Matcher, exact: bool, scope: Scope
+    ) -> List[SnapshotNode]:
+        if isinstance(matcher, str) and exact:
+            if name not in self._by_value:
+                by_value: Dict[str, List[SnapshotNode]] = {}
+                for node in self._by_attribute.get(name, []):
+                    by_value.setdefault(_normalize(node.attributes[name]), []).append(
+                        node
+                    )
+                self._by_value[name] = by_value
+            return self._in_scope(self._by_value[name].get(matcher, []), scope)
+        return [
+            node
+            for node in self._in_scope(self._by_attribute.get(name, []), scope)
+            if _matches(node.attributes[name], matcher, exact)
+        ]
+
+    def _title(self, locator: locators.Title, scope: Scope) -> List[SnapshotNode]:
+        found = {
+            node.index: node
+            for node in self._with_attribute(
+                "title", locator.title, locator.exact, scope
+            )
+        }
+        for node in self._in_scope(self._by_tag.get("title", []), scope):
+            if (
+                node.parent_node is not None
+                and node.parent_node.tag_name == "svg"
+                and _matches(self._node_text(node), locator.title, locator.exact)
+            ):
+                found[node.index] = node
+        return [found[index] for index in sorted(found)]
+
+    def _display_value(
+        self, locator: locators.DisplayValue, scope: Scope
+    ) -> List[SnapshotNode]:
+        found = []
+        for node in self._scope_nodes(scope):
+            if node.tag_name == "select":
+                options = self._in_scope(
+                    self._by_tag.get("option", []), (node.index + 1, node.end)
+                )
+                if any(
+                    option.flags & SELECTED
+                    and _matches(self._node_text(option), locator.value, locator.exact)
+                    for option in options
+                ):
+                    found.append(node)
+            elif node.tag_name in ("input", "textarea"):
+                if _matches(node.value or "", locator.value, locator.exact):
+                    found.append(node)
+        return found
+
+    def _real_labels(self) -> Dict[int, List[SnapshotNode]]:
+        # The labels of every labelable element, like `element.labels`
+        if self._labels is None:
+            self._labels = {}
+            for label in self._by_tag.get("label", []):
+                if "for" in label.attributes:
+                    controls = self._by_id.get(label.attributes["for"], [])[:1]
+                else:
+                    controls = [
+                        node
+                        for node in self.nodes[label.index + 1 : label.end + 1]
+                        if node.tag_name in labelable_elements
+                    ][:1]
+                for control in controls:
+                    if control.tag_name in labelable_elements and not (
+                        control.tag_name == "input"
+                        and control.attributes.get("type", "").lower() == "hidden"
+                    ):
+                        self._labels.setdefault(control.index, []).append(label)
+        return self._labels
+
+    def _label_text(
+        self, locator: locators.LabelText, scope: Scope
+    ) -> List[SnapshotNode]:
+        # Follows Testing Library: elements match through their labels, the elements that label
+        # them with `aria-labelledby` or their `aria-label`
+        text, exact = locator.text, locator.exact
+        found: Dict[int, SnapshotNode] = {}
+        for node in self._scope_nodes(scope):
+            labels = self._labels_of(node, locator.selector, scope)
+            if labels is None:
+                continue
+            for content, control in labels:
+                if control is not None and _matches(content, text, exact):
+                    found.setdefault(control.index, control)
+            values = [content for content, _ in labels if content]
+            if _matches(" ".join(values), text, exact):
+                found.setdefault(node.index, node)
+            if len(values) > 1:
+                for i, value in enumerate(values):
+                    others = values[:i] + values[i + 1 :]
+                    if _matches(value, text, exact) or (
+                        len(others) > 1 and _matches(" ".join(others), text, exact)
+                    ):
+                        found.setdefault(node.index, node)
+        for node in self._with_attribute("aria-label", text, exact, scope):
+            found.setdefault(node.index, node)
+        return [
+            node for node in found.values() if self._matches_css(node, locator.selector)
+        ]
+
+    def _labels_of(
+        self, node: SnapshotNode, selector: str, scope: Scope
+    ) -> Optional[List[Tuple[str, Optional[SnapshotNode]]]]:
+        # The content of every label of the node, with the control inside the label if there's one
+        labelled_by = node.attributes.get("aria-labelledby")
+        if labelled_by:
+            labels: List[Tuple[str, Optional[SnapshotNode]]] = []
+            for label_id in labelled_by.split(" "):
+                labelling = self._in_scope(self._by_id.get(label_id, []), scope)[:1]
+                labels.append(
+                    (self._label_content(labelling[0]) if labelling else "", None)
+                )
+            return labels
+        real_labels = self._real_labels()
+        if node.index not in real_labels:
+            return None
+        labels = []
+        for label in real_labels[node.index]:
+            controls = [
+                control
+                for control in self.nodes[label.index + 1 : label.end + 1]
+                if control.tag_name in labelable_elements
+                and self._matches_css(control, selector)
+            ]
+            labels.append(
+                (self._label_content(label), controls[0] if controls else None)
+            )
+        return labels
+
+    def _label_content(self, node: SnapshotNode) -> str:
+        if node.tag_name == "label":
+            return _label_own_text(node)
+        return node.value or node.text_content
+
+
+# The query of every locator a snapshot can answer, by the locator's `BY`
+_snapshot_queries: Dict[
+    str,
+    Callable[[Snapshot, Any, Scope, Optional[SnapshotNode]], List[SnapshotNode]],
+] = {
+    "within": Snapshot._scoped,
+    "or": Snapshot._or,
+    locators.By.CSS_SELECTOR: lambda snapshot, locator, scope, _container: (
+        snapshot._select(locator.selector, scope)
+    ),
+    locators.By.XPATH: lambda snapshot, locator, scope, container: snapshot._xpath(
+        locator.selector, scope, container
+    ),
+    locators.By.ID: lambda snapshot, locator, scope, _container: snapshot._in_scope(
+        snapshot._by_id.get(locator.selector, []), scope
+    ),
+    # Selenium looks names up with [name="..."], without normalizing the whitespace
+    locators.By.NAME: lambda snapshot, locator, scope, _container: [
+        node
+        for node in snapshot._in_scope(snapshot._by_attribute.get("name", []), scope)
+        if node.attributes["name"] == locator.selector
+    ],
+    locators.By.TAG_NAME: lambda snapshot, locator, scope, _container: (
+        snapshot._in_scope(snapshot._by_tag.get(locator.selector.lower(), []), scope)
+    ),
+    locators.By.CLASS_NAME: lambda snapshot, locator, scope, _container: (
+        snapshot._in_scope(snapshot._by_class.get(locator.selector, []), scope)
+    ),
+    locators.By.TEXT: Snapshot._text,
+    locators.By.LABEL_TEXT: lambda snapshot, locator, scope, _container: (
+        snapshot._label_text(locator, scope)
+    ),
+    locators.By.PLACEHOLDER_TEXT: lambda snapshot, locator, scope, _container: (
+        snapshot._with_attribute("placeholder", locator.text, locator.exact, scope)
+    ),
+    locators.By.TEST_ID: lambda snapshot, locator, scope, _container: (
+        snapshot._with_attribute("data-testid", locator.text, locator.exact, scope)
+    ),
+    locators.By.ALT_TEXT: lambda snapshot, locator, scope, _container: (
+        snapshot._alt_text(locator, scope)
+    ),
+    locators.By.TITLE: lambda snapshot, locator, scope, _container: snapshot._title(
+        locator, scope
+    ),
+    locators.By.DISPLAY_VALUE: lambda snapshot, locator, scope, _container: (
+        snapshot._display_value(locator, scope)
+    ),
+}
+
+__all__ = ["Snapshot", "SnapshotNode"]
@@ -0,0 +1,224 @@
+import json
+import sys
+import threading
+import weakref
+from collections import defaultdict
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from ..hooks import QueryEvent
+
+query_kinds = ("get", "query", "find", "all")
+timeout_errors = ("NoSuchElementException", "TimeoutException")
+
+
+class _TraceFile:
+    # The buffered lines and the file, kept apart from the writer so it can be flushed when the
+    # writer is garbage collected or the interpreter exits
+    def __init__(self, path: str):
+        self.path = path
+        self.lines: List[str] = []
+        self.lock = threading.Lock()
+        self.file: Optional[IO[str]] = None
+
+    def append(self, line: str, buffer_size: int):
+        with self.lock:
+            self.lines.append(line)
+            if len(self.lines) >= buffer_size:
+                self._write()
+
+    def _write(self):
+        if self.file is None:
+            self.file = open(self.path, "a")
+        self.file.write("".join(f"{line}\n" for line in self.lines))
+        self.lines = []
+
+    def flush(self):
+        with self.lock:
+            if self.lines:
+                self._write()
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+class TraceWriter:
+    # A hook that appends the queries to a JSONL file. Lines are buffered and written in batches,
+    # call `close()` (or use it as a context manager) to write the rest. Whatever is left when the
+    # writer is garbage collected or the interpreter exits is written then.
+    def __init__(self, path: str, *, driver: Any = None, buffer_size: int = 100):
+        self.path = path
+        self.driver = driver
+        self.buffer_size = buffer_size
+        self._file = _TraceFile(path)
+        self._finalizer = weakref.finalize(self, self._file.close)
+
+    def __call__(self, event: QueryEvent):
+        # Queries are written once, together with everything that happened while they ran
+        if event.nested and event.kind != "inject":
+            return
+        record: Dict[str, Any] = {
+            "time": event.start,
+            "kind": event.kind,
+            "locator": None if event.locator is None else repr(event.locator),
+            "container": event.container,
+            "results": event.result_count,
+            "duration": event.duration,
+            "eval_time": event.eval_time,
+            "round_trips": event.round_trips,
+            "polls": event.polls,
+            "wait": event.wait,
+            "injected": event.injected,
+            "error": None,
+        }
+        if event.error is not None:
+            record["error"] = {
+                "type": type(event.error).__name__,
+                "message": str(getattr(event.error, "msg", None) or event.error)
+                .strip()
+                .split("\n")[0],
+            }
+        if event.kind == "inject" and self.driver is not None:
+            record["page"] = self._page()
+        self._file.append(json.dumps(record), self.buffer_size)
+
+    def _page(self) -> Optional[str]:
+        # Hooks run while the query's error is being raised, so a driver that can't answer (or a finder
+        # without a URL) leaves the page out instead of replacing that error
+        try:
+            return self.driver.current_url
+        except (WebDriverException, AttributeError):
+            return None
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        # The finalizer only runs once, and is dropped from the ones run at exit
+        self._finalizer()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.close()
+
+
+def read_trace(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def summarize(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    locators: Dict[str, Dict[str, Any]] = {}
+    repeated: Dict[tuple, Dict[str, Any]] = {}
+    waits: Dict[str, Dict[str, Any]] = {}
+    injections: Dict[str, int] = defaultdict(int)
+
+    for record in records:
+        if record["kind"] == "inject":
+            injections[record.get("page") or "unknown"] += 1
+            continue
+        if record["kind"] not in query_kinds:
+            continue
+        locator = record["locator"]
+        stats = locators.setdefault(locator, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += record["duration"]
+        stats["max"] = max(stats["max"], record["duration"])
+
+        # Traces written before waits were flagged tell them apart by their kind and polls
+        if record.get("wait", record["kind"] == "find" or record["polls"] > 0):
+            wait = waits.setdefault(locator, {"count": 0, "timeouts": 0, "total": 0.0})
+            wait["count"] += 1
+            wait["total"] += record["duration"]
+            error = record["error"]
+            if error and error["type"] in timeout_errors:
+                wait["timeouts"] += 1
+        else:
+            # The same query in the same container, the elements could have been reused
+            key = (record["kind"], locator, record["container"])
+            same = repeated.setdefault(key, {"count": 0, "total": 0.0})
+            same["count"] += 1
+            same["total"] += record["duration"]
+
+    return {
+        "locators": locators,
+        "repeated": [
+            {"kind": kind, "locator": locator, "container": container, **same}
+            for (kind, locator, container), same in repeated.items()
+            if same["count"] > 1
+        ],
+        "timeouts": {
+            locator: wait
+            for locator, wait in waits.items()
+            if wait["timeouts"] == wait["count"]
+        },
+        "injections": dict(injections),
+    }
+
+
+def locator_name(locator: Optional[str]) -> str:
+    # Testing Library locators are printed on several lines
+    name = " ".join(str(locator).split())
+    return name.replace("( ", "(").replace(", )", ")")
+
+
+def print_summary(
+    summary: Dict[str, Any], *, top: int = 10, file: Optional[IO[str]] = None
+):
+    file = file or sys.stdout
+
+    def section(title: str):
+        print(f"\n{title}", file=file)
+        print("-" * len(title), file=file)
+
+    section("Slowest locators")
+    locators = sorted(
+        summary["locators"].items(), key=lambda item: item[1]["total"], reverse=True
+    )
+    for locator, stats in locators[:top]:
+        print(
+            f"{stats['total']:8.2f}s total {stats['max']:8.2f}s max "
+            f"{stats['count']:6} queries  {locator_name(locator)}",
+            file=file,
+        )
+
+    section("Repeated queries")
+    for same in sorted(summary["repeated"], key=lambda s: s["total"], reverse=True)[
+        :top
+    ]:
+        print(
+            f"{same['count']:6}x {same['total']:8.2f}s  {same['kind']} "
+            f"{locator_name(same['locator'])} in {same['container']}",
+            file=file,
+        )
+
+    section("Waits that always time out")
+    timeouts = sorted(
+        summary["timeouts"].items(), key=lambda item: item[1]["total"], reverse=True
+    )
+    for locator, wait in timeouts[:top]:
+        print(
+            f"{wait['count']:6}x {wait['total']:8.2f}s  {locator_name(locator)}",
+            file=file,
+        )
+
+    section("Injections per page")
+    injections = sorted(
+        summary["injections"].items(), key=lambda item: item[1], reverse=True
+    )
+    for page, count in injections[:top]:
+        print(f"{count:6}  {page}", file=file)
+
+
+__all__ = ["TraceWriter"]
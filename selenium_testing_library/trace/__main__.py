@@ -0,0 +1,28 @@
+import argparse
+import json
+from typing import List, Optional
+
+from . import print_summary, read_trace, summarize
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m selenium_testing_library.trace",
+        description="Summarize a query trace written by TraceWriter",
+    )
+    parser.add_argument("path", help="JSONL trace file")
+    parser.add_argument(
+        "--top", type=int, default=10, help="Rows per section (default: 10)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    summary = summarize(read_trace(args.path))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary, top=args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import { describe, isEnabled, isVisible } from './dom'
+import { findOptions, setValue } from './fill'
+import { queryAll } from './query'
+import { nextFrame, waitFor } from './wait'
+
+function sameRect (a, b) {
+  return a.top === b.top && a.left === b.left && a.width === b.width && a.height === b.height
+}
+
+// The element is stable when its bounding box doesn't move between two animation frames
+export async function isStable (element) {
+  const before = element.getBoundingClientRect()
+  await nextFrame()
+  return sameRect(before, element.getBoundingClientRect())
+}
+
+// Returns the element that would receive a click at the center of `element`, or null if it's `element` itself
+export function coveringElement (element) {
+  const rect = element.getBoundingClientRect()
+  const root = element.getRootNode()
+  const hit = (root.elementFromPoint ? root : element.ownerDocument).elementFromPoint(
+    rect.left + rect.width / 2,
+    rect.top + rect.height / 2
+  )
+  if (!hit || hit === element || element.contains(hit)) return null
+  // Clicking a label activates its control, so custom styled checkboxes and radios are fine
+  const label = hit.closest('label')
+  if (label && label.control === element) return null
+  return hit
+}
+
+// Returns the reason why the element can't be acted on, or null if it's ready
+export async function notActionableReason (element, { enabled = true, stable = true } = {}) {
+  if (!element.isConnected) return 'element is detached from the DOM'
+  if (!isVisible(element)) return 'element is not visible'
+  if (enabled && !isEnabled(element)) return 'element is disabled'
+  if (stable && !(await isStable(element))) return 'element is not stable'
+  element.scrollIntoView({ block: 'center', inline: 'center', behavior: 'instant' })
+  const cover = coveringElement(element)
+  if (cover) return `element is covered by ${describe(cover)}`
+  return null
+}
+
+function dispatchPointer (element, type) {
+  const rect = element.getBoundingClientRect()
+  const init = {
+    bubbles: true,
+    cancelable: true,
+    composed: true,
+    clientX: rect.left + rect.width / 2,
+    clientY: rect.top + rect.height / 2
+  }
+  const EventType = type.startsWith('pointer') ? PointerEvent : MouseEvent
+  element.dispatchEvent(new EventType(type, init))
+}
+
+function click (element) {
+  dispatchPointer(element, 'pointerdown')
+  dispatchPointer(element, 'mousedown')
+  if (typeof element.focus === 'function') element.focus()
+  dispatchPointer(element, 'pointerup')
+  dispatchPointer(element, 'mouseup')
+  element.click()
+}
+
+function perform (element, action, value) {
+  if (action === 'click') {
+    click(element)
+  } else if (action === 'type') {
+    element.focus()
+    // Typing into a select picks the option with that value or text, like a user typing its name
+    if (element.tagName.toLowerCase() === 'select') return perform(element, 'select', value.text)
+    const current = element.isContentEditable ? element.textContent : element.value
+    const text = value.clear ? value.text : `${current || ''}${value.text}`
+    setValue(element, text)
+  } else if (action === 'select') {
+    const { missing, options } = findOptions(element, value)
+    if (missing !== undefined) return { error: 'option', option: missing }
+    setValue(element, value, options)
+  }
+  return null
+}
+
+// Waits until `find` returns a single element that is ready to be acted on
+async function waitForActionable (find, { timeout, idle, budget, container, enabled = true }) {
+  const state = await waitFor(async () => {
+    const elements = find()
+    if (elements.length !== 1) return { done: elements.length > 1, elements }
+    const reason = await notActionableReason(elements[0], { enabled })
+    return { done: !reason, elements, reason }
+  }, { timeout, idle, budget, container })
+
+  const { elements, reason } = state
+  if (!elements.length) return { error: 'missing' }
+  if (elements.length > 1) return { error: 'multiple', elements }
+  if (reason) return { error: 'not actionable', reason }
+  return { element: elements[0] }
+}
+
+// Waits for the locator to match a single actionable element and performs the action on it.
+// When `trusted` is set the element is only returned so the caller can act through WebDriver.
+export async function act (container, spec, action, value, { timeout, trusted, idle, budget }) {
+  const result = await waitForActionable(() => queryAll(container, spec), { timeout, idle, budget, container })
+  if (result.error || trusted) return result
+  return perform(result.element, action, value) || result
+}
+
+// Stable elements stay at the same position between animation frames and aren't covered by anything else
+export function findStable (container, spec, { timeout, idle, budget }) {
+  return waitForActionable(() => queryAll(container, spec), { timeout, idle, budget, container, enabled: false })
+}
+
+export function waitForStable (element, { timeout, idle, budget }) {
+  return waitForActionable(() => [element], { timeout, idle, budget, container: element, enabled: false })
+}
@@ -0,0 +1,102 @@
+// Fake timers modelled on Jest's: once installed, timers only fire when the test advances the clock
+const RealDate = window.Date
+let original = null
+let now = 0
+let nextId = 1
+const timers = new Map()
+
+function schedule (callback, delay, args, repeat) {
+  const id = nextId++
+  delay = Math.max(0, Number(delay) || 0)
+  timers.set(id, { callback, args, at: now + delay, interval: repeat ? Math.max(1, delay) : null })
+  return id
+}
+
+function nextTimer () {
+  let next = null
+  for (const [id, timer] of timers) {
+    if (!next || timer.at < next.timer.at) next = { id, timer }
+  }
+  return next
+}
+
+function fire ({ id, timer }) {
+  now = Math.max(now, timer.at)
+  if (timer.interval) {
+    timer.at += timer.interval
+  } else {
+    timers.delete(id)
+  }
+  if (typeof timer.callback === 'function') timer.callback(...timer.args)
+}
+
+// A function rather than a class, so `Date()` without `new` still returns the date as a string.
+// Reflect.construct keeps the prototype of the page's own subclasses of Date.
+function FakeDate (...args) {
+  if (!new.target) return new RealDate(now).toString()
+  return Reflect.construct(RealDate, args.length ? args : [now], new.target)
+}
+FakeDate.prototype = RealDate.prototype
+FakeDate.now = () => now
+FakeDate.parse = RealDate.parse
+FakeDate.UTC = RealDate.UTC
+
+export function installed () {
+  return original !== null
+}
+
+export function install ({ now: start }) {
+  if (original) return
+  now = start === null ? RealDate.now() : start
+  original = {
+    setTimeout: window.setTimeout,
+    clearTimeout: window.clearTimeout,
+    setInterval: window.setInterval,
+    clearInterval: window.clearInterval,
+    Date: window.Date
+  }
+  window.setTimeout = (callback, delay, ...args) => schedule(callback, delay, args, false)
+  window.setInterval = (callback, delay, ...args) => schedule(callback, delay, args, true)
+  window.clearTimeout = window.clearInterval = id => { timers.delete(id) }
+  window.Date = FakeDate
+}
+
+export function uninstall () {
+  if (!original) return
+  Object.assign(window, original)
+  original = null
+  timers.clear()
+}
+
+// Runs the timers due in the next `ms` milliseconds, including the ones they schedule along the way
+export function tick (ms) {
+  const target = now + ms
+  let next = nextTimer()
+  while (next && next.timer.at <= target) {
+    fire(next)
+    next = nextTimer()
+  }
+  now = target
+  return { pending: timers.size }
+}
+
+export function runAll ({ limit }) {
+  for (let i = 0; i < limit; i++) {
+    const next = nextTimer()
+    if (!next) return { pending: 0 }
+    fire(next)
+  }
+  throw new Error(`Aborting after running ${limit} timers, assuming an infinite loop!`)
+}
+
+// Errors from the page's timer callbacks are reported back instead of being thrown from execute_script
+export function guard (fn) {
+  return (...args) => {
+    if (!original) return { error: 'clock', message: 'The clock is not installed' }
+    try {
+      return fn(...args)
+    } catch (e) {
+      return { error: 'exception', message: String(e) }
+    }
+  }
+}
@@ -0,0 +1,17 @@
+export function describe (element) {
+  const html = element.outerHTML
+  const end = html.indexOf('>')
+  return end === -1 ? html : html.slice(0, end + 1)
+}
+
+export function isVisible (element) {
+  if (!element.isConnected) return false
+  const style = element.ownerDocument.defaultView.getComputedStyle(element)
+  if (style.visibility === 'hidden' || style.visibility === 'collapse') return false
+  const rect = element.getBoundingClientRect()
+  return rect.width > 0 && rect.height > 0
+}
+
+export function isEnabled (element) {
+  return !element.matches(':disabled') && element.getAttribute('aria-disabled') !== 'true'
+}
@@ -0,0 +1,54 @@
+import { isEnabled, isVisible } from './dom'
+import { queryAll } from './query'
+import { waitFor } from './wait'
+
+function normalize (text) {
+  return text.replace(/\s+/g, ' ').trim()
+}
+
+// Assertions on a single element fail while the element is missing and error out when there are several
+function single (assertion) {
+  return (elements, expected, options) => {
+    if (!elements.length) return { pass: false, actual: null }
+    if (elements.length > 1) return { error: 'multiple', elements }
+    return assertion(elements[0], expected, options)
+  }
+}
+
+function state (pass, name) {
+  return { pass, actual: pass ? name : `not ${name}` }
+}
+
+const assertions = {
+  count: (elements, expected) => ({ pass: elements.length === expected, actual: elements.length }),
+  text: single((element, expected, { exact }) => {
+    const actual = normalize(element.textContent)
+    return { pass: exact ? actual === expected : actual.includes(expected), actual }
+  }),
+  value: single((element, expected) => ({ pass: element.value === expected, actual: element.value })),
+  attribute: single((element, expected, { name }) => {
+    const actual = element.getAttribute(name)
+    return { pass: expected === null ? actual !== null : actual === expected, actual }
+  }),
+  visible: single(element => state(isVisible(element), 'visible')),
+  hidden: elements => {
+    const pass = !elements.some(isVisible)
+    return { pass, actual: pass ? 'hidden' : 'visible' }
+  },
+  enabled: single(element => state(isEnabled(element), 'enabled')),
+  disabled: single(element => state(!isEnabled(element), 'disabled')),
+  checked: single(element => state(element.checked === true || element.getAttribute('aria-checked') === 'true', 'checked'))
+}
+
+// Re-evaluates the assertion on every DOM change until it passes or the timeout expires
+export async function expect (container, spec, assertion, expected, { timeout, negate, idle, budget, ...options }) {
+  const result = await waitFor(() => {
+    const elements = queryAll(container, spec)
+    const outcome = assertions[assertion](elements, expected, options)
+    if (outcome.error) return { done: true, ...outcome }
+    return { done: outcome.pass !== negate, ...outcome }
+  }, { timeout, idle, budget, container })
+
+  if (result.error) return { error: result.error, elements: result.elements }
+  return { pass: result.done, actual: result.actual }
+}
@@ -0,0 +1,94 @@
+import { queryAll } from './query'
+
+function dispatch (element, type) {
+  element.dispatchEvent(new Event(type, { bubbles: true }))
+}
+
+function setNativeValue (element, value) {
+  // Go through the prototype setter so frameworks that track the value (React) notice the change
+  const descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(element), 'value')
+  if (descriptor && descriptor.set) {
+    descriptor.set.call(element, value)
+  } else {
+    element.value = value
+  }
+}
+
+export function findOptions (element, value) {
+  const wanted = (Array.isArray(value) ? value : [value]).map(String)
+  const options = Array.from(element.options)
+  const found = []
+  for (const text of wanted) {
+    const option = options.find(o => o.value === text) || options.find(o => o.text.trim() === text)
+    if (!option) return { missing: text }
+    found.push(option)
+  }
+  return { options: found }
+}
+
+export function setValue (element, value, options) {
+  const tag = element.tagName.toLowerCase()
+  const type = (element.getAttribute('type') || '').toLowerCase()
+
+  if (tag === 'select') {
+    for (const option of Array.from(element.options)) {
+      option.selected = options.includes(option)
+    }
+    dispatch(element, 'input')
+    dispatch(element, 'change')
+  } else if (type === 'checkbox' || type === 'radio') {
+    const checked = value === true
+    if (element.checked === checked) return
+    if (checked || type === 'checkbox') {
+      // click() toggles the state and fires click, input and change like a real user would
+      element.click()
+    } else {
+      element.checked = false
+      dispatch(element, 'input')
+      dispatch(element, 'change')
+    }
+  } else if (element.isContentEditable) {
+    element.textContent = String(value)
+    dispatch(element, 'input')
+  } else {
+    setNativeValue(element, String(value))
+    dispatch(element, 'input')
+    dispatch(element, 'change')
+  }
+}
+
+export function fill (container, entries, { exact }) {
+  const elements = []
+  const selected = []
+
+  // Resolve every field before touching any of them so a bad label doesn't leave the form half filled
+  for (let index = 0; index < entries.length; index++) {
+    const [label, value, native] = entries[index]
+    const found = queryAll(container, { by: 'label text', value: label, options: { exact } })
+    if (found.length !== 1) {
+      return { error: found.length ? 'multiple' : 'missing', index, elements: found }
+    }
+    const element = found[0]
+    const type = (element.getAttribute('type') || '').toLowerCase()
+    const tag = element.tagName.toLowerCase()
+    // WebDriver can't clear them before typing, so they're only filled in the page
+    if (native && (type === 'checkbox' || type === 'radio' || tag === 'select')) {
+      return { error: 'send keys', index, kind: tag === 'select' ? 'select' : type }
+    }
+    // Strings like "false" or "off" would be truthy, so only booleans can check or uncheck
+    if (!native && (type === 'checkbox' || type === 'radio') && typeof value !== 'boolean') {
+      return { error: 'value', index, value }
+    }
+    if (!native && tag === 'select') {
+      const { missing, options } = findOptions(element, value)
+      if (missing !== undefined) return { error: 'option', index, option: missing }
+      selected[index] = options
+    }
+    elements.push(element)
+  }
+
+  entries.forEach(([, value, native], index) => {
+    if (!native) setValue(elements[index], value, selected[index])
+  })
+  return { elements }
+}
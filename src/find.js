@@ -0,0 +1,79 @@
+import { queryAll } from './query'
+import { nextFrame, now, waitFor } from './wait'
+
+// Waits until the query matches at least `minCount` elements and, with `stableFor`, until
+// the number of matches hasn't changed for that many milliseconds
+export async function findAll (container, spec, { timeout, idle, budget, minCount = 1, stableFor = 0 }) {
+  let count = -1
+  let changedAt = now()
+  const state = await waitFor(() => {
+    const elements = queryAll(container, spec)
+    if (elements.length !== count) {
+      count = elements.length
+      changedAt = now()
+    }
+    const stable = now() - changedAt >= stableFor
+    return { done: elements.length >= minCount && stable, elements }
+  }, { timeout, idle, budget, container, interval: stableFor ? Math.min(100, stableFor) : 100 })
+  return { done: state.done, elements: state.elements }
+}
+
+// Evaluates every query on each DOM change until one of them matches, or all of them with `all`
+export async function findEach (container, specs, { timeout, idle, budget, all }) {
+  const state = await waitFor(() => {
+    const results = specs.map(spec => queryAll(container, spec))
+    const found = results.map(elements => elements.length > 0)
+    return { done: all ? found.every(Boolean) : found.some(Boolean), results }
+  }, { timeout, idle, budget, container })
+  return { done: state.done, results: state.results }
+}
+
+// Waits for the frame after a scroll and then until the DOM has been quiet for a whole frame,
+// which gives virtualized lists the chance to render the rows that scrolled into view
+async function rendered (root, deadline) {
+  let changed = true
+  const observer = new MutationObserver(() => { changed = true })
+  observer.observe(root, { childList: true, subtree: true, characterData: true })
+  try {
+    while (changed && now() < deadline) {
+      changed = false
+      await nextFrame()
+    }
+  } finally {
+    observer.disconnect()
+  }
+}
+
+function atEnd (scroller) {
+  return scroller.scrollTop + scroller.clientHeight >= scroller.scrollHeight - 1
+}
+
+// Scrolls the container from the top a page at a time until the query matches or the end is reached
+export async function scrollFind (container, spec, scrollSpec, { timeout }) {
+  const deadline = now() + timeout
+  const scrollers = queryAll(container, scrollSpec)
+  if (scrollers.length !== 1) {
+    return { error: scrollers.length ? 'multiple' : 'missing', elements: scrollers, container: true }
+  }
+  const scroller = scrollers[0]
+  const root = scroller.getRootNode()
+
+  let elements = queryAll(container, spec)
+  if (!elements.length && scroller.scrollTop > 0) {
+    scroller.scrollTop = 0
+    await rendered(root, deadline)
+    elements = queryAll(container, spec)
+  }
+  while (!elements.length && !atEnd(scroller) && now() < deadline) {
+    const before = scroller.scrollTop
+    scroller.scrollTop = before + Math.max(scroller.clientHeight * 0.9, 1)
+    if (scroller.scrollTop === before) break
+    await rendered(root, deadline)
+    elements = queryAll(container, spec)
+  }
+
+  if (!elements.length) return { error: 'missing' }
+  if (elements.length > 1) return { error: 'multiple', elements }
+  elements[0].scrollIntoView({ block: 'nearest' })
+  return { element: elements[0] }
+}
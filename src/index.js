@@ -1,4 +1,15 @@
 import { queryAllByText, queryAllByRole, queryAllByPlaceholderText, queryAllByLabelText, queryAllByAltText, queryAllByTitle, queryAllByTestId, queryAllByDisplayValue, screen } from '@testing-library/dom'
+import { act, findStable, waitForStable } from './actions'
+import * as clock from './clock'
+import { expect } from './expect'
+import { fill } from './fill'
+import { findAll, findEach, scrollFind } from './find'
+import { fastForward } from './motion'
+import { crossOriginFrames, map, query, queryAll } from './query'
+import * as settle from './settle'
+import { resolve, snapshot } from './snapshot'
+import { queryAllByTexts } from './texts'
+import { settled } from './wait'
 
 window.__stl__ = {}
 window.__stl__.queryAllByText = queryAllByText
@@ -10,3 +21,27 @@ window.__stl__.queryAllByTitle = queryAllByTitle
 window.__stl__.queryAllByTestId = queryAllByTestId
 window.__stl__.queryAllByDisplayValue = queryAllByDisplayValue
 window.__stl__.logTestingPlaygroundURL = screen.logTestingPlaygroundURL
+window.__stl__.fill = fill
+window.__stl__.findAll = findAll
+window.__stl__.findEach = findEach
+window.__stl__.scrollFind = scrollFind
+window.__stl__.queryAll = queryAll
+window.__stl__.query = query
+window.__stl__.map = map
+window.__stl__.crossOriginFrames = crossOriginFrames
+window.__stl__.act = act
+window.__stl__.findStable = findStable
+window.__stl__.waitForStable = waitForStable
+window.__stl__.expect = expect
+window.__stl__.queryAllByTexts = queryAllByTexts
+window.__stl__.settled = settled
+window.__stl__.snapshot = snapshot
+window.__stl__.resolve = resolve
+window.__stl__.fastForward = fastForward
+window.__stl__.settle = { install: settle.install }
+window.__stl__.clock = {
+  install: clock.install,
+  uninstall: clock.uninstall,
+  tick: clock.guard(clock.tick),
+  runAll: clock.guard(clock.runAll)
+}
@@ -0,0 +1,21 @@
+const STYLE_ID = '__stl_fast_forward__'
+
+// Finishes animations and transitions straight away so tests don't have to wait them out
+const css = `
+*, *::before, *::after {
+  animation-delay: 0s !important;
+  animation-duration: 0s !important;
+  animation-iteration-count: 1 !important;
+  transition-delay: 0s !important;
+  transition-duration: 0s !important;
+  scroll-behavior: auto !important;
+}
+`
+
+export function fastForward () {
+  if (document.getElementById(STYLE_ID)) return
+  const style = document.createElement('style')
+  style.id = STYLE_ID
+  style.textContent = css
+  ;(document.head || document.documentElement).appendChild(style)
+}
@@ -0,0 +1,222 @@
+import { getDefaultNormalizer, queryAllByText, queryAllByRole, queryAllByPlaceholderText, queryAllByLabelText, queryAllByAltText, queryAllByTitle, queryAllByTestId, queryAllByDisplayValue } from '@testing-library/dom'
+import { isEnabled, isVisible } from './dom'
+
+const testingLibraryQueries = {
+  role: queryAllByRole,
+  text: queryAllByText,
+  'placeholder text': queryAllByPlaceholderText,
+  'label text': queryAllByLabelText,
+  'alt text': queryAllByAltText,
+  title: queryAllByTitle,
+  'test id': queryAllByTestId,
+  'display value': queryAllByDisplayValue
+}
+
+function byXPath (container, xpath) {
+  const doc = container.ownerDocument || container
+  const result = doc.evaluate(xpath, container, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null)
+  const elements = []
+  for (let i = 0; i < result.snapshotLength; i++) {
+    const node = result.snapshotItem(i)
+    if (node.nodeType === Node.ELEMENT_NODE) elements.push(node)
+  }
+  return elements
+}
+
+function byLinkText (container, text, partial) {
+  return Array.from(container.querySelectorAll('a')).filter(link => {
+    const linkText = link.innerText.trim()
+    return partial ? linkText.includes(text) : linkText === text
+  })
+}
+
+// Native Selenium locators, implemented the same way the W3C WebDriver spec does
+const seleniumQueries = {
+  'css selector': (container, value) => Array.from(container.querySelectorAll(value)),
+  xpath: byXPath,
+  id: (container, value) => Array.from(container.querySelectorAll(`[id="${CSS.escape(value)}"]`)),
+  name: (container, value) => Array.from(container.querySelectorAll(`[name="${CSS.escape(value)}"]`)),
+  'tag name': (container, value) => Array.from(container.getElementsByTagName(value)),
+  'class name': (container, value) => Array.from(container.querySelectorAll(`.${CSS.escape(value)}`)),
+  'link text': (container, value) => byLinkText(container, value, false),
+  'partial link text': (container, value) => byLinkText(container, value, true)
+}
+
+// Python regex patterns are sent as { regex, flags } and turned into RegExp matchers
+function revive (value) {
+  if (value && typeof value === 'object' && typeof value.regex === 'string') {
+    return new RegExp(value.regex, value.flags)
+  }
+  return value
+}
+
+function reviveOptions (options) {
+  const revived = {}
+  for (const key of Object.keys(options || {})) revived[key] = revive(options[key])
+  return revived
+}
+
+function documentOrder (elements) {
+  return Array.from(new Set(elements)).sort((a, b) => {
+    if (a === b) return 0
+    return a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING ? -1 : 1
+  })
+}
+
+const filters = {
+  has: (element, { has }) => queryAll(element, has).length > 0,
+  visible: element => isVisible(element),
+  enabled: element => isEnabled(element),
+  attribute: (element, { name, value, contains }) => {
+    const actual = element.getAttribute(name)
+    if (actual === null) return false
+    return contains ? actual.includes(value) : actual === value
+  }
+}
+
+// The time budget is checked cooperatively: after every query, for every element a filter or chained
+// locator looks at, and inside the Testing Library queries through the functions they call for every
+// element, see budgeted()
+let deadline = Infinity
+
+class QueryBudgetExceeded extends Error {
+  constructor () {
+    super('The query exceeded its time budget')
+    this.name = 'QueryBudgetExceeded'
+  }
+}
+
+function checkBudget () {
+  if (performance.now() > deadline) throw new QueryBudgetExceeded()
+}
+
+export function withBudget (budget, fn) {
+  if (budget === null || budget === undefined) return fn()
+  const outer = deadline
+  deadline = Math.min(outer, performance.now() + budget)
+  try {
+    return fn()
+  } finally {
+    deadline = outer
+  }
+}
+
+// Testing Library can't be given the deadline, so it's checked in what the queries call for every
+// element they look at: the normalizer of the text matchers, and getComputedStyle() that the role
+// queries use to tell whether an element is accessible and to compute its name
+function budgeted (container, by, options, query) {
+  if (deadline === Infinity) return query(options)
+  const view = (container.ownerDocument || container).defaultView
+  const getComputedStyle = view && view.getComputedStyle
+  if (getComputedStyle) {
+    view.getComputedStyle = function (...args) {
+      checkBudget()
+      return getComputedStyle.apply(this, args)
+    }
+  }
+  if (by !== 'role') {
+    const { trim, collapseWhitespace, ...rest } = options
+    const normalize = getDefaultNormalizer({ trim, collapseWhitespace })
+    options = { ...rest, normalizer: text => { checkBudget(); return normalize(text) } }
+  }
+  try {
+    return query(options)
+  } finally {
+    if (getComputedStyle) view.getComputedStyle = getComputedStyle
+  }
+}
+
+function applyFilters (elements, spec) {
+  for (const filter of spec.filters || []) {
+    if (filter.type === 'nth') {
+      const element = elements[filter.index < 0 ? elements.length + filter.index : filter.index]
+      elements = element ? [element] : []
+    } else {
+      elements = elements.filter(element => {
+        checkBudget()
+        return filters[filter.type](element, filter)
+      })
+    }
+  }
+  return elements
+}
+
+function baseQuery (container, spec) {
+  // Chained and composite locators are resolved entirely in the page
+  if (spec.by === 'within') {
+    return documentOrder(queryAll(container, spec.outer).flatMap(outer => {
+      checkBudget()
+      return queryAll(outer, spec.inner)
+    }))
+  }
+  if (spec.by === 'or') {
+    return documentOrder(spec.locators.flatMap(locator => queryAll(container, locator)))
+  }
+  const query = testingLibraryQueries[spec.by]
+  if (query) {
+    const value = revive(spec.value)
+    return budgeted(container, spec.by, reviveOptions(spec.options), options => query(container, value, options))
+  }
+  if (seleniumQueries[spec.by]) return seleniumQueries[spec.by](container, spec.value)
+  throw new Error(`Unknown locator: ${spec.by}`)
+}
+
+function frameDocuments (doc) {
+  const documents = [doc]
+  for (const frame of doc.querySelectorAll('iframe, frame')) {
+    if (frame.contentDocument) documents.push(...frameDocuments(frame.contentDocument))
+  }
+  return documents
+}
+
+// Containers are elements, `null` for the whole page, `{ kind: 'frame', frame }` for the document of a
+// same-origin frame or `{ kind: 'frames' }` for the page together with every same-origin frame nested
+// in it. Only plain objects are markers, so a form with a control named `kind` is still an element
+export function resolveRoots (container) {
+  if (!container) return [document]
+  if (Object.getPrototypeOf(container) !== Object.prototype) return [container]
+  if (container.kind === 'frame') return [container.frame.contentDocument]
+  if (container.kind === 'frames') return frameDocuments(document)
+  throw new Error(`Unknown container: ${container.kind}`)
+}
+
+// Frames that can't be searched from here, returned as the list of frames Python has to switch through
+export function crossOriginFrames (doc = document, path = []) {
+  return Array.from(doc.querySelectorAll('iframe, frame')).flatMap(frame => frame.contentDocument
+    ? crossOriginFrames(frame.contentDocument, [...path, frame])
+    : [[...path, frame]]
+  )
+}
+
+export function queryAll (container, spec) {
+  const elements = resolveRoots(container).flatMap(root => {
+    const found = baseQuery(root, spec)
+    checkBudget()
+    return found
+  })
+  return applyFilters(elements, spec)
+}
+
+// Runs a query within its time budget and reports how long it took
+export function query (container, spec, { budget }) {
+  const start = performance.now()
+  try {
+    const elements = withBudget(budget, () => queryAll(container, spec))
+    return { elements, time: performance.now() - start }
+  } catch (e) {
+    if (e.name !== 'QueryBudgetExceeded') throw e
+    return { error: 'budget', time: performance.now() - start }
+  }
+}
+
+// Runs the inner query in every container, errors are reported per container instead of failing the batch
+export function map (container, containers, spec) {
+  if (!Array.isArray(containers)) containers = queryAll(container, containers)
+  return containers.map(outer => {
+    try {
+      return { elements: queryAll(outer, spec) }
+    } catch (e) {
+      return { error: 'exception', message: String(e) }
+    }
+  })
+}
@@ -0,0 +1,96 @@
+import { installed as clockInstalled } from './clock'
+
+// Tracks what the app is busy with so waits can give up once the page has been idle for a while.
+// Timers longer than this are treated as polling or timeouts rather than pending work.
+const MAX_TRACKED_TIMER = 1000
+
+let installed = false
+let pendingRequests = 0
+const pendingTimers = new Set()
+let lastActivity = 0
+
+function activity () {
+  lastActivity = performance.now()
+}
+
+function trackRequest (promise) {
+  pendingRequests++
+  activity()
+  const done = () => {
+    pendingRequests--
+    activity()
+  }
+  promise.then(done, done)
+}
+
+function patchFetch () {
+  if (typeof window.fetch !== 'function') return
+  const fetch = window.fetch
+  window.fetch = function (...args) {
+    const request = fetch.apply(this, args)
+    trackRequest(request)
+    return request
+  }
+}
+
+function patchXHR () {
+  const send = XMLHttpRequest.prototype.send
+  XMLHttpRequest.prototype.send = function (...args) {
+    trackRequest(new Promise(resolve => this.addEventListener('loadend', resolve, { once: true })))
+    return send.apply(this, args)
+  }
+}
+
+function patchTimers () {
+  const setTimeout = window.setTimeout
+  const clearTimeout = window.clearTimeout
+  window.setTimeout = function (callback, delay, ...args) {
+    if (typeof callback !== 'function' || delay > MAX_TRACKED_TIMER) {
+      return setTimeout.call(this, callback, delay, ...args)
+    }
+    const id = setTimeout.call(this, (...callbackArgs) => {
+      pendingTimers.delete(id)
+      activity()
+      callback(...callbackArgs)
+    }, delay, ...args)
+    pendingTimers.add(id)
+    return id
+  }
+  window.clearTimeout = function (id) {
+    pendingTimers.delete(id)
+    return clearTimeout.call(this, id)
+  }
+}
+
+// Only pages that wait with an idle window are tracked: the waits install it the first time, or
+// `__stl__.settle.install()` in the preloaded bundle before the page's own scripts run so every request
+// is counted. Installed later, requests that are already in flight can't be counted, but the ones that
+// finish still show up as activity through the resource timings.
+export function install () {
+  if (installed) return
+  installed = true
+  activity()
+  patchFetch()
+  patchXHR()
+  patchTimers()
+  new MutationObserver(activity).observe(document, { childList: true, subtree: true, attributes: true, characterData: true })
+  if (typeof PerformanceObserver === 'function') {
+    try {
+      new PerformanceObserver(activity).observe({ type: 'resource' })
+    } catch (e) {
+      // Resource timings aren't observable in this browser
+    }
+  }
+}
+
+// True when the page has loaded, nothing is in flight and the DOM hasn't changed for `idleWindow` milliseconds
+export function isIdle (idleWindow) {
+  // Fake timers only run when the test ticks the clock, so they never count as pending work
+  const timers = clockInstalled() ? 0 : pendingTimers.size
+  return document.readyState === 'complete' && !pendingRequests && !timers &&
+    performance.now() - lastActivity >= idleWindow
+}
+
+export function pending () {
+  return { requests: pendingRequests, timers: pendingTimers.size }
+}
@@ -0,0 +1,37 @@
+import { isEnabled, isVisible } from './dom'
+import { resolveRoots } from './query'
+
+// The container can be several documents, like the same-origin frames of `{ kind: 'frames' }`
+function snapshotRoots (container) {
+  return resolveRoots(container).map(root => root.documentElement || root)
+}
+
+function snapshotRoot (root) {
+  const elements = [root, ...root.querySelectorAll('*')]
+  const values = {}
+  const flags = elements.map((element, i) => {
+    if (element.tagName === 'INPUT' || element.tagName === 'TEXTAREA') values[i] = element.value
+    return (isVisible(element) ? 1 : 0) |
+      (isEnabled(element) ? 2 : 0) |
+      (element.selected ? 4 : 0) |
+      (element.checked ? 8 : 0) |
+      (element.matches(':disabled') ? 16 : 0)
+  })
+  return { html: root.outerHTML, flags, values }
+}
+
+// Serializes every document of the container in one go, together with the state that isn't part of
+// its HTML. The flags and values are in document order, the same order Python parses the elements in
+export function snapshot (container) {
+  return snapshotRoots(container).map(snapshotRoot)
+}
+
+// Finds elements of a snapshot in the page again, `null` for the ones that have changed since
+export function resolve (container, indexes, tags, documentIndex = 0) {
+  const root = snapshotRoots(container)[documentIndex]
+  const elements = root ? root.querySelectorAll('*') : []
+  return indexes.map((index, i) => {
+    const element = index === 0 ? root : elements[index - 1]
+    return element && element.tagName.toLowerCase() === tags[i] ? element : null
+  })
+}
@@ -0,0 +1,84 @@
+import { resolveRoots } from './query'
+
+// Mirrors Testing Library's default normalizer and getNodeText so the results match queryAllByText
+function normalize (text) {
+  return text.trim().replace(/\s+/g, ' ')
+}
+
+function getNodeText (node) {
+  if (node.matches('input[type=submit], input[type=button], input[type=reset]')) {
+    return node.value
+  }
+  return Array.from(node.childNodes)
+    .filter(child => child.nodeType === Node.TEXT_NODE && Boolean(child.textContent))
+    .map(child => child.textContent)
+    .join('')
+}
+
+// Aho-Corasick automaton: finds every pattern contained in a text in a single pass over the text
+function substringMatcher (patterns) {
+  const root = { next: new Map(), fail: null, out: [] }
+  const always = []
+  patterns.forEach((pattern, index) => {
+    if (!pattern) return always.push(index)
+    let node = root
+    for (const char of pattern) {
+      if (!node.next.has(char)) node.next.set(char, { next: new Map(), fail: root, out: [] })
+      node = node.next.get(char)
+    }
+    node.out.push(index)
+  })
+
+  const queue = Array.from(root.next.values())
+  while (queue.length) {
+    const node = queue.shift()
+    for (const [char, child] of node.next) {
+      let fail = node.fail
+      while (fail && !fail.next.has(char)) fail = fail.fail
+      child.fail = fail ? fail.next.get(char) : root
+      child.out = child.out.concat(child.fail.out)
+      queue.push(child)
+    }
+  }
+
+  return text => {
+    const found = new Set(always)
+    let node = root
+    for (const char of text) {
+      while (node !== root && !node.next.has(char)) node = node.fail
+      node = node.next.get(char) || root
+      for (const index of node.out) found.add(index)
+    }
+    return found
+  }
+}
+
+function exactMatcher (patterns) {
+  const lookup = new Map()
+  patterns.forEach((pattern, index) => {
+    if (!lookup.has(pattern)) lookup.set(pattern, [])
+    lookup.get(pattern).push(index)
+  })
+  return text => lookup.get(text) || []
+}
+
+// Like queryAllByText for many texts at once: walks the candidate nodes a single time and
+// returns one list of matching elements per text
+export function queryAllByTexts (container, texts, { selector = '*', exact = true, ignore = 'script, style' }) {
+  const match = exact
+    ? exactMatcher(texts)
+    : (search => text => search(text.toLowerCase()))(substringMatcher(texts.map(text => text.toLowerCase())))
+  const nodes = resolveRoots(container).flatMap(root => [
+    ...(typeof root.matches === 'function' && root.matches(selector) ? [root] : []),
+    ...root.querySelectorAll(selector)
+  ])
+
+  const results = texts.map(() => [])
+  for (const node of nodes) {
+    if (ignore && node.matches(ignore)) continue
+    for (const index of match(normalize(getNodeText(node)))) {
+      results[index].push(node)
+    }
+  }
+  return results
+}
@@ -0,0 +1,72 @@
+import { resolveRoots, withBudget } from './query'
+import { install, isIdle, pending } from './settle'
+
+// Keep references to the real timers in case the page (or our own clock) replaces them later
+const realSetTimeout = window.setTimeout.bind(window)
+const realClearTimeout = window.clearTimeout.bind(window)
+const realRequestAnimationFrame = window.requestAnimationFrame.bind(window)
+
+export function now () {
+  return performance.now()
+}
+
+export function sleep (ms) {
+  return new Promise(resolve => realSetTimeout(resolve, ms))
+}
+
+export function nextFrame () {
+  return new Promise(resolve => realRequestAnimationFrame(() => resolve()))
+}
+
+// Resolves on the next DOM mutation in the documents of the container or after `ms`, whichever comes
+// first. Containers in frames are watched in the frames' own documents.
+function domChanges (container) {
+  let wake = null
+  const observer = new MutationObserver(() => wake && wake())
+  const documents = new Set(resolveRoots(container).map(root => root.ownerDocument || root))
+  for (const doc of documents) {
+    observer.observe(doc, { childList: true, subtree: true, attributes: true, characterData: true })
+  }
+  return {
+    next (ms) {
+      return new Promise(resolve => {
+        const timer = realSetTimeout(() => { wake = null; resolve() }, ms)
+        wake = () => { wake = null; realClearTimeout(timer); resolve() }
+      })
+    },
+    disconnect () {
+      observer.disconnect()
+    }
+  }
+}
+
+// Re-runs `check` whenever the DOM changes (and at least every `interval` ms) until it
+// returns a state with `done` set or the timeout expires. Resolves with the last state.
+// With `idle` it gives up as soon as the app has been idle for that many milliseconds.
+// With `budget` the queries each check runs are aborted once they take longer than that.
+// `container` is where the checked elements are, the page when it's not given.
+export async function waitFor (check, { timeout, interval = 100, idle = null, budget = null, container = null }) {
+  const deadline = now() + timeout
+  if (idle !== null) install()
+  const run = () => withBudget(budget, check)
+  let state = await run()
+  if (state.done || now() >= deadline) return state
+
+  const changes = domChanges(container)
+  try {
+    while (!state.done && now() < deadline) {
+      if (idle !== null && isIdle(idle)) break
+      await changes.next(Math.min(interval, deadline - now()))
+      state = await run()
+    }
+  } finally {
+    changes.disconnect()
+  }
+  return state
+}
+
+export async function settled ({ timeout, idle }) {
+  install()
+  const state = await waitFor(() => ({ done: isIdle(idle) }), { timeout })
+  return { done: state.done, pending: pending() }
+}
@@ -0,0 +1,92 @@
+import json
+from typing import Any, List, Optional
+
+import pytest  # type: ignore
+from selenium.common.exceptions import JavascriptException
+
+from selenium_testing_library import Screen
+from selenium_testing_library.screen import testing_library
+
+
+class FakeElement:
+    def __init__(self, finder: "FakeFinder", id_: str):
+        self.parent = finder
+        self.id = id_
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        self.parent.round_trips += 1
+        return f'<div id="{self.id}"></div>' if name == "outerHTML" else None
+
+    def find_elements(self, by: str, value: Optional[str] = None) -> List[Any]:
+        return self.parent.find_elements(by, value)
+
+
+def _element_key(value: Any) -> Any:
+    if isinstance(value, FakeElement):
+        return {"element-6066-11e4-a52e-4f735466cecf": value.id}
+    raise TypeError(value)
+
+
+class FakeFinder:
+    # Stands in for the driver and answers every script instantly, so only the work done in Python
+    # is measured. Round trips and the bytes sent to the browser are counted.
+    def __init__(self, count: int = 1, *, loaded: bool = True):
+        self.elements = [FakeElement(self, f"element-{i}") for i in range(count)]
+        self.loaded = loaded
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.scripts: List[str] = []
+
+    def reset(self):
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.scripts = []
+
+    def _send(self, script: str, args: Any):
+        self.round_trips += 1
+        self.bytes_sent += len(script.encode()) + len(
+            json.dumps(args, default=_element_key).encode()
+        )
+        self.scripts.append(script)
+
+    def _respond(self, script: str) -> Any:
+        if not self.loaded:
+            if not script.startswith(testing_library):
+                raise JavascriptException("__stl__ is not defined")
+            self.loaded = True
+        if "__stl__.map(" in script:
+            return [{"elements": self.elements}]
+        if "__stl__.fill(" in script:
+            return {"elements": self.elements}
+        return {"elements": self.elements, "time": 0.1}
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        self._send(script, args)
+        return self._respond(script)
+
+    def execute_async_script(self, script: str, *args: Any) -> Any:
+        self._send(script, args)
+        self._respond(script)
+        if "__stl__.findEach" in script:
+            return {"results": [self.elements for _ in args[1]]}
+        if "__stl__.expect" in script:
+            return {"pass": True, "actual": None}
+        return {
+            "element": self.elements[0],
+            "elements": self.elements,
+            "done": True,
+        }
+
+    def find_elements(self, by: str, value: Optional[str] = None) -> List[Any]:
+        self._send(value or "", [by])
+        return self.elements
+
+
+@pytest.fixture
+def finder() -> FakeFinder:
+    return FakeFinder()
+
+
+@pytest.fixture
+def screen(finder: FakeFinder) -> Screen:
+    return Screen(finder)  # type: ignore
@@ -0,0 +1,72 @@
+import re
+
+import pytest  # type: ignore
+
+from selenium_testing_library import Screen, Within, locators
+from selenium_testing_library.screen import _is_selenium_query
+
+from .conftest import FakeFinder
+
+pytest.importorskip("pytest_benchmark")
+
+role = locators.Role("row", name=re.compile("Paid")).filter(
+    has=locators.Text("Due"), attribute_equals={"data-state": "open"}
+)
+
+
+def test_locator_construction(benchmark):
+    benchmark(lambda: locators.Role("button", name="Save"))
+
+
+def test_locator_filters(benchmark):
+    benchmark(lambda: locators.Css("tr").filter(visible_only=True).nth(0))
+
+
+def test_ensure_locator_tuple(benchmark, screen: Screen):
+    benchmark(screen._ensure_locator, ("css selector", "button"))
+
+
+def test_ensure_locator(benchmark, screen: Screen):
+    benchmark(screen._ensure_locator, role)
+
+
+def test_js_spec(benchmark):
+    benchmark(role._js_spec)
+
+
+def test_is_selenium_query(benchmark):
+    benchmark(_is_selenium_query, locators.Css("button"))
+
+
+def test_wait_options(benchmark, screen: Screen):
+    benchmark(screen._wait_options, 5, trusted=False)
+
+
+def test_get_by_text(benchmark, screen: Screen):
+    benchmark(screen.get_by_text, "Save")
+
+
+def test_get_by_css(benchmark, screen: Screen):
+    benchmark(screen.get_by, locators.Css("button"))
+
+
+def test_get_by_filtered_role(benchmark, screen: Screen):
+    benchmark(screen.get_by, role)
+
+
+def test_get_by_within(benchmark, finder: FakeFinder):
+    within = Within(finder.elements[0])  # type: ignore
+    benchmark(within.get_by_text, "Save")
+
+
+def test_get_by_with_hook(benchmark, screen: Screen):
+    screen.add_hook(lambda _event: None)
+    benchmark(screen.get_by_text, "Save")
+
+
+def test_find_by_stable(benchmark, screen: Screen):
+    benchmark(lambda: screen.find_by(locators.Role("button"), stable=True))
+
+
+def test_click_by(benchmark, screen: Screen):
+    benchmark(screen.click_by, locators.Role("button"))
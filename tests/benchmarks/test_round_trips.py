@@ -0,0 +1,253 @@
+import asyncio
+import re
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest  # type: ignore
+from selenium.common.exceptions import JavascriptException
+
+from selenium_testing_library import (
+    AsyncScreen,
+    AsyncWebDriver,
+    MultipleSuchElementsException,
+    QueryBudgetExceededException,
+    Screen,
+    Within,
+    locators,
+)
+from selenium_testing_library.screen import testing_library
+
+from .conftest import FakeFinder
+
+# Every call below has to be answered with a single round trip to the browser
+single_round_trip = [
+    pytest.param(lambda s: s.get_by_text("Save"), id="get_by_text"),
+    pytest.param(lambda s: s.query_by_role("button", name="Save"), id="query_by_role"),
+    pytest.param(lambda s: s.find_by_label_text("Email"), id="find_by_label_text"),
+    pytest.param(lambda s: s.get_all_by_test_id("row"), id="get_all_by_test_id"),
+    pytest.param(lambda s: s.query_all_by_title("Close"), id="query_all_by_title"),
+    pytest.param(lambda s: s.find_all_by_text("Item"), id="find_all_by_text"),
+    pytest.param(lambda s: s.get_by(locators.Css("button")), id="get_by_css"),
+    pytest.param(lambda s: s.find_by(locators.Css("button")), id="find_by_css"),
+    pytest.param(
+        lambda s: s.get_by(locators.Css("button").filter(visible_only=True)),
+        id="get_by_filtered_css",
+    ),
+    pytest.param(
+        lambda s: s.get_by(
+            locators.Role("row").within(locators.Text(re.compile("Paid")))
+        ),
+        id="get_by_chained",
+    ),
+    pytest.param(
+        lambda s: s.find_all_by(locators.Role("row"), min_count=1),
+        id="find_all_by_min_count",
+    ),
+    pytest.param(
+        lambda s: s.find_by(locators.Role("button"), stable=True), id="find_by_stable"
+    ),
+    pytest.param(
+        lambda s: s.find_first([locators.Text("Saved"), locators.Role("alert")]),
+        id="find_first",
+    ),
+    pytest.param(
+        lambda s: s.map(locators.Role("row"), locators.Role("checkbox")), id="map"
+    ),
+    pytest.param(lambda s: s.fill({"Email": "a@b.c"}), id="fill"),
+    pytest.param(lambda s: s.click_by(locators.Role("button")), id="click_by"),
+    pytest.param(
+        lambda s: s.expect(locators.Role("status")).to_have_text("Saved"),
+        id="expect",
+    ),
+    pytest.param(lambda s: s.query_all_by_texts(["a", "b", "c"]), id="texts"),
+]
+
+
+@pytest.mark.parametrize("call", single_round_trip)
+def test_single_round_trip(screen: Screen, finder: FakeFinder, call):
+    call(screen)
+    assert finder.round_trips == 1, finder.scripts
+
+
+@pytest.mark.parametrize("call", single_round_trip)
+def test_single_round_trip_within(finder: FakeFinder, call):
+    call(Within(finder.elements[0]))  # type: ignore
+    assert finder.round_trips == 1, finder.scripts
+
+
+def test_bundle_is_sent_once():
+    finder = FakeFinder(loaded=False)
+    screen = Screen(finder)  # type: ignore
+    screen.get_by_text("Save")
+    # The optimistic query fails and is sent again together with the bundle
+    assert finder.round_trips == 2
+
+    finder.reset()
+    screen.get_by_text("Save")
+    screen.get_by_role("button")
+    assert finder.round_trips == 2
+
+
+def test_idle_window_does_not_delay_queries():
+    finder = FakeFinder(loaded=False)
+    screen = Screen(finder, idle_window=0.5)  # type: ignore
+    screen.get_by_text("Save")
+    # The failed query and the bundle together with the query again, waiting is left to find_by
+    assert finder.round_trips == 2
+    assert "__stl__.settled" not in "".join(finder.scripts)
+    assert finder.scripts[1].startswith(testing_library)
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        pytest.param(lambda s: s.get_by_text("Save"), id="get_by_text"),
+        pytest.param(
+            lambda s: s.get_by(
+                locators.Role("row", name=re.compile("Paid")).filter(
+                    has=locators.Text("Due"), attribute_equals={"data-state": "open"}
+                )
+            ),
+            id="get_by_filtered_role",
+        ),
+        pytest.param(
+            lambda s: s.find_by(locators.Role("button"), stable=True), id="find_by"
+        ),
+    ],
+)
+def test_bytes_sent(screen: Screen, finder: FakeFinder, call):
+    call(screen)
+    assert finder.bytes_sent < 1000
+
+
+def test_fast_forward_adds_no_round_trips(finder: FakeFinder):
+    Screen(finder, fast_forward=True).get_by_text("Save")  # type: ignore
+    assert finder.round_trips == 1
+
+
+def test_multiple_elements_message():
+    finder = FakeFinder(3)
+    with pytest.raises(MultipleSuchElementsException):
+        Screen(finder).get_by_text("Item")  # type: ignore
+    # The query and the outer HTML of every element
+    assert finder.round_trips == 4
+
+
+class TimeoutFinder(FakeFinder):
+    def __init__(self):
+        super().__init__()
+        self.timeouts = SimpleNamespace(script=30)
+        self.script_timeouts: List[float] = []
+
+    def set_script_timeout(self, timeout: float):
+        self.round_trips += 1
+        self.script_timeouts.append(timeout)
+
+
+def test_script_timeout_follows_wait():
+    finder = TimeoutFinder()
+    screen = Screen(finder)  # type: ignore
+    button = locators.Role("button")
+    screen.click_by(button, timeout=5)
+    assert finder.script_timeouts == []
+
+    screen.click_by(button, timeout=60)
+    screen.click_by(button, timeout=60)
+    screen.click_by(button, timeout=5)
+    assert finder.script_timeouts == [65]
+    assert finder.round_trips == 5
+
+
+class FailingFinder(FakeFinder):
+    def execute_async_script(self, script: str, *args: Any) -> Any:
+        self._send(script, args)
+        raise JavascriptException("javascript error: click failed")
+
+
+def test_only_missing_bundle_is_retried():
+    finder = FailingFinder()
+    with pytest.raises(JavascriptException, match="click failed"):
+        Screen(finder).click_by(locators.Role("button"))  # type: ignore
+    # Running the action again could click twice
+    assert finder.round_trips == 1
+
+
+class SlowFinder(FakeFinder):
+    def execute_script(self, script: str, *args: Any) -> Any:
+        self._send(script, args)
+        return {"elements": [], "time": 20, "error": "budget"}
+
+
+def test_find_by_reports_query_budget():
+    screen = Screen(SlowFinder())  # type: ignore
+    with pytest.raises(QueryBudgetExceededException, match=r"its budget is 0\.01s"):
+        screen.find_by(locators.Text("x"), query_budget=0.01)
+    with pytest.raises(QueryBudgetExceededException, match=r"after 0\.020s$"):
+        screen.find_all_by(locators.Text("x"))
+
+
+class AsyncFinder:
+    # The async flavour of FakeFinder
+    def __init__(self, finder: FakeFinder):
+        self.finder = finder
+
+    async def execute_script(self, script: str, *args: Any) -> Any:
+        return self.finder.execute_script(script, *args)
+
+    async def execute_async_script(self, script: str, *args: Any) -> Any:
+        return self.finder.execute_async_script(script, *args)
+
+    async def get_script_timeout(self) -> float:
+        return 30
+
+
+def test_async_screen_reports_to_hooks(finder: FakeFinder):
+    events: List[Any] = []
+    screen = AsyncScreen(AsyncFinder(finder))  # type: ignore
+    screen.add_hook(events.append)
+
+    async def run():
+        return await asyncio.gather(
+            screen.get_by_text("Save"),
+            screen.find_by(locators.Role("button"), stable=True),
+        )
+
+    asyncio.run(run())
+    # Queries running at the same time are reported separately
+    assert sorted(event.kind for event in events) == ["find", "get"]
+    assert [event.round_trips for event in events] == [1, 1]
+    assert finder.round_trips == 2
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_async_driver_closes_failed_connections():
+    driver = AsyncWebDriver("http://localhost:4444", "session")
+    idle = FakeConnection()
+    fresh = FakeConnection()
+    driver._idle = [idle]  # type: ignore
+    responses: List[Any] = [ConnectionResetError(), ValueError("bad response")]
+
+    async def connect():
+        return fresh
+
+    async def request(*_args: Any):
+        response = responses.pop(0)
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+    driver._connect = connect  # type: ignore
+    driver._request = request  # type: ignore
+    # The idle connection was closed by the server and the retry fails as well
+    with pytest.raises(ValueError, match="bad response"):
+        asyncio.run(driver._send("GET", "/status", b"", 1))
+    assert idle.closed
+    assert fresh.closed
+    assert driver._idle == []
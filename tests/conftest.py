@@ -1,6 +1,8 @@
 import pytest  # type: ignore
 from selenium import webdriver  # type: ignore
 
+pytest_plugins = ["pytester"]
+
 
 def pytest_addoption(parser):
     parser.addoption(
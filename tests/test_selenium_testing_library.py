@@ -1,16 +1,43 @@
+import asyncio
+import json
 import pathlib
+import re
+import time
+from typing import List
 
 import pytest  # type: ignore
+from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.remote.webelement import WebElement
 
 from selenium_testing_library import (
+    AsyncScreen,
+    AsyncWebDriver,
+    AsyncWebElement,
+    AsyncWithin,
     MultipleSuchElementsException,
     NoSuchElementException,
+    QueryBudgetExceededException,
+    QueryEvent,
+    RecordingFinder,
+    ReplayFinder,
+    ReplayMismatchError,
     Screen,
+    ScreenGroup,
+    SlowQueryWarning,
+    Snapshot,
     Within,
     __version__,
+    add_hook,
     locators,
+    remove_hook,
 )
+from selenium_testing_library.pytest_plugin import BrowserPool, reset_driver
+from selenium_testing_library.trace import TraceWriter, read_trace, summarize
+from selenium_testing_library.trace.__main__ import main as trace_main
 
 
 def test_version():
@@ -78,9 +105,9 @@ def test_by_label_text(screen: Screen):
     assert input_field.tag_name == "input"
     assert input_field.get_attribute("type") == "email"
 
-    input_field = screen.query_by_label_text("Password")
-    assert input_field
-    assert input_field.get_attribute("type") == "password"
+    password_field = screen.query_by_label_text("Password")
+    assert password_field
+    assert password_field.get_attribute("type") == "password"
 
     input_fields = list(screen.get_all_by_label_text("Same Label"))
     assert input_fields[0].get_attribute("type") == "text"
@@ -126,8 +153,8 @@ def test_by_placeholder_text(screen: Screen):
         screen.query_all_by_placeholder_text,
         screen.find_all_by_placeholder_text,
     )
-    for fun in list_funcs:
-        items = fun("My Placeholder")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("My Placeholder")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -151,8 +178,8 @@ def test_by_role(screen: Screen):
         screen.query_all_by_role,
         screen.find_all_by_role,
     )
-    for fun in list_funcs:
-        items = fun("dialog")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("dialog")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -209,8 +236,8 @@ def test_by_text_index(screen: Screen):
         screen.query_all_by_text,
         screen.find_all_by_text,
     )
-    for fun in list_funcs:
-        items = fun("My Text Input")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("My Text Input")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -235,8 +262,8 @@ def test_by_label_text_index(screen: Screen):
         screen.query_all_by_label_text,
         screen.find_all_by_label_text,
     )
-    for fun in list_funcs:
-        items = fun("My Label Text")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("My Label Text")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -261,8 +288,8 @@ def test_by_alt_text_index(screen: Screen):
         screen.query_all_by_alt_text,
         screen.find_all_by_alt_text,
     )
-    for fun in list_funcs:
-        items = fun("Some Image")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("Some Image")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -287,8 +314,8 @@ def test_by_title(screen: Screen):
         screen.query_all_by_title,
         screen.find_all_by_title,
     )
-    for fun in list_funcs:
-        items = fun("Some Title")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("Some Title")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -313,11 +340,11 @@ def test_by_test_id(screen: Screen):
         screen.query_all_by_test_id,
         screen.find_all_by_test_id,
     )
-    for fun in list_funcs:
-        items = fun("Some Test Id")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("Some Test Id")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
-        items = fun("Some Test", exact=False)  # type: ignore
+        items = list_fun("Some Test", exact=False)  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -338,8 +365,8 @@ def test_by_display_value(screen: Screen):
         screen.query_all_by_display_value,
         screen.find_all_by_display_value,
     )
-    for fun in list_funcs:
-        items = fun("Input Display Value")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("Input Display Value")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -369,8 +396,8 @@ def test_by_css(screen: Screen):
         screen.query_all_by_css,
         screen.find_all_by_css,
     )
-    for fun in list_funcs:
-        items = fun(".mycss")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun(".mycss")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -390,8 +417,8 @@ def test_by_xpath(screen: Screen):
         screen.query_all_by_xpath,
         screen.find_all_by_xpath,
     )
-    for fun in list_funcs:
-        items = fun("//div[@class = 'mycss']")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("//div[@class = 'mycss']")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -411,8 +438,8 @@ def test_by_id(screen: Screen):
         screen.query_all_by_id,
         screen.find_all_by_id,
     )
-    for fun in list_funcs:
-        items = fun("myid")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("myid")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -432,8 +459,8 @@ def test_by_name(screen: Screen):
         screen.query_all_by_name,
         screen.find_all_by_name,
     )
-    for fun in list_funcs:
-        items = fun("myname")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("myname")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -453,8 +480,8 @@ def test_by_tag_name(screen: Screen):
         screen.query_all_by_tag_name,
         screen.find_all_by_tag_name,
     )
-    for fun in list_funcs:
-        items = fun("button")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("button")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -474,8 +501,8 @@ def test_by_link_text(screen: Screen):
         screen.query_all_by_link_text,
         screen.find_all_by_link_text,
     )
-    for fun in list_funcs:
-        items = fun("Link 1")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("Link 1")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -495,8 +522,8 @@ def test_by_partial_link_text(screen: Screen):
         screen.query_all_by_partial_link_text,
         screen.find_all_by_partial_link_text,
     )
-    for fun in list_funcs:
-        items = fun("nk 1")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("nk 1")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -516,8 +543,8 @@ def test_by_class_name(screen: Screen):
         screen.query_all_by_class_name,
         screen.find_all_by_class_name,
     )
-    for fun in list_funcs:
-        items = fun("mycss")  # type: ignore
+    for list_fun in list_funcs:
+        items = list_fun("mycss")  # type: ignore
         assert isinstance(items, list)
         assert isinstance(items[0], WebElement)
 
@@ -688,3 +715,914 @@ def test_log_testing_playground_url(screen: Screen):
 
     url = screen.log_testing_playground_url(screen.get_by_id("myid"))
     assert url is None
+
+
+def test_fill(screen: Screen):
+    screen.driver.get(get_file_path("fill.html"))
+    els = screen.fill(
+        {
+            "Email": "me@example.com",
+            "Password": "hunter2",
+            "Country": "Slovenia",
+            "Languages": ["en", "sl"],
+            "Newsletter": True,
+            "Pro": True,
+            "Bio": "Hello\nWorld",
+        }
+    )
+    assert len(els) == 7
+    assert screen.get_by_id("email").get_attribute("value") == "me@example.com"
+    assert screen.get_by_id("password").get_attribute("value") == "hunter2"
+    assert screen.get_by_id("country").get_attribute("value") == "SI"
+    assert screen.get_by_id("newsletter").is_selected()
+    assert screen.get_by_id("pro").is_selected()
+    assert not screen.get_by_id("free").is_selected()
+    assert screen.get_by_id("bio").get_attribute("value") == "Hello\nWorld"
+    languages = screen.get_by_id("languages").find_elements("css selector", "option")
+    assert [option.is_selected() for option in languages] == [True, False, True]
+
+    events = screen.get_by_id("events").text
+    assert "input:email change:email" in events
+    assert "change:country" in events
+    assert "change:newsletter" in events
+
+
+def test_fill_send_keys(screen: Screen):
+    screen.driver.get(get_file_path("fill.html"))
+    screen.fill({"Email": "me@example.com", "Bio": "typed"}, send_keys=["Bio"])
+    assert screen.get_by_id("email").get_attribute("value") == "me@example.com"
+    assert screen.get_by_id("bio").get_attribute("value") == "typed"
+
+    screen.fill({"em": "typed@example.com"}, exact=False, send_keys=True)
+    assert screen.get_by_id("email").get_attribute("value") == "typed@example.com"
+
+    screen.fill({"Email": "single@example.com", "Bio": "one"}, send_keys="Bio")
+    assert screen.get_by_id("bio").get_attribute("value") == "one"
+    with pytest.raises(ValueError, match="aren't being filled"):
+        screen.fill({"Email": "me@example.com"}, send_keys="Password")
+    with pytest.raises(TypeError, match="checkbox"):
+        screen.fill({"Email": "other@example.com", "Newsletter": True}, send_keys=True)
+    assert screen.get_by_id("email").get_attribute("value") == "single@example.com"
+
+
+def test_fill_errors(screen: Screen):
+    screen.driver.get(get_file_path("fill.html"))
+    with pytest.raises(NoSuchElementException):
+        screen.fill({"Email": "me@example.com", "Phone": "555"})
+    # Nothing is filled when one of the fields can't be resolved
+    assert screen.get_by_id("email").get_attribute("value") == ""
+
+    with pytest.raises(MultipleSuchElementsException):
+        screen.fill({"Duplicate": "value"})
+
+    with pytest.raises(NoSuchElementException) as excinfo:
+        screen.fill({"Country": "Atlantis"})
+    assert "No option 'Atlantis' found" in str(excinfo.value)
+
+    with pytest.raises(TypeError, match="True or False"):
+        screen.fill({"Email": "me@example.com", "Newsletter": "false"})
+    assert screen.get_by_id("email").get_attribute("value") == ""
+    assert not screen.get_by_id("newsletter").is_selected()
+
+
+def test_fill_within(screen: Screen):
+    screen.driver.get(get_file_path("fill.html"))
+    Within(screen.get_by_tag_name("form")).fill({"Email": "me@example.com"})
+    assert screen.get_by_id("email").get_attribute("value") == "me@example.com"
+
+
+def test_click_by(screen: Screen):
+    screen.driver.get(get_file_path("actions.html"))
+    button = screen.click_by(locators.Role("button", name="Late"))
+    assert isinstance(button, WebElement)
+    assert screen.get_by_id("clicks").text == "1"
+
+    screen.click_by(locators.Text("Late"), trusted=True)
+    assert screen.get_by_id("clicks").text == "2"
+
+    with pytest.raises(NoSuchElementException):
+        screen.click_by(locators.Text("Missing"), timeout=0.1)
+    with pytest.raises(MultipleSuchElementsException):
+        screen.click_by(locators.Css("button"), timeout=0.1)
+
+
+def test_click_by_not_actionable(screen: Screen):
+    screen.driver.get(get_file_path("actions.html"))
+    with pytest.raises(ElementNotInteractableException) as excinfo:
+        screen.click_by(locators.Id("disabled"), timeout=0.1)
+    assert "element is disabled" in str(excinfo.value)
+
+    with pytest.raises(ElementNotInteractableException) as excinfo:
+        screen.click_by(locators.Id("covered"), timeout=0.1)
+    assert 'element is covered by <div id="overlay">' in str(excinfo.value)
+
+
+def test_type_by(screen: Screen):
+    screen.driver.get(get_file_path("actions.html"))
+    search = screen.type_by(locators.LabelText("Search"), "New")
+    assert search.get_attribute("value") == "New"
+
+    screen.type_by(locators.LabelText("Search"), " and more", clear=False)
+    assert search.get_attribute("value") == "New and more"
+
+    screen.type_by(locators.LabelText("Search"), "Typed", trusted=True)
+    assert search.get_attribute("value") == "Typed"
+
+    notes = screen.type_by(locators.LabelText("Notes"), " and new", clear=False)
+    assert notes.text == "Old notes and new"
+    screen.type_by(locators.LabelText("Notes"), "Only new")
+    assert notes.text == "Only new"
+
+    fruit = screen.type_by(locators.LabelText("Fruit"), "Banana")
+    assert fruit.get_attribute("value") == "banana"
+
+
+def test_select_by(screen: Screen):
+    screen.driver.get(get_file_path("actions.html"))
+    fruit = screen.select_by(locators.LabelText("Fruit"), "Banana")
+    assert fruit.get_attribute("value") == "banana"
+
+    screen.select_by(locators.LabelText("Fruit"), "apple", trusted=True)
+    assert fruit.get_attribute("value") == "apple"
+
+    with pytest.raises(NoSuchElementException):
+        screen.select_by(locators.LabelText("Fruit"), "Cherry")
+
+
+def test_expect(screen: Screen):
+    screen.driver.get(get_file_path("expect.html"))
+    screen.expect(locators.Role("status")).to_have_text("3 items")
+    screen.expect(locators.Role("status")).to_contain_text("3")
+    screen.expect(locators.Role("listitem")).to_have_count(3)
+    screen.expect(locators.Id("name")).to_have_value("New")
+    screen.expect(locators.Id("save")).to_be_enabled()
+    screen.expect(locators.Id("save")).to_have_attribute("data-state", "ready")
+    screen.expect(locators.Id("save")).to_have_attribute("data-state")
+    screen.expect(locators.Id("agree")).to_be_checked()
+    screen.expect(locators.Text("Saved")).to_be_visible()
+    screen.expect(locators.Text("Error")).to_be_hidden()
+    screen.expect(locators.Role("status")).not_.to_have_text("0 items")
+
+
+def test_expect_failure(screen: Screen):
+    screen.driver.get(get_file_path("expect.html"))
+    screen.expect(locators.Role("status")).to_have_text("3 items")
+
+    with pytest.raises(AssertionError) as excinfo:
+        screen.expect(locators.Role("status"), timeout=0.1).to_have_text("4 items")
+    message = str(excinfo.value)
+    assert "to have text" in message
+    assert "- '4 items'\n+ '3 items'" in message
+
+    with pytest.raises(AssertionError) as excinfo:
+        screen.expect(locators.Text("Missing"), timeout=0.1).to_have_text("Missing")
+    assert "+ <no element found>" in str(excinfo.value)
+
+    with pytest.raises(AssertionError):
+        screen.expect(locators.Id("save"), timeout=0.1).not_.to_be_enabled()
+
+    with pytest.raises(MultipleSuchElementsException):
+        screen.expect(locators.Role("listitem")).to_have_text("Item 1")
+
+
+def test_query_all_by_texts(screen: Screen):
+    screen.driver.get(get_file_path("form.html"))
+    results = screen.query_all_by_texts(["Email address", "Item", "Password", "Nope"])
+    assert list(results) == ["Email address", "Item", "Password", "Nope"]
+    assert len(results["Email address"]) == 1
+    assert len(results["Item"]) == 3
+    assert results["Item"] == screen.get_all_by_text("Item")
+    assert len(results["Password"]) == 1
+    assert results["Nope"] == []
+
+    results = screen.query_all_by_texts(["tem", "EMAIL", "address"], exact=False)
+    assert len(results["tem"]) == 3
+    assert len(results["EMAIL"]) == 1
+    assert len(results["address"]) == 1
+
+    screen.driver.get(get_file_path("extra.html"))
+    results = screen.query_all_by_texts(
+        ["We Are Not Men", "We Are Diva"], selector="span", ignore="p"
+    )
+    assert len(results["We Are Not Men"]) == 1
+    assert len(results["We Are Diva"]) == 2
+
+
+def test_query_all_by_texts_within(screen: Screen):
+    screen.driver.get(get_file_path("form.html"))
+    results = Within(screen.get_by_id("subsection")).query_all_by_texts(
+        ["Hello", "Email address"]
+    )
+    assert len(results["Hello"]) == 1
+    assert results["Email address"] == []
+
+
+def test_regex_matchers(screen: Screen):
+    screen.driver.get(get_file_path("filters.html"))
+    assert len(screen.get_all_by_text(re.compile(r"^Order \d$"))) == 3
+    assert screen.get_by_text(re.compile(r"total: \d+ eur", re.IGNORECASE))
+    assert len(screen.get_all_by_role("button", name=re.compile("Order"))) == 2
+    assert screen.query_by(locators.Text(re.compile("^Missing"))) is None
+
+
+def test_locator_filters(screen: Screen):
+    screen.driver.get(get_file_path("filters.html"))
+    buttons = locators.Css("button")
+    assert len(screen.get_all_by(buttons)) == 4
+    assert len(screen.get_all_by(buttons.filter(visible_only=True))) == 3
+    assert len(screen.get_all_by(buttons.filter(enabled_only=True))) == 3
+    assert (
+        len(screen.get_all_by(buttons.filter(visible_only=True, enabled_only=True)))
+        == 2
+    )
+    assert (
+        len(screen.get_all_by(buttons.filter(attribute_equals={"data-state": "open"})))
+        == 2
+    )
+    assert (
+        screen.get_by(buttons.filter(attribute_contains={"class": "prim"})).text
+        == "Order 1"
+    )
+    assert screen.get_by(buttons.nth(1)).text == "Order 2"
+    assert screen.get_by(buttons.nth(-1)).text == "Invoice 10"
+    assert screen.query_by(buttons.nth(10)) is None
+    assert (
+        screen.get_by(
+            locators.Text(re.compile("^Order")).filter(visible_only=True).nth(-1)
+        ).text
+        == "Order 2"
+    )
+    # Filtering returns a new locator
+    assert len(screen.get_all_by(buttons)) == 4
+    assert repr(buttons.filter(visible_only=True).nth(0)) == (
+        "Css('button', exact=True).filter(visible_only=True).nth(0)"
+    )
+
+
+def test_chained_locators(screen: Screen):
+    screen.driver.get(get_file_path("composite.html"))
+    edit_save = locators.Role("dialog", name="Edit").within(
+        locators.Role("button", name="Save")
+    )
+    assert screen.get_by(edit_save).text == "Save"
+    assert (
+        len(screen.get_all_by(locators.Role("dialog").within(locators.Text("Save"))))
+        == 2
+    )
+
+    paid_rows = locators.Role("row").filter(has=locators.Text("Paid"))
+    assert len(screen.get_all_by(paid_rows)) == 2
+    checkboxes = screen.get_all_by(paid_rows.within(locators.Role("checkbox")))
+    assert [c.get_attribute("aria-label") for c in checkboxes] == [
+        "Select invoice 1",
+        "Select invoice 3",
+    ]
+    assert (
+        screen.get_by(paid_rows.nth(1).within(locators.Css("td").nth(0))).text
+        == "Invoice 3"
+    )
+
+    either = locators.Css(".toast").or_(locators.Css(".error"))
+    assert screen.get_by(either).text == "Saved"
+    assert len(screen.get_all_by(locators.Text("Paid").or_(locators.Text("Open")))) == 3
+    with pytest.raises(ValueError, match="at least two locators"):
+        locators.Text("Paid").or_()
+
+    screen.click_by(edit_save)
+    screen.expect(paid_rows).to_have_count(2)
+    assert Within(screen.get_by_role("table")).get_all_by(paid_rows)
+
+
+def test_map(screen: Screen):
+    screen.driver.get(get_file_path("composite.html"))
+    rows = screen.get_all_by_role("row")
+    checkboxes = screen.map(rows, locators.Role("checkbox"))
+    assert [c.get_attribute("aria-label") for c in checkboxes] == [
+        "Select invoice 1",
+        "Select invoice 2",
+        "Select invoice 3",
+    ]
+    assert screen.map(locators.Role("row"), locators.Role("checkbox")) == checkboxes
+    assert screen.map([], locators.Role("checkbox")) == []
+
+    paid = screen.map(locators.Role("row"), locators.Text("Paid"))
+    assert paid[0].text == "Paid"
+    assert isinstance(paid[1], NoSuchElementException)
+    assert paid[2].text == "Paid"
+    assert screen.map(rows, locators.Text("Paid"), mode="query")[1] is None
+
+    cells = screen.map(rows, locators.Css("td"), mode="all")
+    assert [len(c) for c in cells] == [3, 3, 3]
+    assert isinstance(
+        screen.map(rows, locators.Css("td"))[0], MultipleSuchElementsException
+    )
+
+    table = Within(screen.get_by_role("table"))
+    names = table.map(locators.Role("row"), locators.Css("td").nth(0))
+    assert [n.text for n in names] == ["Invoice 1", "Invoice 2", "Invoice 3"]
+
+
+def test_frames(screen: Screen):
+    screen.driver.get(get_file_path("frames.html"))
+    assert screen.query_by_role("button", name="Inside") is None
+
+    widget = screen.within_frame(locators.Title("Widget"))
+    button = widget.get_by_role("button", name="Inside")
+    widget.click_by(locators.Role("button", name="Inside"))
+    widget.expect(locators.Role("button")).to_have_text("Clicked")
+    with widget.switch_to():
+        assert button.text == "Clicked"
+        # Waits in a frame are woken up by the changes in the frame's document
+        screen.driver.execute_script(
+            "setTimeout(() => document.body.append(Object.assign("
+            "document.createElement('p'), {textContent: 'Later'})), 50)"
+        )
+    assert widget.find_by_text("Later")
+
+    # Pages loaded from files are cross-origin to each other, so this frame is searched by switching into it
+    remote = screen.within_frame(screen.get_by_title("Remote"))
+    remote_button = remote.get_by_css("button")
+    with remote.switch_to():
+        assert remote_button.text == "Remote"
+    assert remote.get_by_text("Remote")
+
+    # The inner frame belongs to the outer frame's document
+    inner = screen.within_frame(locators.Title("Outer")).within_frame(
+        locators.Title("Inner")
+    )
+    nested = inner.get_by_role("button")
+    with inner.switch_to():
+        assert nested.text == "Nested"
+
+    buttons = screen.all_frames().get_all_by_role("button")
+    assert len(buttons) == 4
+
+    # A control named "kind" doesn't make the form look like a frame
+    form = Within(screen.get_by_role("form"))
+    assert form.get_by_label_text("Kind").get_attribute("name") == "kind"
+
+
+def test_find_all_by_count(screen: Screen):
+    screen.driver.get(get_file_path("waits.html"))
+    rows = locators.Role("listitem")
+    assert len(screen.find_all_by(rows, min_count=20)) >= 20
+    assert len(screen.find_all_by(rows, stable_for=0.3)) == 50
+    assert len(screen.find_all_by(rows, min_count=50, stable_for=0.1)) == 50
+    with pytest.raises(NoSuchElementException):
+        screen.find_all_by(rows, min_count=100, timeout=0.5)
+
+
+def test_find_by_scroll_container(screen: Screen):
+    screen.driver.get(get_file_path("grid.html"))
+    grid = locators.Role("grid")
+    assert screen.query_by_text("Invoice 900") is None
+    cell = screen.find_by(locators.Text("Invoice 900"), scroll_container=grid)
+    assert cell.text == "Invoice 900"
+    # Starts again from the top when the row was scrolled past
+    assert screen.find_by(locators.Text("Invoice 3"), scroll_container=grid)
+    with pytest.raises(NoSuchElementException):
+        screen.find_by(locators.Text("Invoice 1001"), scroll_container=grid)
+    with pytest.raises(NoSuchElementException):
+        screen.find_by(
+            locators.Text("Invoice 1"), scroll_container=locators.Role("table")
+        )
+
+
+def test_find_first_and_find_all_of(screen: Screen):
+    screen.driver.get(get_file_path("waits.html"))
+    saved = locators.Role("status")
+    failed = locators.Role("alert")
+    index, el = screen.find_first([failed, saved])
+    assert index == 1
+    assert el.text == "Saved"
+
+    row, toast = screen.find_all_of([locators.Text("Row 50"), saved])
+    assert row.text == "Row 50"
+    assert toast == el
+
+    with pytest.raises(NoSuchElementException):
+        screen.find_all_of([saved, failed], timeout=0.5)
+    with pytest.raises(NoSuchElementException):
+        screen.find_first([failed], timeout=0.5)
+    with pytest.raises(MultipleSuchElementsException):
+        screen.find_first([locators.Role("listitem")])
+
+
+def test_idle_window(screen: Screen):
+    screen.driver.get(get_file_path("waits.html"))
+    patched = "return !String(window.fetch).includes('[native code]')"
+    idle_screen = Screen(screen.driver, idle_window=0.3)
+    # Only the waits track the page
+    idle_screen.get_by_role("list")
+    assert not screen.driver.execute_script(patched)
+    idle_screen.wait_for_settled()
+    assert screen.driver.execute_script(patched)
+    assert len(idle_screen.get_all_by_role("listitem")) == 50
+    assert idle_screen.find_by_text("Saved")
+
+    start = time.monotonic()
+    with pytest.raises(NoSuchElementException):
+        idle_screen.find_by_text("Missing", timeout=5)
+    assert time.monotonic() - start < 2
+
+
+def test_stable(screen: Screen):
+    screen.driver.get(get_file_path("stable.html"))
+    moving = screen.find_by(locators.Role("button", name="Moving"), stable=True)
+    assert moving.text == "Moving"
+    covered = screen.find_by(locators.Text("Covered"), stable=True)
+    assert screen.wait_for_stable(covered) == covered
+
+    screen.driver.execute_script(
+        "arguments[0].style.transition = 'margin-left 10s linear';"
+        "arguments[0].style.marginLeft = '300px'",
+        moving,
+    )
+    with pytest.raises(ElementNotInteractableException):
+        screen.wait_for_stable(moving, timeout=0.5)
+
+
+def test_fast_forward_and_clock(screen: Screen):
+    screen.driver.get(get_file_path("clock.html"))
+    fast_screen = Screen(screen.driver, fast_forward=True)
+    fast_screen.clock.install()
+    # Called without `new`, Date() returns a string like the real one
+    assert screen.driver.execute_script("return typeof Date()") == "string"
+    fast_screen.click_by(locators.Role("button", name="Save"))
+    assert fast_screen.query_by_text("Saved") is None
+    assert fast_screen.clock.tick(1) == 1
+    assert fast_screen.get_by_text("Saved")
+    fast_screen.clock.run_all()
+    assert fast_screen.query_by_text("Saved") is None
+    fast_screen.clock.uninstall()
+
+    # The 10s animation is finished straight away
+    assert fast_screen.find_by(locators.Role("dialog"), stable=True, timeout=1)
+
+
+def test_query_budget(screen: Screen):
+    screen.driver.get(get_file_path("index.html"))
+    screen.driver.execute_script(
+        "for (let i = 0; i < 5000; i++) {"
+        "  const item = document.createElement('div');"
+        "  item.innerHTML = `<span>Item ${i}</span>`;"
+        "  document.body.appendChild(item);"
+        "}"
+    )
+    slow = locators.Css("div").filter(has=locators.Text(re.compile("Item")))
+    with pytest.raises(QueryBudgetExceededException):
+        screen.get_all_by(slow, query_budget=0.001)
+    with pytest.raises(QueryBudgetExceededException):
+        Screen(screen.driver, query_budget=0.001).query_all_by(slow)
+    # Waits report the budget instead of not finding the element
+    with pytest.raises(QueryBudgetExceededException):
+        screen.find_all_by(slow, query_budget=0.001, timeout=1)
+    assert len(screen.get_all_by(slow, query_budget=30)) >= 5000
+
+    # A single Testing Library query is stopped while it runs, not once it's done
+    screen.driver.execute_script(
+        "const list = document.createElement('ul');"
+        "list.innerHTML = '<li>Row</li>'.repeat(20000);"
+        "document.body.appendChild(list);"
+    )
+    start = time.monotonic()
+    assert len(screen.get_all_by_role("listitem")) == 20000
+    full = time.monotonic() - start
+    start = time.monotonic()
+    with pytest.raises(QueryBudgetExceededException):
+        screen.get_all_by(locators.Role("listitem"), query_budget=0.01)
+    assert time.monotonic() - start < full / 2
+
+    with pytest.warns(SlowQueryWarning, match="Item 1"):
+        Screen(screen.driver, slow_query_threshold=0).get_by_text("Item 1")
+
+
+def test_async_screen(screen: Screen):
+    screen.driver.get(get_file_path("form.html"))
+
+    async def run():
+        async with AsyncWebDriver.from_driver(screen.driver) as driver:
+            async_screen = AsyncScreen(driver)
+            assert isinstance(
+                await async_screen.get_by_text("Email address"), AsyncWebElement
+            )
+            assert await async_screen.query_by_text("address") is None
+            items, email = await asyncio.gather(
+                async_screen.find_all_by_text("Item"),
+                async_screen.get_by(locators.Id("email")),
+            )
+            assert len(items) == 3
+            assert await email.get_attribute("id") == "email"
+            with pytest.raises(NoSuchElementException):
+                await async_screen.get_by_text("address")
+            with pytest.raises(MultipleSuchElementsException):
+                await async_screen.get_by_text("Item", exact=False)
+
+            await email.send_keys("test@example.com")
+            assert await email.get_attribute("value") == "test@example.com"
+
+            parent = await async_screen.get_by(locators.Css("form"))
+            within = AsyncWithin(parent)
+            assert isinstance(
+                await within.get_by_text("Email address"), AsyncWebElement
+            )
+            assert await within.query_by_text("Item 1") is None
+
+            # Only the sync screen has them
+            assert not hasattr(async_screen, "expect")
+            assert not hasattr(async_screen, "within_frame")
+
+    asyncio.run(run())
+
+
+def test_screen_group(screen: Screen):
+    screen.driver.get(get_file_path("form.html"))
+    text = locators.Text("Item", exact=False)
+    with ScreenGroup([screen.driver], max_workers=2) as group:
+        (element,) = group.get_by(locators.Text("Email address"))
+        assert isinstance(element, WebElement)
+        (error,) = group.get_by(text)
+        assert isinstance(error, MultipleSuchElementsException)
+        assert group.errors([error]) == {screen.driver: error}
+        assert [len(els) for els in group.find_all_by(text)] == [3]
+        assert group.run(lambda s: s.query_by_text("address")) == [None]
+
+
+def test_browser_pool(screen: Screen):
+    pool = BrowserPool(lambda: screen.driver)
+    driver = pool.acquire()
+    driver.get(get_file_path("form.html"))
+    # The bundle was preloaded, so it's there before the first query
+    assert driver.execute_script("return typeof window.__stl__") == "object"
+    driver.execute_script("localStorage.setItem('stl', '1')")
+
+    pool.release(driver)
+    assert driver.current_url == "about:blank"
+    assert pool.acquire() is driver
+    driver.get(get_file_path("form.html"))
+    assert driver.execute_script("return localStorage.getItem('stl')") is None
+    assert isinstance(screen.get_by_text("Email address"), WebElement)
+
+
+class ResetDriver:
+    # Just enough of a Chromium driver for reset_driver()
+    def __init__(self):
+        self.window_handles = ["main", "popup"]
+        self.origins = {"main": "https://shop.test", "popup": "https://pay.test"}
+        self.history = {
+            "main": ["https://login.test/", "https://shop.test/cart"],
+            "popup": ["about:blank", "https://pay.test/"],
+        }
+        self.current = "main"
+        self.switch_to = self
+        self.commands: List[tuple] = []
+
+    def window(self, handle: str):
+        self.current = handle
+
+    def close(self):
+        self.commands.append(("close", self.current))
+
+    def execute_script(self, script: str) -> str:
+        if "localStorage.clear()" in script:
+            self.commands.append(("clear storage", self.current))
+        return self.origins[self.current]
+
+    def execute_cdp_cmd(self, command: str, params: dict) -> dict:
+        self.commands.append((command, params.get("origin")))
+        if command == "Page.getNavigationHistory":
+            return {"entries": [{"url": url} for url in self.history[self.current]]}
+        if command == "Page.getFrameTree":
+            return {
+                "frameTree": {
+                    "frame": {"url": self.history[self.current][-1]},
+                    "childFrames": [{"frame": {"url": "https://ads.test/frame"}}],
+                }
+            }
+        return {}
+
+    def get(self, url: str):
+        self.commands.append(("get", url))
+
+
+def test_reset_driver_clears_every_origin():
+    driver = ResetDriver()
+    reset_driver(driver)  # type: ignore
+    cleared = [
+        origin
+        for command, origin in driver.commands
+        if command == "Storage.clearDataForOrigin"
+    ]
+    assert cleared == [
+        "https://ads.test",
+        "https://login.test",
+        "https://pay.test",
+        "https://shop.test",
+    ]
+    assert ("clear storage", "popup") in driver.commands
+    assert ("clear storage", "main") in driver.commands
+    assert ("close", "popup") in driver.commands
+    assert driver.current == "main"
+    assert driver.commands[-1] == ("get", "about:blank")
+
+
+def test_hooks(screen: Screen):
+    screen.driver.get(get_file_path("form.html"))
+    events: List[QueryEvent] = []
+    screen.add_hook(events.append)
+    try:
+        screen.get_by_text("Email address")
+        (event,) = events
+        assert event.kind == "get"
+        assert event.round_trips == 2 if event.injected else 1
+        assert event.result_count == 1
+        assert event.eval_time is not None
+        assert 0 <= event.transport_time <= event.duration
+
+        events.clear()
+        with pytest.raises(NoSuchElementException):
+            screen.find_by_text("Missing", timeout=0.3, poll_frequency=0.1)
+        assert [e.kind for e in events if e.kind != "wait"] == ["message", "find"]
+        find = events[-1]
+        assert find.polls == len([e for e in events if e.kind == "wait"]) > 1
+        assert isinstance(find.error, NoSuchElementException)
+    finally:
+        screen.remove_hook(events.append)
+
+    events.clear()
+    within = Within(screen.get_by_css("form"))
+    add_hook(events.append)
+    try:
+        within.query_all_by(locators.Css("input"))
+    finally:
+        remove_hook(events.append)
+    assert [(e.kind, e.round_trips) for e in events] == [("all", 1)]
+    assert events[0].result_count
+
+
+def test_profile_report(pytester):
+    pytester.makeconftest('pytest_plugins = ["selenium_testing_library.pytest_plugin"]')
+    pytester.makepyfile("""
+        from selenium_testing_library import Screen, locators
+
+        class Driver:
+            def find_elements(self, by, value):
+                return ["element"]
+
+        def test_queries():
+            screen = Screen(Driver())
+            screen.get_by(locators.Css("button"))
+            screen.query_all_by(locators.Css("button"))
+        """)
+    profile = pytester.path / "profile.json"
+    result = pytester.runpytest(
+        "--stl-profile=5",
+        f"--stl-profile-json={profile}",
+    )
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*slowest locators*",
+            "*2 queries  Css('button', exact=True)",
+            "*most WebDriver round trips*",
+            "*2 round trips*test_profile_report.py::test_queries",
+        ]
+    )
+    data = json.loads(profile.read_text())
+    assert data["tests"]["test_profile_report.py::test_queries"]["round_trips"] == 2
+    assert data["locators"]["Css('button', exact=True)"]["count"] == 2
+
+
+def test_trace(screen: Screen, tmp_path, capsys):
+    screen.driver.get(get_file_path("form.html"))
+    path = str(tmp_path / "trace.jsonl")
+    writer = screen.trace(path, buffer_size=2)
+    try:
+        screen.get_by_text("Email address")
+        screen.get_by_text("Email address")
+        with pytest.raises(NoSuchElementException):
+            screen.find_by_text("Missing", timeout=0.2, poll_frequency=0.1)
+    finally:
+        screen.remove_hook(writer)
+        writer.close()
+
+    records = list(read_trace(path))
+    assert [record["kind"] for record in records] == ["get", "get", "find"]
+    assert records[0]["container"] == "page"
+    assert records[0]["results"] == 1
+    assert records[2]["error"]["type"] == "NoSuchElementException"
+    assert records[2]["polls"] > 1
+
+    summary = summarize(records)
+    assert [same["count"] for same in summary["repeated"]] == [2]
+    assert len(summary["timeouts"]) == 1
+
+    trace_main([path])
+    output = capsys.readouterr().out
+    assert "Repeated queries" in output
+    assert "Waits that always time out" in output
+
+
+class GoneDriver:
+    @property
+    def current_url(self) -> str:
+        raise WebDriverException("The browser is gone")
+
+
+def test_trace_page_is_optional(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    with TraceWriter(path, driver=GoneDriver()) as writer:
+        # A driver that can't answer must not replace the error of the query the hook reports
+        writer(QueryEvent("inject", None, 0, nested=True, injected=True))
+    (record,) = read_trace(path)
+    assert record["kind"] == "inject"
+    assert record["page"] is None
+
+
+def test_trace_waits(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    with TraceWriter(path) as writer:
+        # A find_all_by whose wait ran in the page, without polls in Python
+        writer(
+            QueryEvent(
+                "all",
+                locators.Css("li"),
+                0,
+                wait=True,
+                error=TimeoutException("Timed out"),
+            )
+        )
+        writer(QueryEvent("get", locators.Css("li"), 0))
+    records = list(read_trace(path))
+    assert [record["wait"] for record in records] == [True, False]
+    assert [wait["count"] for wait in summarize(records)["timeouts"].values()] == [1]
+
+    # The rest is written when a writer that wasn't closed is garbage collected
+    writer = TraceWriter(path)
+    writer(QueryEvent("get", locators.Css("li"), 0))
+    del writer
+    assert len(list(read_trace(path))) == 3
+
+
+def test_record_and_replay(screen: Screen, tmp_path):
+    def queries(screen: Screen):
+        form = screen.get_by(locators.Css("form"))
+        Within(form).get_by_label_text("Email address")
+        with pytest.raises(NoSuchElementException):
+            screen.get_by_text("Missing")
+        return form
+
+    screen.driver.get(get_file_path("form.html"))
+    recorder = RecordingFinder(screen.driver)
+    form = queries(Screen(recorder))
+    assert form.tag_name == "form"
+    path = str(tmp_path / "form.json.gz")
+    recorder.save(path)
+
+    replay = ReplayFinder.load(path)
+    form = queries(Screen(replay))
+    assert form.id == "element-0"
+    replay.assert_done()
+
+    with pytest.raises(ReplayMismatchError, match="doesn't match the recording"):
+        Screen(ReplayFinder.load(path)).get_by_role("button")
+
+    # A query made more often than during the recording is a mismatch too
+    replay = ReplayFinder.load(path)
+    queries(Screen(replay))
+    with pytest.raises(ReplayMismatchError, match="the end of the recording"):
+        Screen(replay).get_by(locators.Css("form"))
+
+
+def test_replay_polls(screen: Screen):
+    screen.driver.get(get_file_path("form.html"))
+    recorder = RecordingFinder(screen.driver)
+    with pytest.raises(NoSuchElementException):
+        Screen(recorder).find_by_text("Missing", timeout=0.5, poll_frequency=0.1)
+    Screen(recorder).get_by_text("Hello")
+
+    # The polls of a wait can differ from the recording, shorter and longer waits both replay
+    for timeout in (0.1, 1):
+        replay = ReplayFinder({"scripts": recorder.scripts, "calls": recorder.calls})
+        with pytest.raises(NoSuchElementException):
+            Screen(replay).find_by_text("Missing", timeout=timeout, poll_frequency=0.1)
+        Screen(replay).get_by_text("Hello")
+        replay.assert_done()
+
+
+def test_snapshot(screen: Screen):
+    screen.driver.get(get_file_path("form.html"))
+    screen.get_by_placeholder_text("Password").send_keys("secret")
+    snapshot = screen.snapshot()
+
+    assert snapshot.get_by_label_text("Email address").get_attribute("id") == "email"
+    assert snapshot.get_by_display_value("secret").get_attribute("id") == "password"
+    assert len(snapshot.get_all_by_text("Item")) == 3
+    assert snapshot.get_by(locators.Css("#subsection > span")).text_content == "Hello"
+    assert snapshot.get_by(locators.XPath("//input[@type='checkbox']")).is_displayed()
+    assert snapshot.query_by_text("Missing") is None
+    with pytest.raises(MultipleSuchElementsException):
+        snapshot.get_by_text("Item")
+    with pytest.raises(ValueError, match="need the browser"):
+        snapshot.get_by_role("button")
+    items = snapshot.get_all_by(
+        locators.XPath(
+            "//li[contains(text(), 'te') and starts-with(normalize-space(), 'It')]"
+        )
+    )
+    assert [item.text_content for item in items] == ["Item", "Item", "Item"]
+
+    label = snapshot.get_by(locators.Css("label[for=email]"))
+    assert label.element() == screen.get_by(locators.Css("label[for=email]"))
+    elements = snapshot.elements(snapshot.get_all_by_text("Item"))
+    assert elements == screen.get_all_by_text("Item")
+
+    subsection = Within(screen.get_by(locators.Css("#subsection"))).snapshot()
+    assert subsection.get_by_text("Hello").element().text == "Hello"
+    assert subsection.query_by_label_text("Email address") is None
+
+
+SNAPSHOT_HTML = (
+    "<html><head><title>Shop</title></head><body>"
+    '<div id="a" class="x"><p>One <b>bold</b> two</p><p>  Two  words </p>'
+    "<ul><li>1</li><li>2</li><li>3</li><li>4</li></ul></div>"
+    '<div id="b"><span>Last</span><input name=" q"><input name="q">'
+    "<em></em></div></body></html>"
+)
+
+
+def snapshot_of(html: str) -> Snapshot:
+    # Every element is visible and enabled, the flags of a page would come from the browser
+    return Snapshot(html, [3] * len(re.findall(r"<\w", html)), {})
+
+
+def texts(nodes) -> List[str]:
+    return [node.text_content.strip() for node in nodes]
+
+
+def test_snapshot_xpath():
+    snapshot = snapshot_of(SNAPSHOT_HTML)
+
+    def xpath(selector: str) -> List[str]:
+        return texts(snapshot.query_all(locators.XPath(selector)))
+
+    assert xpath("//ul/li[1]/following-sibling::li") == ["2", "3", "4"]
+    assert xpath("//li[3]/preceding-sibling::li[1]") == ["2"]
+    assert xpath("//b/ancestor::*[1]") == ["One bold two"]
+    assert xpath("//b/parent::p/following::li[1]") == ["1"]
+    assert xpath("//span/preceding::li[1]") == ["4"]
+    assert xpath("//span/..") == ["Last"]
+    assert xpath("//ul/descendant-or-self::*") == ["1234", "1", "2", "3", "4"]
+    assert xpath("id('b')/span") == ["Last"]
+
+    assert xpath("//li[2]") == ["2"]
+    assert xpath("//li[last()]") == ["4"]
+    assert xpath("//li[position() = last() - 1]") == ["3"]
+    assert xpath("//li[position() > 2]") == ["3", "4"]
+    assert xpath("(//li)[1]") == ["1"]
+    assert xpath("//li[. > 1][2]") == ["3"]
+    assert xpath("//li[number(.) mod 2 = 1]") == ["1", "3"]
+    assert xpath("//li[1] | //span | //li[1]") == ["1", "Last"]
+    assert xpath("//p[normalize-space() = 'Two words']") == ["Two  words"]
+    assert xpath("//div[count(p) = 2]") == ["One bold two  Two  words 1234"]
+
+    with pytest.raises(ValueError, match="namespaces can't be used"):
+        xpath("//foo:bar")
+    with pytest.raises(ValueError, match="doesn't select elements"):
+        xpath("count(//li)")
+    with pytest.raises(ValueError, match="it ends too early"):
+        xpath("//li[1")
+
+
+def test_snapshot_css():
+    snapshot = snapshot_of(SNAPSHOT_HTML)
+
+    def css(selector: str) -> List[str]:
+        return texts(snapshot.query_all(locators.Css(selector)))
+
+    assert css(".x li") == ["1", "2", "3", "4"]
+    assert css("#a > b") == []
+    assert css("p + ul > li:first-child") == ["1"]
+    assert css("p ~ ul li:last-child") == ["4"]
+    assert css("li:nth-child(odd)") == ["1", "3"]
+    assert css("li:nth-last-child(-n+2)") == ["3", "4"]
+    assert css("p:nth-of-type(2)") == ["Two  words"]
+    assert css("div:not(.x) > span:only-of-type") == ["Last"]
+    assert [
+        node.tag_name for node in snapshot.query_all(locators.Css("#b :empty"))
+    ] == [
+        "input",
+        "input",
+        "em",
+    ]
+    assert css("li:is(:first-child, :last-child)") == ["1", "4"]
+
+    with pytest.raises(ValueError, match="isn't supported in snapshots"):
+        css("li:hover")
+
+
+def test_snapshot_name_is_exact():
+    snapshot = snapshot_of(SNAPSHOT_HTML)
+    # Like Selenium, the name isn't normalized
+    (node,) = snapshot.query_all(locators.Name("q"))
+    assert node.attributes["name"] == "q"